@@ -2,25 +2,51 @@
 Android API Server - FastAPI server để phục vụ data cho Android app
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
+from functools import lru_cache
 import json
+import threading
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import uvicorn
 
 # Import models
 import sys
 sys.path.append(str(Path(__file__).parent))
 from models.calendar_models import CalendarDay, MonthlyCalendar
+from lunar import format_lunar_date, solar_to_lunar, lunar_to_solar
+from api.bundle import MEDIA_TYPE as BUNDLE_MEDIA_TYPE, ZSTD_AVAILABLE, build_year_bundle, default_codec
+from api.calendar_store import FIELD_PATHS, FLAG_BAD, FLAG_GOOD, FLAG_HOLIDAY, CalendarStore
+from api.repository import get_repository
+from api.responses import EncodedBody, FastJSONResponse, PrecomputedResponses, encoded_response
+from api.schemas import (BadDaysResponse, CalendarResponse, DayResponse, GoodDaysResponse,
+                         HolidaysResponse, RangeResponse, SearchResponse)
+from api.streaming import NDJSON_MEDIA_TYPE, iter_json_envelope, iter_ndjson
+from config.settings import API_SETTINGS
+
+# Data directory
+DATA_DIR = Path(__file__).parent / "data" / "api"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Nạp repository (calendar store + lunar index hoặc SQLite) và body tính sẵn một lần khi server khởi động"""
+    repository = get_repository(DATA_DIR)
+    repository.warm()
+    refresh_if_changed()
+    month_responses.warm(repository.months())
+    yield
 
 app = FastAPI(
     title="Vietnamese Calendar API",
     description="API for Vietnamese Lunar Calendar data for Android app",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware cho Android app và web interface
@@ -37,32 +63,9 @@ web_dir = Path(__file__).parent / "web"
 if web_dir.exists():
     app.mount("/static", StaticFiles(directory=str(web_dir)), name="static")
 
-# Data directory
-DATA_DIR = Path(__file__).parent / "data" / "api"
-
 class CalendarAPI:
     """Calendar API handlers"""
     
-    @staticmethod
-    def load_month_data(year: int, month: int) -> Optional[Dict]:
-        """Load calendar data for specific month"""
-        # Thử cả format 1 chữ số và 2 chữ số
-        filenames = [
-            f"calendar_{year}_{month}.json",      # 1 chữ số (từ generator)
-            f"calendar_{year}_{month:02d}.json"   # 2 chữ số (backup)
-        ]
-        
-        for filename in filenames:
-            file_path = DATA_DIR / filename
-            if file_path.exists():
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-                except Exception:
-                    continue
-        
-        return None
-    
     @staticmethod
     def get_available_months() -> List[str]:
         """Get list of available months"""
@@ -101,14 +104,217 @@ async def api_info():
         "endpoints": {
             "/calendar/{year}/{month}": "Get calendar data for specific month",
             "/calendar/current": "Get current month calendar",
+            "/calendar/range?from=&to=&fields=&filter=&format=": "Get days of a date range with optional filters and field projection (json, ndjson or chunked stream)",
             "/holidays/{year}/{month}": "Get holidays for specific month",
             "/good-days/{year}/{month}": "Get good days for specific month",
-            "/available-months": "Get list of available months"
+            "/bundle/{year}?to_year=&codec=": "Binary offline bundle of one or more years (see api/bundle.py)",
+            "/available-months": "Get list of available months",
+            "/stats/cache": "Month file cache counters (hits, misses, reloads, removed)",
+            "/convert/solar/{year}/{month}/{day}": "Convert solar date to lunar date",
+            "/convert/lunar/{year}/{month}/{day}": "Convert lunar date to solar date"
+        }
+    }
+
+def build_calendar_payload(year: int, month: int) -> Optional[CalendarResponse]:
+    """Payload of /calendar/{year}/{month}, None if month is not available"""
+    data = get_repository(DATA_DIR).month_document(year, month)
+    
+    if not data:
+        return None
+    
+    return {
+        "success": True,
+        "data": data,
+        "requested": f"{year}-{month:02d}"
+    }
+
+def build_holidays_payload(year: int, month: int) -> Optional[HolidaysResponse]:
+    """Payload of /holidays/{year}/{month}"""
+    repository = get_repository(DATA_DIR)
+    
+    if not repository.has_month(year, month):
+        return None
+    
+    holidays = []
+    for day in repository.month_days(year, month, FLAG_HOLIDAY):
+        holidays.append({
+            "date": day.get("solar_date"),
+            "lunar_date": day.get("lunar_date"),
+            "solar_holiday": day.get("holidays", {}).get("solar"),
+            "lunar_holiday": day.get("holidays", {}).get("lunar")
+        })
+    
+    return {
+        "success": True,
+        "data": {
+            "year": year,
+            "month": month,
+            "holidays": holidays,
+            "total": len(holidays)
+        }
+    }
+
+def build_good_days_payload(year: int, month: int) -> Optional[GoodDaysResponse]:
+    """Payload of /good-days/{year}/{month}"""
+    repository = get_repository(DATA_DIR)
+    
+    if not repository.has_month(year, month):
+        return None
+    
+    good_days = []
+    for day in repository.month_days(year, month, FLAG_GOOD):
+        good_days.append({
+            "date": day.get("solar_date"),
+            "lunar_date": day.get("lunar_date"),
+            "can_chi_day": day.get("can_chi", {}).get("day"),
+            "good_activities": day.get("activities", {}).get("good_activities", []),
+            "good_hours": day.get("feng_shui", {}).get("good_hours", [])
+        })
+    
+    return {
+        "success": True,
+        "data": {
+            "year": year,
+            "month": month,
+            "good_days": good_days,
+            "total": len(good_days)
+        }
+    }
+
+def build_bad_days_payload(year: int, month: int) -> Optional[BadDaysResponse]:
+    """Payload of /bad-days/{year}/{month}"""
+    repository = get_repository(DATA_DIR)
+    
+    if not repository.has_month(year, month):
+        return None
+    
+    bad_days = []
+    for day in repository.month_days(year, month, FLAG_BAD):
+        bad_days.append({
+            "date": day.get("solar_date"),
+            "lunar_date": day.get("lunar_date"),
+            "can_chi_day": day.get("can_chi", {}).get("day"),
+            "bad_activities": day.get("activities", {}).get("bad_activities", []),
+            "bad_hours": day.get("feng_shui", {}).get("bad_hours", [])
+        })
+    
+    return {
+        "success": True,
+        "data": {
+            "year": year,
+            "month": month,
+            "bad_days": bad_days,
+            "total": len(bad_days)
+        }
+    }
+
+# Body đã serialize + nén sẵn cho các endpoint theo tháng
+month_responses = PrecomputedResponses({
+    "calendar": build_calendar_payload,
+    "holidays": build_holidays_payload,
+    "good_days": build_good_days_payload,
+    "bad_days": build_bad_days_payload
+})
+
+# Phiên bản dữ liệu mà các body tính sẵn đang dựa trên
+data_version = None
+# Endpoint đọc dữ liệu là def thường, FastAPI chạy trong threadpool nên nhiều request có thể refresh cùng lúc
+data_version_lock = threading.Lock()
+
+def refresh_if_changed() -> None:
+    """Reload changed source data and drop precomputed bodies built from the old version"""
+    global data_version
+    with data_version_lock:
+        version = get_repository(DATA_DIR).refresh()
+        if version != data_version:
+            month_responses.clear()
+            build_encoded_bundle.cache_clear()
+            data_version = version
+
+def parse_range(date_from: str, date_to: str, fields: Optional[str], max_days: Optional[int] = None):
+    """Validate from/to/fields of range queries"""
+    try:
+        start = date.fromisoformat(date_from)
+        end = date.fromisoformat(date_to)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="from and to must be dates in YYYY-MM-DD format")
+    
+    if end < start:
+        raise HTTPException(status_code=400, detail="to must not be before from")
+    
+    if max_days is not None and (end - start).days + 1 > max_days:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range must not exceed {max_days} days (use format=ndjson or format=stream for larger ranges)"
+        )
+    
+    field_list = [field for field in (fields or "").split(",") if field.strip()]
+    try:
+        paths = CalendarStore.resolve_fields(field_list)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{e}. Valid fields: {', '.join(CalendarStore.field_names())}")
+    
+    return start, end, field_list, paths
+
+def parse_filters(filters: Optional[List[str]]) -> Dict[tuple, Any]:
+    """Parse repeated field=value filters; value is read as JSON (true, 1, null...) or else as a string"""
+    parsed = {}
+    for item in filters or []:
+        field, separator, raw_value = item.partition("=")
+        path = tuple(part for part in field.strip().split(".") if part)
+        if not separator or path not in FIELD_PATHS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid filter: {item}. Use field=value with one of: {', '.join('.'.join(p) for p in FIELD_PATHS)}"
+            )
+        try:
+            parsed[path] = json.loads(raw_value)
+        except ValueError:
+            parsed[path] = raw_value
+    return parsed
+
+@app.get("/calendar/range")
+def get_calendar_range(
+    date_from: str = Query(..., alias="from", description="First day (YYYY-MM-DD)"),
+    date_to: str = Query(..., alias="to", description="Last day, inclusive (YYYY-MM-DD)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. solar_date,lunar_date,can_chi.day,holidays"),
+    format: str = Query("json", pattern="^(json|ndjson|stream)$",
+                        description="json: single object; ndjson: one day per line; stream: same JSON object sent in chunks"),
+    filter: Optional[List[str]] = Query(None, description="Repeatable field=value equality filter, e.g. activities.is_good_day=true")
+):
+    """Get days of an arbitrary date range in one request, optionally filtered and projected to some fields"""
+    
+    # Chỉ response dựng toàn bộ trong bộ nhớ mới cần giới hạn độ dài khoảng
+    max_days = API_SETTINGS['max_range_days'] if format == "json" else None
+    start, end, field_list, paths = parse_range(date_from, date_to, fields, max_days)
+    filters = parse_filters(filter)
+    refresh_if_changed()
+    days_iter = get_repository(DATA_DIR).iter_range(start, end, paths if field_list else None, filters)
+    
+    if format == "ndjson":
+        return StreamingResponse(iter_ndjson(days_iter), media_type=NDJSON_MEDIA_TYPE)
+    
+    if format == "stream":
+        envelope = {"from": start.isoformat(), "to": end.isoformat(), "fields": field_list or None}
+        return StreamingResponse(iter_json_envelope(envelope, days_iter), media_type="application/json")
+    
+    days = list(days_iter)
+    payload: RangeResponse = {
+        "success": True,
+        "data": {
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "fields": field_list or None,
+            "days": days,
+            "total": len(days)
         }
     }
+    
+    # Trả response trực tiếp để không đi qua jsonable_encoder
+    return FastJSONResponse(payload)
 
 @app.get("/calendar/{year}/{month}")
-async def get_calendar(year: int, month: int):
+def get_calendar(year: int, month: int, request: Request):
     """Get calendar data for specific month"""
     
     # Validate year and month
@@ -118,134 +324,119 @@ async def get_calendar(year: int, month: int):
     if month < 1 or month > 12:
         raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
     
-    data = CalendarAPI.load_month_data(year, month)
+    refresh_if_changed()
+    encoded = month_responses.get("calendar", year, month)
     
-    if not data:
+    if encoded is None:
         raise HTTPException(
             status_code=404, 
             detail=f"Calendar data not found for {year}-{month:02d}"
         )
     
-    return {
-        "success": True,
-        "data": data,
-        "requested": f"{year}-{month:02d}"
-    }
+    return encoded_response(request, encoded)
 
 @app.get("/calendar/current")
-async def get_current_calendar():
+def get_current_calendar(request: Request):
     """Get current month calendar"""
     now = datetime.now()
-    return await get_calendar(now.year, now.month)
+    return get_calendar(now.year, now.month, request)
 
 @app.get("/holidays/{year}/{month}")
-async def get_holidays(year: int, month: int):
+def get_holidays(year: int, month: int, request: Request):
     """Get holidays for specific month"""
     
-    data = CalendarAPI.load_month_data(year, month)
+    refresh_if_changed()
+    encoded = month_responses.get("holidays", year, month)
     
-    if not data:
+    if encoded is None:
         raise HTTPException(
             status_code=404,
             detail=f"Data not found for {year}-{month:02d}"
         )
     
-    holidays = []
-    for day in data.get("days", []):
-        solar_holiday = day.get("holidays", {}).get("solar")
-        lunar_holiday = day.get("holidays", {}).get("lunar")
-        
-        if solar_holiday or lunar_holiday:
-            holidays.append({
-                "date": day["solar_date"],
-                "lunar_date": day["lunar_date"],
-                "solar_holiday": solar_holiday,
-                "lunar_holiday": lunar_holiday
-            })
-    
-    return {
-        "success": True,
-        "data": {
-            "year": year,
-            "month": month,
-            "holidays": holidays,
-            "total": len(holidays)
-        }
-    }
+    return encoded_response(request, encoded)
 
 @app.get("/good-days/{year}/{month}")
-async def get_good_days(year: int, month: int):
+def get_good_days(year: int, month: int, request: Request):
     """Get good days for specific month"""
     
-    data = CalendarAPI.load_month_data(year, month)
+    refresh_if_changed()
+    encoded = month_responses.get("good_days", year, month)
     
-    if not data:
+    if encoded is None:
         raise HTTPException(
             status_code=404,
             detail=f"Data not found for {year}-{month:02d}"
         )
     
-    good_days = []
-    for day in data.get("days", []):
-        activities = day.get("activities", {})
-        if activities.get("is_good_day") is True:
-            good_days.append({
-                "date": day["solar_date"],
-                "lunar_date": day["lunar_date"],
-                "can_chi_day": day.get("can_chi", {}).get("day"),
-                "good_activities": activities.get("good_activities", []),
-                "good_hours": day.get("feng_shui", {}).get("good_hours", [])
-            })
-    
-    return {
-        "success": True,
-        "data": {
-            "year": year,
-            "month": month,
-            "good_days": good_days,
-            "total": len(good_days)
-        }
-    }
+    return encoded_response(request, encoded)
 
 @app.get("/bad-days/{year}/{month}")
-async def get_bad_days(year: int, month: int):
+def get_bad_days(year: int, month: int, request: Request):
     """Get bad days for specific month"""
     
-    data = CalendarAPI.load_month_data(year, month)
+    refresh_if_changed()
+    encoded = month_responses.get("bad_days", year, month)
     
-    if not data:
+    if encoded is None:
         raise HTTPException(
             status_code=404,
             detail=f"Data not found for {year}-{month:02d}"
         )
     
-    bad_days = []
-    for day in data.get("days", []):
-        activities = day.get("activities", {})
-        if activities.get("is_good_day") is False:
-            bad_days.append({
-                "date": day["solar_date"],
-                "lunar_date": day["lunar_date"],
-                "can_chi_day": day.get("can_chi", {}).get("day"),
-                "bad_activities": activities.get("bad_activities", []),
-                "bad_hours": day.get("feng_shui", {}).get("bad_hours", [])
-            })
+    return encoded_response(request, encoded)
+
+@lru_cache(maxsize=API_SETTINGS['bundle_cache_size'])
+def build_encoded_bundle(year: int, to_year: int, codec: str, version: Any = None) -> Optional[EncodedBody]:
+    """Bundle of the given years with its ETag, None if no day is available"""
+    # version chỉ là khóa cache: bundle dựng dở lúc dữ liệu đổi không bị trả cho phiên bản mới
+    repository = get_repository(DATA_DIR)
+    if next(repository.iter_range(date(year, 1, 1), date(to_year, 12, 31), [("solar_date",)]), None) is None:
+        return None
+    # Bundle đã nén sẵn, không gzip thêm
+    return EncodedBody.from_bytes(build_year_bundle(repository, year, to_year, codec), compress=False)
+
+@app.get("/bundle/{year}")
+def get_bundle(
+    year: int,
+    request: Request,
+    to_year: Optional[int] = Query(None, description="Last year of the bundle (default: same as year)"),
+    codec: Optional[str] = Query(None, pattern="^(none|zlib|zstd)$",
+                                 description="Compression of the bundle (default: zstd if available, else zlib)")
+):
+    """Get a compact binary bundle of whole years for offline use"""
     
-    return {
-        "success": True,
-        "data": {
-            "year": year,
-            "month": month,
-            "bad_days": bad_days,
-            "total": len(bad_days)
-        }
-    }
+    if to_year is None:
+        to_year = year
+    if not 1 <= year <= 9999 or not 1 <= to_year <= 9999:
+        raise HTTPException(status_code=400, detail="year and to_year must be between 1 and 9999")
+    if to_year < year:
+        raise HTTPException(status_code=400, detail="to_year must not be before year")
+    
+    max_years = API_SETTINGS['max_bundle_years']
+    if to_year - year + 1 > max_years:
+        raise HTTPException(status_code=400, detail=f"Bundle must not exceed {max_years} years")
+    
+    if codec == "zstd" and not ZSTD_AVAILABLE:
+        raise HTTPException(status_code=400, detail="zstd is not available on this server, use codec=zlib")
+    
+    refresh_if_changed()
+    encoded = build_encoded_bundle(year, to_year, codec or default_codec(), data_version)
+    
+    if encoded is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Data not found for {year}" if to_year == year else f"Data not found for {year}-{to_year}"
+        )
+    
+    return encoded_response(request, encoded, media_type=BUNDLE_MEDIA_TYPE)
 
 @app.get("/available-months")
-async def get_available_months():
+def get_available_months():
     """Get list of available months"""
     
-    months = CalendarAPI.get_available_months()
+    refresh_if_changed()
+    months = get_repository(DATA_DIR).available_months()
     
     return {
         "success": True,
@@ -255,13 +446,23 @@ async def get_available_months():
         }
     }
 
+@app.get("/stats/cache")
+def get_cache_stats():
+    """Counters of the per-month file cache behind the repository"""
+    
+    return {
+        "success": True,
+        "data": get_repository(DATA_DIR).cache_stats()
+    }
+
 @app.get("/day/{year}/{month}/{day}")
-async def get_day_details(year: int, month: int, day: int):
+def get_day_details(year: int, month: int, day: int):
     """Get detailed information for specific day"""
     
-    data = CalendarAPI.load_month_data(year, month)
+    refresh_if_changed()
+    repository = get_repository(DATA_DIR)
     
-    if not data:
+    if not repository.has_month(year, month):
         raise HTTPException(
             status_code=404,
             detail=f"Data not found for {year}-{month:02d}"
@@ -269,53 +470,112 @@ async def get_day_details(year: int, month: int, day: int):
     
     target_date = f"{year}-{month:02d}-{day:02d}"
     
-    for day_data in data.get("days", []):
-        if day_data["solar_date"] == target_date:
-            return {
-                "success": True,
-                "data": day_data
-            }
+    try:
+        day_data = repository.get_day(date(year, month, day))
+    except ValueError:
+        day_data = None
+    if day_data is not None:
+        payload: DayResponse = {
+            "success": True,
+            "data": day_data
+        }
+        return FastJSONResponse(payload)
     
     raise HTTPException(
         status_code=404,
         detail=f"Day {target_date} not found"
     )
 
+@app.get("/convert/solar/{year}/{month}/{day}")
+async def convert_solar_to_lunar(year: int, month: int, day: int):
+    """Convert solar date to lunar date (table lookup, no data files needed)"""
+    
+    try:
+        solar = datetime(year, month, day).date()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    lunar = solar_to_lunar(solar)
+    
+    return {
+        "success": True,
+        "data": {
+            "solar_date": solar.isoformat(),
+            "lunar_date": str(lunar),
+            "lunar_day": lunar.day,
+            "lunar_month": lunar.month,
+            "lunar_year": lunar.year,
+            "is_leap_month": lunar.is_leap
+        }
+    }
+
+@app.get("/convert/lunar/{year}/{month}/{day}")
+async def convert_lunar_to_solar(
+    year: int,
+    month: int,
+    day: int,
+    leap: bool = Query(False, description="Lunar month is a leap month")
+):
+    """Convert lunar date to solar date (table lookup, no data files needed)"""
+    
+    try:
+        solar = lunar_to_solar(day, month, year, leap)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "success": True,
+        "data": {
+            "solar_date": solar.isoformat(),
+            "lunar_date": format_lunar_date(day, month, year, leap),
+            "is_leap_month": leap
+        }
+    }
+
 @app.get("/search")
-async def search_by_lunar_date(
-    lunar_day: int = Query(..., description="Lunar day (1-30)"),
-    lunar_month: int = Query(..., description="Lunar month (1-12)"),
-    year: Optional[int] = Query(None, description="Year to search in")
+def search_by_lunar_date(
+    lunar_day: int = Query(..., ge=1, le=30, description="Lunar day (1-30)"),
+    lunar_month: int = Query(..., ge=1, le=12, description="Lunar month (1-12)"),
+    year: Optional[int] = Query(None, ge=1, le=9999, description="Year to search in"),
+    to_year: Optional[int] = Query(None, ge=1, le=9999, description="Last year to search in (default: same as year)"),
+    leap: Optional[bool] = Query(None, description="Only leap (true) or regular (false) lunar month")
 ):
     """Search for solar dates by lunar date"""
     
     if year is None:
         year = datetime.now().year
+    if to_year is None:
+        to_year = year
+    if to_year < year:
+        raise HTTPException(status_code=400, detail="to_year must not be before year")
     
-    target_lunar = f"{lunar_day:02d}/{lunar_month:02d}"
-    results = []
+    max_years = API_SETTINGS['max_search_years']
+    if to_year - year + 1 > max_years:
+        raise HTTPException(status_code=400, detail=f"Search range must not exceed {max_years} years")
     
-    # Search through all months in the year
-    for month in range(1, 13):
-        data = CalendarAPI.load_month_data(year, month)
-        if data:
-            for day_data in data.get("days", []):
-                if day_data["lunar_date"] == target_lunar:
-                    results.append({
-                        "solar_date": day_data["solar_date"],
-                        "lunar_date": day_data["lunar_date"],
-                        "can_chi_day": day_data.get("can_chi", {}).get("day"),
-                        "is_good_day": day_data.get("activities", {}).get("is_good_day")
-                    })
+    refresh_if_changed()
+    repository = get_repository(DATA_DIR)
     
-    return {
+    results = []
+    for solar, day in repository.search_lunar(lunar_day, lunar_month, leap, date(year, 1, 1), date(to_year, 12, 31)):
+        day = day or {}
+        results.append({
+            "solar_date": solar.isoformat(),
+            "lunar_date": day.get("lunar_date"),
+            "can_chi_day": day.get("can_chi", {}).get("day"),
+            "is_good_day": day.get("activities", {}).get("is_good_day")
+        })
+    
+    years = f"{year}" if to_year == year else f"{year}-{to_year}"
+    payload: SearchResponse = {
         "success": True,
         "data": {
-            "query": f"Lunar {lunar_day:02d}/{lunar_month:02d} in {year}",
+            "query": f"Lunar {lunar_day:02d}/{lunar_month:02d} in {years}",
             "results": results,
             "total": len(results)
         }
     }
+    return FastJSONResponse(payload)
 
 if __name__ == "__main__":
     print("🚀 Starting Vietnamese Calendar API Server...")
@@ -0,0 +1,7 @@
+"""
+API package
+Kho dữ liệu, index, bundle nhị phân và response dùng cho android_api
+
+Không re-export gì ở đây: import thẳng module cần dùng (api.bundle, api.repository, ...)
+để code chỉ cần một phần (calendar_generator, crawler) không phải nạp FastAPI.
+"""
@@ -0,0 +1,306 @@
+"""
+Bundle nhị phân cho Android tải offline
+Mỗi ngày là một record độ dài cố định chứa id vào bảng giá trị dùng chung (can chi, giờ, việc nên làm, lễ...),
+cả payload được nén zstd (nếu có) hoặc zlib
+
+Cấu trúc (little-endian):
+    header   : magic "LVNB", version u8, codec u8, số trường u16, ordinal ngày đầu i32, kích thước payload gốc u32
+    payload  : (đã nén theo codec)
+        fields : mỗi trường u8 độ dài + tên dạng "can_chi.day" (UTF-8)
+        values : u32 số giá trị, mỗi giá trị một tag u8 + dữ liệu (xem TAG_*)
+        days   : u32 số ngày, mỗi ngày u16 offset so với ngày đầu, u8 ngày âm, u8 tháng âm, u16 năm âm,
+                 rồi mỗi trường một u16 id giá trị (MISSING_ID nếu ngày không có trường đó)
+"""
+
+import re
+import struct
+import sys
+import zlib
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from api.calendar_store import FIELD_PATHS, CalendarStore, InternTable
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+BUNDLE_MAGIC = b"LVNB"
+BUNDLE_VERSION = 1
+MEDIA_TYPE = "application/octet-stream"
+BUNDLE_DIRNAME = "bundles"
+BUNDLE_SUFFIX = ".lvnb"
+
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODECS = {"none": CODEC_NONE, "zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+
+HEADER = struct.Struct("<4sBBHiI")
+
+# Tag của bảng giá trị
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3     # i32
+TAG_STR = 4     # u16 độ dài + UTF-8
+TAG_LIST = 5    # u16 số phần tử + các u16 id (phần tử luôn đứng trước list trong bảng)
+TAG_FLOAT = 6   # f64
+
+MISSING_ID = 0xFFFF       # Ngày không có trường này
+LUNAR_PACKED_ID = 0xFFFE  # lunar_date dựng lại từ ngày/tháng/năm âm trong record
+MAX_VALUES = 0xFFFE
+
+# Trường lưu trong bundle: solar_date suy ra từ offset nên bỏ khỏi danh sách id
+BUNDLE_FIELDS: List[Tuple[str, ...]] = [path for path in FIELD_PATHS if path != ("solar_date",)]
+
+LUNAR_DATE_PATTERN = re.compile(r"(\d{2})/(\d{2})/(\d{4})$")
+
+
+def default_codec() -> str:
+    return "zstd" if ZSTD_AVAILABLE else "zlib"
+
+
+def _compress(payload: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=19).compress(payload)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(payload, 9)
+    return payload
+
+
+def _decompress(payload: bytes, codec: int, raw_size: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("Bundle nén zstd nhưng chưa cài zstandard")
+        return zstandard.ZstdDecompressor().decompress(payload, max_output_size=raw_size)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(payload)
+    if codec == CODEC_NONE:
+        return payload
+    raise ValueError(f"Codec không hỗ trợ: {codec}")
+
+
+def _lookup(day: Dict[str, Any], path: Tuple[str, ...]) -> Tuple[bool, Any]:
+    node: Any = day
+    for key in path:
+        if not isinstance(node, dict) or key not in node:
+            return False, None
+        node = node[key]
+    return True, node
+
+
+def _intern(values: InternTable, value: Any) -> int:
+    if isinstance(value, list):
+        for item in value:
+            _intern(values, item)
+    elif value is not None and not isinstance(value, (bool, int, float, str)):
+        raise ValueError(f"Giá trị không ghi được vào bundle: {value!r}")
+    return values.intern(value)
+
+
+def _encode_value(values: InternTable, value: Any) -> bytes:
+    if value is None:
+        return bytes([TAG_NONE])
+    if value is True:
+        return bytes([TAG_TRUE])
+    if value is False:
+        return bytes([TAG_FALSE])
+    if isinstance(value, int):
+        return struct.pack("<Bi", TAG_INT, value)
+    if isinstance(value, float):
+        return struct.pack("<Bd", TAG_FLOAT, value)
+    if isinstance(value, str):
+        encoded = value.encode("utf-8")
+        return struct.pack("<BH", TAG_STR, len(encoded)) + encoded
+    item_ids = [values.intern(item) for item in value]
+    return struct.pack(f"<BH{len(item_ids)}H", TAG_LIST, len(item_ids), *item_ids)
+
+
+def encode_bundle(days: Iterable[Dict[str, Any]], codec: Optional[str] = None) -> bytes:
+    """
+    Ghi các ngày (dict theo schema CalendarDay) thành bundle
+
+    Chỉ giữ các trường trong FIELD_PATHS; ngày phải tăng dần theo solar_date.
+
+    Raises:
+        ValueError: codec không hỗ trợ, ngày không theo thứ tự hoặc quá nhiều giá trị khác nhau
+    """
+    codec_id = CODECS.get(codec or default_codec())
+    if codec_id is None or (codec_id == CODEC_ZSTD and not ZSTD_AVAILABLE):
+        raise ValueError(f"Codec không hỗ trợ: {codec}")
+
+    values = InternTable()
+    records = []
+    first_ordinal = None
+    previous = None
+    for day in days:
+        ordinal = date.fromisoformat(day["solar_date"]).toordinal()
+        if first_ordinal is None:
+            first_ordinal = ordinal
+        if previous is not None and ordinal <= previous:
+            raise ValueError("Các ngày phải tăng dần theo solar_date")
+        if ordinal - first_ordinal > 0xFFFF:
+            raise ValueError("Khoảng ngày quá dài cho một bundle")
+        previous = ordinal
+
+        lunar = (0, 0, 0)
+        ids = []
+        for path in BUNDLE_FIELDS:
+            found, value = _lookup(day, path)
+            if not found:
+                ids.append(MISSING_ID)
+                continue
+            if path == ("lunar_date",) and isinstance(value, str):
+                match = LUNAR_DATE_PATTERN.match(value)
+                if match:
+                    lunar = (int(match.group(1)), int(match.group(2)), int(match.group(3)))
+                    ids.append(LUNAR_PACKED_ID)
+                    continue
+            ids.append(_intern(values, value))
+        records.append((ordinal - first_ordinal, lunar, ids))
+
+    if len(values) > MAX_VALUES:
+        raise ValueError(f"Bundle có {len(values)} giá trị khác nhau, tối đa {MAX_VALUES}")
+
+    parts = []
+    for path in BUNDLE_FIELDS:
+        name = ".".join(path).encode("utf-8")
+        parts.append(struct.pack("<B", len(name)) + name)
+    parts.append(struct.pack("<I", len(values)))
+    parts.extend(_encode_value(values, value) for value in values.values)
+
+    record = struct.Struct(f"<HBBH{len(BUNDLE_FIELDS)}H")
+    parts.append(struct.pack("<I", len(records)))
+    parts.extend(record.pack(offset, *lunar, *ids) for offset, lunar, ids in records)
+
+    payload = b"".join(parts)
+    header = HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, codec_id, len(BUNDLE_FIELDS),
+                         first_ordinal or 0, len(payload))
+    return header + _compress(payload, codec_id)
+
+
+def _decode_values(payload: bytes, offset: int) -> Tuple[List[Any], int]:
+    (count,) = struct.unpack_from("<I", payload, offset)
+    offset += 4
+    values: List[Any] = []
+    for _ in range(count):
+        tag = payload[offset]
+        offset += 1
+        if tag == TAG_NONE:
+            values.append(None)
+        elif tag == TAG_FALSE:
+            values.append(False)
+        elif tag == TAG_TRUE:
+            values.append(True)
+        elif tag == TAG_INT:
+            values.append(struct.unpack_from("<i", payload, offset)[0])
+            offset += 4
+        elif tag == TAG_FLOAT:
+            values.append(struct.unpack_from("<d", payload, offset)[0])
+            offset += 8
+        elif tag == TAG_STR:
+            (length,) = struct.unpack_from("<H", payload, offset)
+            offset += 2
+            values.append(payload[offset:offset + length].decode("utf-8"))
+            offset += length
+        elif tag == TAG_LIST:
+            (length,) = struct.unpack_from("<H", payload, offset)
+            item_ids = struct.unpack_from(f"<{length}H", payload, offset + 2)
+            offset += 2 + 2 * length
+            values.append([values[item_id] for item_id in item_ids])
+        else:
+            raise ValueError(f"Tag giá trị không hợp lệ: {tag}")
+    return values, offset
+
+
+def decode_bundle(data: bytes) -> List[Dict[str, Any]]:
+    """
+    Đọc bundle thành list dict ngày (cùng cấu trúc CalendarStore.project với FIELD_PATHS)
+
+    Raises:
+        ValueError: không phải bundle hoặc khác version
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Bundle quá ngắn")
+    magic, version, codec_id, field_count, first_ordinal, raw_size = HEADER.unpack_from(data)
+    if magic != BUNDLE_MAGIC:
+        raise ValueError("Không phải bundle lịch")
+    if version != BUNDLE_VERSION:
+        raise ValueError(f"Bundle version {version} không hỗ trợ")
+
+    payload = _decompress(data[HEADER.size:], codec_id, raw_size)
+
+    offset = 0
+    fields: List[Tuple[str, ...]] = []
+    for _ in range(field_count):
+        length = payload[offset]
+        fields.append(tuple(payload[offset + 1:offset + 1 + length].decode("utf-8").split(".")))
+        offset += 1 + length
+
+    values, offset = _decode_values(payload, offset)
+
+    (day_count,) = struct.unpack_from("<I", payload, offset)
+    offset += 4
+    # Đọc cả khối record một lần bằng NumPy thay vì unpack từng ngày
+    dtype = np.dtype([("offset", "<u2"), ("lunar_day", "u1"), ("lunar_month", "u1"),
+                      ("lunar_year", "<u2"), ("ids", "<u2", (field_count,))])
+    records = np.frombuffer(payload, dtype=dtype, count=day_count, offset=offset)
+
+    ordinals = (records["offset"].astype(np.int64) + first_ordinal).tolist()
+    lunar_days = records["lunar_day"].tolist()
+    lunar_months = records["lunar_month"].tolist()
+    lunar_years = records["lunar_year"].tolist()
+    id_rows = records["ids"].tolist()
+
+    days = []
+    for index, ordinal in enumerate(ordinals):
+        day: Dict[str, Any] = {"solar_date": date.fromordinal(ordinal).isoformat()}
+        for path, value_id in zip(fields, id_rows[index]):
+            if value_id == MISSING_ID:
+                continue
+            if value_id == LUNAR_PACKED_ID:
+                value = f"{lunar_days[index]:02d}/{lunar_months[index]:02d}/{lunar_years[index]}"
+            else:
+                value = values[value_id]
+                if isinstance(value, list):
+                    value = list(value)
+            node = day
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = value
+        days.append(day)
+    return days
+
+
+def build_bundle(source: Any, start: date, end: date, codec: Optional[str] = None) -> bytes:
+    """Bundle các ngày có trong [start, end]; `source` là CalendarStore hoặc CalendarRepository (có iter_range)"""
+    return encode_bundle(source.iter_range(start, end, FIELD_PATHS), codec)
+
+
+def build_year_bundle(source: Any, year: int, to_year: Optional[int] = None,
+                      codec: Optional[str] = None) -> bytes:
+    """Bundle từ 1/1/year đến 31/12/to_year (mặc định một năm)"""
+    return build_bundle(source, date(year, 1, 1), date(to_year or year, 12, 31), codec)
+
+
+def write_year_bundles(data_dir: Path, codec: Optional[str] = None) -> Dict[int, Path]:
+    """Ghi data_dir/bundles/calendar_YYYY.lvnb cho mỗi năm có trong các file tháng (chạy lúc sinh dữ liệu)"""
+    store = CalendarStore(data_dir).load()
+    bundle_dir = Path(data_dir) / BUNDLE_DIRNAME
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+
+    written = {}
+    for year in sorted({year for year, _ in store.months}):
+        path = bundle_dir / f"calendar_{year}{BUNDLE_SUFFIX}"
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_bytes(build_year_bundle(store, year, codec=codec))
+        tmp_path.replace(path)
+        written[year] = path
+    return written
@@ -0,0 +1,423 @@
+"""
+Calendar store dạng cột trong bộ nhớ cho API
+Nạp toàn bộ file calendar_YYYY_MM.json lúc khởi động, các endpoint đọc từ mảng NumPy;
+refresh() chỉ đọc lại các file tháng có mtime/size đổi
+"""
+
+import json
+import re
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Các trường lá của một ngày theo schema của generator / CalendarDay.to_dict
+FIELD_PATHS: List[Tuple[str, ...]] = [
+    ("solar_date",),
+    ("lunar_date",),
+    ("day_of_week",),
+    ("can_chi", "day"),
+    ("can_chi", "month"),
+    ("can_chi", "year"),
+    ("can_chi", "hours"),
+    ("feng_shui", "good_hours"),
+    ("feng_shui", "bad_hours"),
+    ("feng_shui", "lucky_direction"),
+    ("feng_shui", "unlucky_direction"),
+    ("activities", "is_good_day"),
+    ("activities", "good_activities"),
+    ("activities", "bad_activities"),
+    ("holidays", "solar"),
+    ("holidays", "lunar"),
+    ("solar_term",),
+    ("notes",),
+    ("metadata", "source"),
+    ("metadata", "generated_at"),
+    ("metadata", "crawled_at"),
+]
+
+# Bit của cột flags
+FLAG_GOOD = 1      # activities.is_good_day is True
+FLAG_BAD = 2       # activities.is_good_day is False
+FLAG_HOLIDAY = 4   # có lễ dương hoặc âm
+
+MISSING = -1  # Trường không có trong dữ liệu gốc (khác với giá trị None)
+_ABSENT = object()
+
+MONTH_FILE_PATTERN = re.compile(r"calendar_(\d{4})_(\d{1,2})$")
+
+# Một hàng đã parse: (ordinal, flags, id từng trường theo FIELD_PATHS, trường ngoài schema)
+Row = Tuple[int, int, List[int], Optional[Dict[str, Any]]]
+
+
+class InternTable:
+    """Bảng giá trị dùng chung: mỗi giá trị khác nhau chỉ lưu một lần, cột chỉ giữ id"""
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._ids: Dict[Hashable, int] = {}
+
+    @staticmethod
+    def _key(value: Any) -> Hashable:
+        # Phân biệt True/1 và list/tuple để dựng lại đúng kiểu JSON
+        if isinstance(value, list):
+            return ('list', tuple(InternTable._key(item) for item in value))
+        return (type(value).__name__, value)
+
+    def intern(self, value: Any) -> int:
+        key = self._key(value)
+        value_id = self._ids.get(key)
+        if value_id is None:
+            value_id = len(self.values)
+            self._ids[key] = value_id
+            self.values.append(value)
+        return value_id
+
+    def find(self, value: Any) -> Optional[int]:
+        """Id của giá trị nếu đã có trong bảng"""
+        try:
+            return self._ids.get(self._key(value))
+        except TypeError:  # Giá trị không hash được (dict)
+            return None
+
+    def get(self, value_id: int) -> Any:
+        value = self.values[value_id]
+        # Trả bản sao cho list để caller sửa không ảnh hưởng store
+        return list(value) if isinstance(value, list) else value
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class CalendarStore:
+    """
+    Store dạng cột: mỗi ngày là một hàng, sắp xếp theo ordinal
+
+    - ordinals: ordinal dương lịch (date.toordinal()) của từng ngày
+    - columns[path]: id trong InternTable (MISSING nếu ngày đó không có trường)
+    - flags: bitset FLAG_GOOD / FLAG_BAD / FLAG_HOLIDAY
+    - months: (year, month) -> (vị trí đầu, vị trí cuối, thông tin cấp tháng)
+    """
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self.values = InternTable()
+        self.ordinals = np.zeros(0, dtype=np.int64)
+        self.flags = np.zeros(0, dtype=np.uint8)
+        self.columns: Dict[Tuple[str, ...], np.ndarray] = {}
+        self.extras: Dict[int, Dict[str, Any]] = {}
+        self.months: Dict[Tuple[int, int], Tuple[int, int, Dict[str, Any]]] = {}
+        self.version: Tuple[Tuple[str, int, int], ...] = ()
+        self._lock = threading.Lock()
+        # (year, month) -> ((tên file, mtime_ns, size), meta, hàng đã parse), để refresh chỉ đọc file đổi
+        self._files: Dict[Tuple[int, int], Tuple[Tuple[str, int, int], Dict[str, Any], List[Row]]] = {}
+        self._stats = {"hits": 0, "misses": 0, "reloads": 0, "removed": 0}
+        self._refresh_lock = threading.Lock()
+
+    def month_files(self) -> Dict[Tuple[int, int], Path]:
+        """(year, month) -> file; nếu có cả tên 1 và 2 chữ số thì ưu tiên tên 1 chữ số như load_month_data"""
+        files: Dict[Tuple[int, int], Path] = {}
+        if not self.data_dir.exists():
+            return files
+        for file_path in sorted(self.data_dir.glob("calendar_*.json")):
+            match = MONTH_FILE_PATTERN.match(file_path.stem)
+            if not match:
+                continue
+            key = (int(match.group(1)), int(match.group(2)))
+            if key in files and file_path.stem == f"calendar_{key[0]}_{key[1]:02d}":
+                continue
+            files[key] = file_path
+        return files
+
+    def load(self) -> 'CalendarStore':
+        """Đọc mọi file tháng và dựng lại các cột (thay thế dữ liệu cũ)"""
+        with self._refresh_lock:
+            self.values = InternTable()
+            self._files = {}
+        self.refresh()
+        return self
+
+    def refresh(self) -> bool:
+        """
+        Đọc lại chỉ các file tháng mới hoặc đã đổi (mtime/size) so với lần trước, bỏ tháng có file bị xoá
+
+        File không đổi dùng lại các hàng đã parse. File đang ghi dở (JSON lỗi) giữ bản cũ
+        và được thử lại ở lần sau. Trả về True nếu dữ liệu của store đổi.
+        """
+        with self._refresh_lock:
+            first = not self._files
+            files: Dict[Tuple[int, int], Tuple[Tuple[str, int, int], Dict[str, Any], List[Row]]] = {}
+            changed = False
+            for key, file_path in sorted(self.month_files().items()):
+                try:
+                    stat = file_path.stat()
+                except OSError:
+                    continue
+                signature = (file_path.name, stat.st_mtime_ns, stat.st_size)
+                cached = self._files.get(key)
+                if cached is not None and cached[0] == signature:
+                    self._stats["hits"] += 1
+                    files[key] = cached
+                    continue
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        document = json.load(f)
+                except (OSError, ValueError):
+                    if cached is not None:
+                        files[key] = cached
+                    continue
+                # Id cũ vẫn hợp lệ vì InternTable chỉ thêm; giá trị của bản cũ nằm lại tới lần load() sau
+                meta, rows = self._document_rows(self.values, document)
+                files[key] = (signature, meta, rows)
+                self._stats["reloads" if cached is not None else "misses"] += 1
+                changed = True
+
+            removed = len(set(self._files) - set(files))
+            if removed:
+                self._stats["removed"] += removed
+                changed = True
+
+            self._files = files
+            self.version = tuple(entry[0] for _, entry in sorted(files.items()))
+            if changed or first:
+                self._assemble(self.values, [(year, month, meta, rows)
+                                             for (year, month), (_, meta, rows) in sorted(files.items())])
+            return changed
+
+    def stats(self) -> Dict[str, int]:
+        """Bộ đếm theo file tháng: hits (dùng lại), misses (đọc lần đầu), reloads (đọc lại vì đổi), removed"""
+        return dict(self._stats, months=len(self._files))
+
+    def build(self, documents: List[Tuple[int, int, Dict[str, Any]]]) -> None:
+        """Dựng store từ list (year, month, document tháng)"""
+        values = InternTable()
+        parsed = []
+        for year, month, document in documents:
+            meta, rows = self._document_rows(values, document)
+            parsed.append((year, month, meta, rows))
+        self._assemble(values, parsed)
+
+    def _document_rows(self, values: InternTable, document: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Row]]:
+        """(meta tháng, các hàng (ordinal, flags, ids, extra)) của một document tháng"""
+        # Giữ chỗ cho "days" để document dựng lại có cùng thứ tự key
+        meta = {key: (None if key == "days" else value) for key, value in document.items()}
+        rows: List[Row] = []
+        for day in document.get("days", []):
+            try:
+                ordinal = date.fromisoformat(day["solar_date"]).toordinal()
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            ids = []
+            for path in FIELD_PATHS:
+                node: Any = day
+                for key in path:
+                    if not isinstance(node, dict) or key not in node:
+                        node = _ABSENT
+                        break
+                    node = node[key]
+                ids.append(MISSING if node is _ABSENT else values.intern(node))
+
+            activities = day.get("activities") or {}
+            holidays = day.get("holidays") or {}
+            flags = 0
+            if activities.get("is_good_day") is True:
+                flags |= FLAG_GOOD
+            elif activities.get("is_good_day") is False:
+                flags |= FLAG_BAD
+            if holidays.get("solar") or holidays.get("lunar"):
+                flags |= FLAG_HOLIDAY
+
+            extra = self._extra_fields(day)
+            rows.append((ordinal, flags, ids, extra))
+        return meta, rows
+
+    def _assemble(self, values: InternTable,
+                  parsed: List[Tuple[int, int, Dict[str, Any], List[Row]]]) -> None:
+        """Dựng các cột từ hàng của từng tháng rồi thay dữ liệu cũ"""
+        month_meta: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        # Một ngày xuất hiện ở nhiều file thì giữ bản cuối cùng
+        unique: Dict[int, Row] = {}
+        for year, month, meta, rows in parsed:
+            month_meta[(year, month)] = meta
+            for row in rows:
+                unique[row[0]] = row
+        ordered = [unique[ordinal] for ordinal in sorted(unique)]
+
+        ordinals = np.array([row[0] for row in ordered], dtype=np.int64)
+        flags = np.array([row[1] for row in ordered], dtype=np.uint8)
+        id_matrix = np.array([row[2] for row in ordered], dtype=np.int32).reshape(len(ordered), len(FIELD_PATHS))
+        columns = {path: id_matrix[:, index].copy() for index, path in enumerate(FIELD_PATHS)}
+        extras = {position: row[3] for position, row in enumerate(ordered) if row[3]}
+
+        months = {}
+        for (year, month), meta in month_meta.items():
+            first = date(year, month, 1).toordinal()
+            last = date(year + month // 12, month % 12 + 1, 1).toordinal()
+            start = int(np.searchsorted(ordinals, first, side='left'))
+            end = int(np.searchsorted(ordinals, last, side='left'))
+            months[(year, month)] = (start, end, meta)
+
+        with self._lock:
+            self.values = values
+            self.ordinals = ordinals
+            self.flags = flags
+            self.columns = columns
+            self.extras = extras
+            self.months = months
+
+    @staticmethod
+    def _extra_fields(day: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Các trường ngoài FIELD_PATHS, giữ nguyên để không mất dữ liệu"""
+        extra = {}
+        known_top = {path[0] for path in FIELD_PATHS}
+        nested_top = {path[0] for path in FIELD_PATHS if len(path) > 1}
+        for key, value in day.items():
+            if key not in known_top or (key in nested_top and not isinstance(value, dict)):
+                extra[key] = value
+            elif isinstance(value, dict) and key in nested_top:
+                known_sub = {path[1] for path in FIELD_PATHS if path[0] == key and len(path) > 1}
+                unknown = {sub: sub_value for sub, sub_value in value.items() if sub not in known_sub}
+                if unknown:
+                    extra.setdefault(key, {}).update(unknown)
+        return extra or None
+
+    # Truy vấn
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def position(self, value: date) -> Optional[int]:
+        """Vị trí hàng của một ngày, None nếu không có"""
+        ordinal = value.toordinal()
+        index = int(np.searchsorted(self.ordinals, ordinal))
+        if index < len(self.ordinals) and self.ordinals[index] == ordinal:
+            return index
+        return None
+
+    def value(self, path: Tuple[str, ...], position: int, default: Any = None) -> Any:
+        """Giá trị một trường của một hàng (`default` nếu ngày đó không có trường)"""
+        value_id = int(self.columns[path][position])
+        return default if value_id == MISSING else self.values.get(value_id)
+
+    def day(self, position: int) -> Dict[str, Any]:
+        """Dựng lại dict của một ngày theo đúng cấu trúc file gốc"""
+        result = self.project(position, FIELD_PATHS)
+
+        extra = self.extras.get(position)
+        if extra:
+            for key, value in extra.items():
+                if isinstance(value, dict) and isinstance(result.get(key), dict):
+                    result[key].update(value)
+                else:
+                    result[key] = value
+        return result
+
+    def project(self, position: int, paths: List[Tuple[str, ...]]) -> Dict[str, Any]:
+        """Dict của một ngày chỉ gồm các trường trong `paths` (bỏ qua trường ngày đó không có)"""
+        result: Dict[str, Any] = {}
+        for path in paths:
+            value_id = int(self.columns[path][position])
+            if value_id == MISSING:
+                continue
+            node = result
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = self.values.get(value_id)
+        return result
+
+    @staticmethod
+    def resolve_fields(fields: Optional[List[str]]) -> List[Tuple[str, ...]]:
+        """
+        Đổi danh sách tên trường ("lunar_date", "can_chi", "can_chi.day", ...) thành FIELD_PATHS tương ứng
+
+        Raises:
+            ValueError: tên trường không có trong schema
+        """
+        if not fields:
+            return list(FIELD_PATHS)
+
+        selected = set()
+        for field in fields:
+            prefix = tuple(part for part in field.strip().split(".") if part)
+            matches = [path for path in FIELD_PATHS if path[:len(prefix)] == prefix]
+            if not prefix or not matches:
+                raise ValueError(f"Unknown field: {field}")
+            selected.update(matches)
+        # Giữ thứ tự schema để output ổn định
+        return [path for path in FIELD_PATHS if path in selected]
+
+    @staticmethod
+    def field_names() -> List[str]:
+        """Tên trường hợp lệ cho tham số fields"""
+        names = []
+        for path in FIELD_PATHS:
+            for depth in range(1, len(path) + 1):
+                name = ".".join(path[:depth])
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def range_positions(self, start: date, end: date) -> range:
+        """Vị trí các ngày có dữ liệu trong [start, end]"""
+        low = int(np.searchsorted(self.ordinals, start.toordinal(), side='left'))
+        high = int(np.searchsorted(self.ordinals, end.toordinal(), side='right'))
+        return range(low, high)
+
+    def iter_range(self, start: date, end: date,
+                   paths: Optional[List[Tuple[str, ...]]] = None) -> Iterator[Dict[str, Any]]:
+        """Lần lượt từng ngày trong [start, end], chỉ dựng dict khi được lấy ra"""
+        for position in self.range_positions(start, end):
+            yield self.day(position) if paths is None else self.project(position, paths)
+
+    def get_day(self, value: date) -> Optional[Dict[str, Any]]:
+        position = self.position(value)
+        return None if position is None else self.day(position)
+
+    def has_month(self, year: int, month: int) -> bool:
+        return (year, month) in self.months
+
+    def month_slice(self, year: int, month: int) -> Optional[slice]:
+        entry = self.months.get((year, month))
+        return None if entry is None else slice(entry[0], entry[1])
+
+    def iter_days(self, positions) -> Iterator[Dict[str, Any]]:
+        for position in positions:
+            yield self.day(int(position))
+
+    def month_document(self, year: int, month: int) -> Optional[Dict[str, Any]]:
+        """Document tháng giống nội dung file calendar_YYYY_MM.json"""
+        entry = self.months.get((year, month))
+        if entry is None:
+            return None
+        start, end, meta = entry
+        document = dict(meta)
+        document["days"] = list(self.iter_days(range(start, end)))
+        return document
+
+    def month_positions(self, year: int, month: int, flag: int) -> np.ndarray:
+        """Vị trí các ngày trong tháng có bit `flag`"""
+        month_range = self.month_slice(year, month)
+        if month_range is None:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(self.flags[month_range] & flag) + month_range.start
+
+    def available_months(self) -> List[str]:
+        return [f"{year}-{month:02d}" for year, month in sorted(self.months)]
+
+
+_default_store: Optional[CalendarStore] = None
+_default_lock = threading.Lock()
+
+
+def get_calendar_store(data_dir: Optional[Path] = None) -> CalendarStore:
+    """Store dùng chung cho API, nạp lần đầu khi được gọi (CalendarStore.refresh để nạp file đổi)"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            if data_dir is None:
+                data_dir = Path(__file__).parent.parent / "data" / "api"
+            _default_store = CalendarStore(data_dir).load()
+        return _default_store
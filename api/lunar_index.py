@@ -0,0 +1,134 @@
+"""
+Inverted index ngày âm -> ngày dương cho /search
+Dựng lúc sinh dữ liệu (data/api/lunar_index.json), API chỉ nạp lên và tra dict
+"""
+
+import json
+import sys
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from lunar.bulk import solar_to_lunar_array
+from api.calendar_store import CalendarStore
+
+INDEX_FILENAME = "lunar_index.json"
+INDEX_VERSION = 1
+
+LunarKey = Tuple[int, int, bool]  # (ngày âm, tháng âm, nhuận)
+
+
+class LunarIndex:
+    """(lunar_day, lunar_month, is_leap) -> mảng ordinal dương lịch đã sắp xếp"""
+
+    def __init__(self, entries: Dict[LunarKey, np.ndarray]):
+        self.entries = entries
+
+    @classmethod
+    def from_ordinals(cls, ordinals: Iterable[int]) -> 'LunarIndex':
+        """Dựng index cho tập ngày dương lịch (thường là mọi ngày có trong data/api)"""
+        ordinals = np.unique(np.asarray(list(ordinals), dtype=np.int64))
+        lunar_day, lunar_month, _, is_leap = solar_to_lunar_array(ordinals)
+
+        # Sắp theo key rồi cắt thành từng nhóm, tránh vòng lặp Python trên từng ngày
+        keys = lunar_month.astype(np.int64) * 100 + lunar_day.astype(np.int64) + is_leap.astype(np.int64) * 10000
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+
+        entries = {}
+        for group in np.split(np.arange(len(order)), boundaries):
+            if len(group) == 0:
+                continue
+            key = int(sorted_keys[group[0]])
+            entries[(key % 100, key // 100 % 100, key >= 10000)] = np.sort(ordinals[order[group]])
+        return cls(entries)
+
+    def lookup(self, lunar_day: int, lunar_month: int, leap: Optional[bool] = None,
+               start: Optional[date] = None, end: Optional[date] = None) -> List[date]:
+        """Các ngày dương lịch ứng với ngày âm, lọc theo [start, end]; leap=None lấy cả tháng thường và nhuận"""
+        leaps = (False, True) if leap is None else (leap,)
+        parts = [self.entries[(lunar_day, lunar_month, flag)] for flag in leaps
+                 if (lunar_day, lunar_month, flag) in self.entries]
+        if not parts:
+            return []
+
+        ordinals = np.sort(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+        low = 0 if start is None else int(np.searchsorted(ordinals, start.toordinal(), side='left'))
+        high = len(ordinals) if end is None else int(np.searchsorted(ordinals, end.toordinal(), side='right'))
+        return [date.fromordinal(int(ordinal)) for ordinal in ordinals[low:high]]
+
+    def __len__(self) -> int:
+        return sum(len(ordinals) for ordinals in self.entries.values())
+
+    def save(self, path: Path) -> None:
+        """Ghi index ra JSON: key 'tháng-ngày' (thêm 'L' nếu tháng nhuận) -> list ordinal"""
+        payload = {
+            "version": INDEX_VERSION,
+            "entries": {
+                f"{month}-{day}{'L' if leap else ''}": ordinals.tolist()
+                for (day, month, leap), ordinals in sorted(self.entries.items(), key=lambda item: (item[0][1], item[0][0], item[0][2]))
+            }
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, separators=(',', ':'))
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['LunarIndex']:
+        """Đọc index đã dựng, None nếu không có hoặc khác version"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if payload.get("version") != INDEX_VERSION:
+            return None
+
+        entries = {}
+        for key, ordinals in payload.get("entries", {}).items():
+            leap = key.endswith('L')
+            month, day = key.rstrip('L').split('-')
+            entries[(int(day), int(month), leap)] = np.asarray(ordinals, dtype=np.int64)
+        return cls(entries)
+
+
+def build_lunar_index_file(data_dir: Path) -> LunarIndex:
+    """Dựng index từ mọi file calendar_*.json trong data_dir và ghi lunar_index.json (chạy lúc sinh dữ liệu)"""
+    store = CalendarStore(data_dir).load()
+    index = LunarIndex.from_ordinals(store.ordinals)
+    index.save(Path(data_dir) / INDEX_FILENAME)
+    return index
+
+
+_default_index: Optional[LunarIndex] = None
+_default_lock = threading.Lock()
+
+
+def get_lunar_index(data_dir: Path, ordinals: Optional[np.ndarray] = None, reload: bool = False) -> LunarIndex:
+    """
+    Index dùng chung cho API
+
+    Nạp lunar_index.json nếu còn mới hơn các file tháng; nếu thiếu hoặc cũ
+    thì dựng lại trong bộ nhớ từ `ordinals` (các ngày store đang có).
+    reload=True bỏ index cũ và làm lại bước trên (sau khi store được nạp lại).
+    """
+    global _default_index
+    with _default_lock:
+        if _default_index is None or reload:
+            _default_index = None
+            data_dir = Path(data_dir)
+            index_path = data_dir / INDEX_FILENAME
+            newest = max((file.stat().st_mtime for file in data_dir.glob("calendar_*.json")), default=0)
+            if index_path.exists() and index_path.stat().st_mtime >= newest:
+                _default_index = LunarIndex.load(index_path)
+            if _default_index is None:
+                _default_index = LunarIndex.from_ordinals(ordinals if ordinals is not None else [])
+        return _default_index
@@ -0,0 +1,243 @@
+"""
+Repository dữ liệu lịch cho API
+Endpoint chỉ đọc qua CalendarRepository nên nguồn dữ liệu (file JSON / SQLite) đổi được bằng API_SETTINGS['backend']
+"""
+
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from config.settings import API_SETTINGS
+from api.calendar_store import FLAG_BAD, FLAG_GOOD, FLAG_HOLIDAY, get_calendar_store
+from api.lunar_index import get_lunar_index
+
+FieldPath = Tuple[str, ...]
+Filters = Dict[FieldPath, Any]
+
+_ABSENT = object()
+
+
+def lookup(day: Dict[str, Any], path: FieldPath, default: Any = _ABSENT) -> Any:
+    """Giá trị theo path trong dict ngày, `default` nếu không có"""
+    node: Any = day
+    for key in path:
+        if not isinstance(node, dict) or key not in node:
+            return default
+        node = node[key]
+    return node
+
+
+def project_day(day: Dict[str, Any], paths: List[FieldPath]) -> Dict[str, Any]:
+    """Như CalendarStore.project nhưng trên dict ngày"""
+    result: Dict[str, Any] = {}
+    for path in paths:
+        value = lookup(day, path)
+        if value is _ABSENT:
+            continue
+        node = result
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return result
+
+
+def matches(day: Dict[str, Any], filters: Optional[Filters]) -> bool:
+    """Ngày thoả mọi điều kiện bằng của `filters`"""
+    return not filters or all(lookup(day, path) == value for path, value in filters.items())
+
+
+def flag_matches(day: Dict[str, Any], flag: int) -> bool:
+    """Ngày có bit FLAG_* (cùng quy tắc với cột flags của CalendarStore)"""
+    if flag == FLAG_GOOD:
+        return lookup(day, ("activities", "is_good_day"), None) is True
+    if flag == FLAG_BAD:
+        return lookup(day, ("activities", "is_good_day"), None) is False
+    if flag == FLAG_HOLIDAY:
+        return bool(lookup(day, ("holidays", "solar"), None) or lookup(day, ("holidays", "lunar"), None))
+    return False
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    """Ngày đầu và ngày cuối của tháng"""
+    first = date(year, month, 1)
+    last = date(year + month // 12, month % 12 + 1, 1).toordinal() - 1
+    return first, date.fromordinal(last)
+
+
+class CalendarRepository(ABC):
+    """Các truy vấn API cần; dict ngày trả về theo schema CalendarDay.to_dict và caller không được sửa"""
+
+    def warm(self) -> None:
+        """Nạp trước những gì cần (gọi lúc server khởi động)"""
+
+    def data_version(self) -> Hashable:
+        """Đổi khi dữ liệu nguồn đổi, để API bỏ các response đã tính sẵn"""
+        return 0
+
+    def refresh(self) -> Hashable:
+        """Nạp lại dữ liệu nếu nguồn đã đổi, trả về data_version hiện tại"""
+        return self.data_version()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Bộ đếm cache của backend (rỗng nếu backend không cache)"""
+        return {}
+
+    @abstractmethod
+    def months(self) -> List[Tuple[int, int]]:
+        """Các (year, month) có dữ liệu, tăng dần"""
+
+    def available_months(self) -> List[str]:
+        return [f"{year}-{month:02d}" for year, month in self.months()]
+
+    @abstractmethod
+    def has_month(self, year: int, month: int) -> bool:
+        ...
+
+    @abstractmethod
+    def month_document(self, year: int, month: int) -> Optional[Dict[str, Any]]:
+        """Document tháng giống nội dung file calendar_YYYY_MM.json, None nếu không có"""
+
+    @abstractmethod
+    def month_days(self, year: int, month: int, flag: int) -> List[Dict[str, Any]]:
+        """Các ngày trong tháng có bit FLAG_GOOD / FLAG_BAD / FLAG_HOLIDAY"""
+
+    @abstractmethod
+    def get_day(self, value: date) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def iter_range(self, start: date, end: date, paths: Optional[List[FieldPath]] = None,
+                   filters: Optional[Filters] = None) -> Iterator[Dict[str, Any]]:
+        """Các ngày có dữ liệu trong [start, end] thoả `filters`, chỉ gồm các trường `paths` nếu có"""
+
+    @abstractmethod
+    def search_lunar(self, lunar_day: int, lunar_month: int, leap: Optional[bool],
+                     start: date, end: date) -> List[Tuple[date, Optional[Dict[str, Any]]]]:
+        """(ngày dương, dict ngày hoặc None) ứng với ngày âm trong [start, end]"""
+
+
+class JsonRepository(CalendarRepository):
+    """Các file calendar_*.json trong data_dir, đọc qua CalendarStore dạng cột và LunarIndex"""
+
+    def __init__(self, data_dir: Path, check_interval: float = API_SETTINGS['data_check_interval']):
+        self.data_dir = Path(data_dir)
+        self.check_interval = check_interval
+        self._checked_at = float('-inf')
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def store(self):
+        return get_calendar_store(self.data_dir)
+
+    def warm(self) -> None:
+        get_lunar_index(self.data_dir, self.store.ordinals)
+
+    def data_version(self) -> Hashable:
+        # Version của lần nạp store, không stat lại file
+        return self.store.version
+
+    def refresh(self) -> Hashable:
+        """
+        Đọc lại các file tháng đã đổi (generator / production_data_manager ghi lại), chỉ file đó được parse lại
+
+        Stat mọi file tháng nên chỉ kiểm tra tối đa một lần mỗi check_interval giây.
+        """
+        with self._refresh_lock:
+            now = time.monotonic()
+            if now - self._checked_at < self.check_interval:
+                return self.data_version()
+            self._checked_at = now
+            store = self.store
+            if store.refresh():
+                get_lunar_index(self.data_dir, store.ordinals, reload=True)
+            return store.version
+
+    def cache_stats(self) -> Dict[str, int]:
+        return self.store.stats()
+
+    def months(self) -> List[Tuple[int, int]]:
+        return sorted(self.store.months)
+
+    def available_months(self) -> List[str]:
+        return self.store.available_months()
+
+    def has_month(self, year: int, month: int) -> bool:
+        return self.store.has_month(year, month)
+
+    def month_document(self, year: int, month: int) -> Optional[Dict[str, Any]]:
+        return self.store.month_document(year, month)
+
+    def month_days(self, year: int, month: int, flag: int) -> List[Dict[str, Any]]:
+        store = self.store
+        return [store.day(int(position)) for position in store.month_positions(year, month, flag)]
+
+    def get_day(self, value: date) -> Optional[Dict[str, Any]]:
+        return self.store.get_day(value)
+
+    def _filtered_positions(self, start: date, end: date, filters: Filters) -> np.ndarray:
+        """So sánh id đã intern trên cả cột thay vì dựng dict từng ngày"""
+        store = self.store
+        positions = store.range_positions(start, end)
+        selected = np.arange(positions.start, positions.stop)
+        for path, value in filters.items():
+            value_id = store.values.find(value)
+            if value_id is None:
+                return selected[:0]
+            selected = selected[store.columns[path][selected] == value_id]
+        return selected
+
+    def iter_range(self, start: date, end: date, paths: Optional[List[FieldPath]] = None,
+                   filters: Optional[Filters] = None) -> Iterator[Dict[str, Any]]:
+        if not filters:
+            yield from self.store.iter_range(start, end, paths)
+            return
+        store = self.store
+        for position in self._filtered_positions(start, end, filters).tolist():
+            yield store.day(position) if paths is None else store.project(position, paths)
+
+    def search_lunar(self, lunar_day: int, lunar_month: int, leap: Optional[bool],
+                     start: date, end: date) -> List[Tuple[date, Optional[Dict[str, Any]]]]:
+        store = self.store
+        index = get_lunar_index(self.data_dir, store.ordinals)
+        results = []
+        for solar in index.lookup(lunar_day, lunar_month, leap, start, end):
+            position = store.position(solar)
+            results.append((solar, store.day(position) if position is not None else None))
+        return results
+
+
+_default_repository: Optional[CalendarRepository] = None
+_default_lock = threading.Lock()
+
+
+def create_repository(backend: str, data_dir: Path) -> CalendarRepository:
+    """
+    Repository theo tên backend
+
+    Raises:
+        ValueError: backend không hỗ trợ
+    """
+    if backend == "json":
+        return JsonRepository(data_dir)
+    if backend == "sqlite":
+        from api.sqlite_repository import SqliteRepository
+        return SqliteRepository(API_SETTINGS['sqlite_path'], API_SETTINGS['sqlite_pool_size'])
+    raise ValueError(f"Unknown API backend: {backend}")
+
+
+def get_repository(data_dir: Optional[Path] = None) -> CalendarRepository:
+    """Repository dùng chung cho API, chọn theo API_SETTINGS['backend']"""
+    global _default_repository
+    with _default_lock:
+        if _default_repository is None:
+            if data_dir is None:
+                data_dir = Path(__file__).parent.parent / "data" / "api"
+            _default_repository = create_repository(API_SETTINGS['backend'], data_dir)
+        return _default_repository
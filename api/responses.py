@@ -0,0 +1,197 @@
+"""
+Response body tính sẵn cho các endpoint theo tháng
+Mỗi payload được serialize + nén một lần, kèm ETag mạnh để client đã cache nhận 304
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+MEDIA_TYPE = "application/json"
+CACHE_CONTROL = "public, max-age=3600, must-revalidate"
+# Body nhỏ hơn ngưỡng này thì nén không đáng
+MIN_COMPRESS_SIZE = 512
+
+
+def serialize(payload: Any) -> bytes:
+    """
+    Serialize ra JSON gọn (UTF-8, không khoảng trắng), cùng bytes với JSONResponse mặc định
+
+    Dùng orjson nếu có (nhanh hơn nhiều lần với các object lồng can_chi/feng_shui/activities),
+    ngược lại dùng json chuẩn.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse dùng `serialize`
+
+    Endpoint trả thẳng response này (thay vì dict) thì FastAPI bỏ qua jsonable_encoder,
+    bước duyệt lại toàn bộ payload chiếm phần lớn CPU của mỗi request.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return serialize(content)
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """Một payload đã serialize với các bản nén và ETag"""
+    identity: bytes
+    gzip: Optional[bytes]
+    br: Optional[bytes]
+    etag: str  # Giá trị hash, chưa có dấu ngoặc kép
+
+    @classmethod
+    def from_bytes(cls, body: bytes, compress: bool = True) -> 'EncodedBody':
+        """`compress=False` cho body đã nén sẵn (bundle nhị phân)"""
+        compressed_gzip = None
+        compressed_br = None
+        if compress and len(body) >= MIN_COMPRESS_SIZE:
+            # mtime=0 để cùng nội dung luôn ra cùng bytes
+            compressed_gzip = gzip.compress(body, compresslevel=6, mtime=0)
+            if BROTLI_AVAILABLE:
+                compressed_br = brotli.compress(body, quality=9)
+        return cls(body, compressed_gzip, compressed_br, hashlib.sha1(body).hexdigest())
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> 'EncodedBody':
+        return cls.from_bytes(serialize(payload))
+
+    def variant(self, encoding: str) -> Optional[bytes]:
+        return {"identity": self.identity, "gzip": self.gzip, "br": self.br}.get(encoding)
+
+    def tag(self, encoding: str) -> str:
+        """ETag mạnh cho từng bản mã hoá (bytes khác nhau thì tag khác nhau)"""
+        return f'"{self.etag}"' if encoding == "identity" else f'"{self.etag}-{encoding}"'
+
+
+def accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """Parse Accept-Encoding thành {encoding: q}"""
+    result: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        result[token] = quality
+    return result
+
+
+def choose_encoding(request: Request, encoded: EncodedBody) -> str:
+    """Chọn br > gzip > identity theo những gì client chấp nhận và bản nén đang có"""
+    accepted = accepted_encodings(request.headers.get("accept-encoding"))
+    wildcard = accepted.get("*", 0.0)
+    for encoding in ("br", "gzip"):
+        if encoded.variant(encoding) is not None and accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return "identity"
+
+
+def not_modified(request: Request, encoded: EncodedBody) -> bool:
+    """If-None-Match khớp ETag của bất kỳ bản mã hoá nào (so sánh yếu theo RFC 9110)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    known = {encoded.tag(encoding) for encoding in ("identity", "gzip", "br")}
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in known:
+            return True
+    return False
+
+
+def encoded_response(request: Request, encoded: EncodedBody, status_code: int = 200,
+                     media_type: str = MEDIA_TYPE) -> Response:
+    """Response 200 với bản nén phù hợp, hoặc 304 nếu client đã có đúng phiên bản"""
+    encoding = choose_encoding(request, encoded)
+    headers = {
+        "ETag": encoded.tag(encoding),
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding"
+    }
+    if not_modified(request, encoded):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=encoded.variant(encoding), status_code=status_code,
+                    media_type=media_type, headers=headers)
+
+
+class PrecomputedResponses:
+    """
+    Body đã mã hoá theo (kind, year, month)
+
+    `builders[kind](year, month)` trả về payload dict hoặc None nếu tháng không có dữ liệu.
+    """
+
+    def __init__(self, builders: Dict[str, Callable[[int, int], Optional[Dict[str, Any]]]]):
+        self.builders = builders
+        self._bodies: Dict[Hashable, EncodedBody] = {}
+        self._lock = threading.Lock()
+        # Tăng mỗi lần clear(); body dựng từ dữ liệu trước lần clear thì không được lưu lại
+        self._generation = 0
+
+    def get(self, kind: str, year: int, month: int) -> Optional[EncodedBody]:
+        key = (kind, year, month)
+        encoded = self._bodies.get(key)
+        if encoded is not None:
+            return encoded
+
+        generation = self._generation
+        payload = self.builders[kind](year, month)
+        if payload is None:
+            return None
+        encoded = EncodedBody.from_payload(payload)
+        with self._lock:
+            if generation == self._generation:
+                self._bodies[key] = encoded
+        return encoded
+
+    def warm(self, months) -> int:
+        """Tính sẵn mọi kind cho danh sách (year, month), trả về số body đã tạo"""
+        count = 0
+        for year, month in months:
+            for kind in self.builders:
+                if self.get(kind, year, month) is not None:
+                    count += 1
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._bodies.clear()
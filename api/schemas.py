@@ -0,0 +1,173 @@
+"""
+Kiểu dữ liệu của các payload API
+TypedDict chỉ dùng cho type checker và tài liệu, không validate lúc chạy nên không tốn CPU mỗi request
+"""
+
+from typing import List, Optional
+
+try:
+    from typing import TypedDict
+except ImportError:  # Python < 3.8
+    from typing_extensions import TypedDict
+
+
+class CanChiPayload(TypedDict, total=False):
+    day: Optional[str]
+    month: Optional[str]
+    year: Optional[str]
+    hours: List[str]
+
+
+class FengShuiPayload(TypedDict, total=False):
+    good_hours: List[str]
+    bad_hours: List[str]
+    lucky_direction: Optional[str]
+    unlucky_direction: Optional[str]
+
+
+class ActivitiesPayload(TypedDict, total=False):
+    is_good_day: Optional[bool]
+    good_activities: List[str]
+    bad_activities: List[str]
+
+
+class HolidaysPayload(TypedDict, total=False):
+    solar: Optional[str]
+    lunar: Optional[str]
+
+
+class DayMetadataPayload(TypedDict, total=False):
+    source: str
+    generated_at: str
+    crawled_at: Optional[str]
+
+
+class DayPayload(TypedDict, total=False):
+    """Một ngày, cùng schema với calendar_generator và CalendarDay.to_dict"""
+    solar_date: str
+    lunar_date: str
+    day_of_week: int
+    can_chi: CanChiPayload
+    feng_shui: FengShuiPayload
+    activities: ActivitiesPayload
+    holidays: HolidaysPayload
+    solar_term: Optional[str]
+    notes: Optional[str]
+    metadata: DayMetadataPayload
+
+
+class MonthDocument(TypedDict, total=False):
+    year: int
+    month: int
+    total_days: int
+    days: List[DayPayload]
+
+
+class CalendarResponse(TypedDict):
+    """/calendar/{year}/{month}"""
+    success: bool
+    data: MonthDocument
+    requested: str
+
+
+class HolidayItem(TypedDict):
+    date: str
+    lunar_date: str
+    solar_holiday: Optional[str]
+    lunar_holiday: Optional[str]
+
+
+class GoodDayItem(TypedDict):
+    date: str
+    lunar_date: str
+    can_chi_day: Optional[str]
+    good_activities: List[str]
+    good_hours: List[str]
+
+
+class BadDayItem(TypedDict):
+    date: str
+    lunar_date: str
+    can_chi_day: Optional[str]
+    bad_activities: List[str]
+    bad_hours: List[str]
+
+
+class HolidaysData(TypedDict):
+    year: int
+    month: int
+    holidays: List[HolidayItem]
+    total: int
+
+
+class GoodDaysData(TypedDict):
+    year: int
+    month: int
+    good_days: List[GoodDayItem]
+    total: int
+
+
+class BadDaysData(TypedDict):
+    year: int
+    month: int
+    bad_days: List[BadDayItem]
+    total: int
+
+
+class HolidaysResponse(TypedDict):
+    """/holidays/{year}/{month}"""
+    success: bool
+    data: HolidaysData
+
+
+class GoodDaysResponse(TypedDict):
+    """/good-days/{year}/{month}"""
+    success: bool
+    data: GoodDaysData
+
+
+class BadDaysResponse(TypedDict):
+    """/bad-days/{year}/{month}"""
+    success: bool
+    data: BadDaysData
+
+
+# "from" là từ khoá Python nên phải dùng cú pháp hàm
+RangeData = TypedDict("RangeData", {
+    "from": str,
+    "to": str,
+    "fields": Optional[List[str]],
+    "days": List[DayPayload],
+    "total": int
+})
+
+
+class RangeResponse(TypedDict):
+    """/calendar/range?format=json"""
+    success: bool
+    data: RangeData
+
+
+class DayResponse(TypedDict):
+    """/day/{year}/{month}/{day}"""
+    success: bool
+    data: DayPayload
+
+
+class SearchResult(TypedDict):
+    solar_date: str
+    lunar_date: Optional[str]
+    can_chi_day: Optional[str]
+    is_good_day: Optional[bool]
+
+
+class SearchData(TypedDict):
+    query: str
+    results: List[SearchResult]
+    total: int
+
+
+class SearchResponse(TypedDict):
+    """/search"""
+    success: bool
+    data: SearchData
@@ -0,0 +1,222 @@
+"""
+Backend SQLite cho API: đọc thẳng bảng lich_data do crawler / processor ghi (storage/lich_data.py)
+Connection chỉ đọc dùng chung trong pool, câu SQL cố định để sqlite3 dùng lại prepared statement,
+mọi truy vấn đi qua index của lich_data thay vì một file mỗi tháng
+"""
+
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import date
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+from config.settings import DATABASE_SETTINGS
+from models.calendar_models import CalendarDay, DataNormalizer
+from api.calendar_store import FLAG_BAD, FLAG_GOOD, FLAG_HOLIDAY
+from api.repository import (CalendarRepository, FieldPath, Filters, flag_matches, matches,
+                            month_bounds, project_day)
+
+ROW_COLUMNS = ('solar_date', 'lunar_date', 'can_chi_day', 'can_chi_month', 'can_chi_year',
+               'holiday', 'notes', 'source', 'crawled_at', 'is_good_day')
+SELECT_ROWS = f"SELECT {', '.join(ROW_COLUMNS)} FROM lich_data"
+
+# Mọi nguồn của các ngày được chọn, sắp theo ngày để ghép từng nhóm
+RANGE_SQL = f"{SELECT_ROWS} WHERE solar_date BETWEEN ? AND ? ORDER BY solar_date"
+DAY_SQL = f"{SELECT_ROWS} WHERE solar_date = ?"
+HAS_RANGE_SQL = "SELECT 1 FROM lich_data WHERE solar_date BETWEEN ? AND ? LIMIT 1"
+MONTHS_SQL = "SELECT DISTINCT substr(solar_date, 1, 7) FROM lich_data ORDER BY 1"
+# idx_lich_data_good_day; dòng is_good_day NULL (nguồn không cho biết) không khớp nên không vào ngày tốt / xấu
+FLAG_SQL = (f"{SELECT_ROWS} WHERE solar_date IN (SELECT solar_date FROM lich_data "
+            f"WHERE is_good_day = ? AND solar_date BETWEEN ? AND ?) ORDER BY solar_date")
+# idx_lich_data_holiday
+HOLIDAY_SQL = (f"{SELECT_ROWS} WHERE solar_date IN (SELECT solar_date FROM lich_data "
+               f"WHERE holiday IS NOT NULL AND solar_date BETWEEN ? AND ?) ORDER BY solar_date")
+# idx_lich_data_lunar
+LUNAR_SQL = (f"{SELECT_ROWS} WHERE solar_date IN (SELECT solar_date FROM lich_data "
+             f"WHERE lunar_month = ? AND lunar_day = ? AND lunar_leap IN (?, ?) AND solar_date BETWEEN ? AND ?) "
+             f"ORDER BY solar_date")
+
+# Trường của dict ngày lọc được bằng SQL (điều kiện cần, kết quả vẫn được kiểm lại sau khi ghép nguồn)
+FILTER_COLUMNS: Dict[FieldPath, str] = {
+    ("solar_date",): "solar_date",
+    ("lunar_date",): "lunar_date",
+    ("can_chi", "day"): "can_chi_day",
+    ("can_chi", "month"): "can_chi_month",
+    ("can_chi", "year"): "can_chi_year",
+    ("activities", "is_good_day"): "is_good_day",
+    ("holidays", "solar"): "holiday",
+    ("metadata", "source"): "source",
+    ("metadata", "crawled_at"): "crawled_at",
+}
+
+
+class ConnectionPool:
+    """
+    Pool connection chỉ đọc, giữ tối đa `size` connection rảnh
+
+    Hết connection rảnh thì mở thêm thay vì chờ: endpoint async chạy trên event loop,
+    chờ ở đây có thể chặn chính request đang giữ connection (stream).
+    """
+
+    def __init__(self, db_path: str, size: int = 4,
+                 cache_size_kb: int = DATABASE_SETTINGS['cache_size_kb'],
+                 busy_timeout_ms: int = DATABASE_SETTINGS['busy_timeout_ms']):
+        self.db_path = Path(db_path)
+        self.size = max(1, size)
+        self.cache_size_kb = cache_size_kb
+        self.busy_timeout_ms = busy_timeout_ms
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True,
+                               check_same_thread=False, timeout=self.busy_timeout_ms / 1000,
+                               cached_statements=64)
+        conn.execute('PRAGMA query_only=ON')
+        conn.execute(f'PRAGMA cache_size={-int(self.cache_size_kb)}')
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class SqliteRepository(CalendarRepository):
+    """
+    Bảng lich_data làm nguồn cho API
+
+    Một ngày có thể có nhiều dòng (mỗi nguồn một dòng): các dòng được ghép như
+    ProductionDataManager.merge_sources_by_month rồi chuẩn hoá bằng CalendarDay.from_raw_data.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = 4):
+        self.db_path = Path(db_path)
+        self.pool = ConnectionPool(db_path, pool_size)
+
+    def data_version(self) -> Hashable:
+        # WAL: ghi mới nằm trong file -wal trước khi checkpoint nên xét cả hai
+        version = []
+        for path in (self.db_path, self.db_path.with_name(self.db_path.name + '-wal')):
+            try:
+                stat = path.stat()
+            except OSError:
+                version.append(None)
+                continue
+            version.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(version)
+
+    def _query(self, sql: str, params: Sequence[Any]) -> List[Tuple[Any, ...]]:
+        if not self.db_path.exists():
+            return []
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _to_day(rows: List[Tuple[Any, ...]]) -> Dict[str, Any]:
+        records = [{column: value for column, value in zip(ROW_COLUMNS, row) if value is not None} for row in rows]
+        merged = DataNormalizer.merge_records(records)
+        day = CalendarDay.from_raw_data(merged).to_dict()
+        if day["activities"]["is_good_day"] is None and merged.get("is_good_day") is not None:
+            day["activities"]["is_good_day"] = bool(merged["is_good_day"])
+        return day
+
+    def _iter_rows(self, sql: str, params: Sequence[Any]) -> Iterator[Tuple[Any, ...]]:
+        """Đọc dần theo cursor (cho stream khoảng dài), connection được giữ đến khi đọc hết"""
+        if not self.db_path.exists():
+            return
+        with self.pool.connection() as conn:
+            cursor = conn.execute(sql, params)
+            try:
+                yield from cursor
+            finally:
+                # Stream bị ngắt giữa chừng: đóng cursor để kết thúc read transaction trước khi trả connection
+                cursor.close()
+
+    def _days(self, sql: str, params: Sequence[Any]) -> Iterator[Dict[str, Any]]:
+        """Dict ngày từ các dòng đã sắp theo solar_date"""
+        for _, rows in groupby(self._iter_rows(sql, params), key=lambda row: row[0]):
+            yield self._to_day(list(rows))
+
+    def months(self) -> List[Tuple[int, int]]:
+        months = []
+        for (prefix,) in self._query(MONTHS_SQL, ()):
+            try:
+                months.append((int(prefix[:4]), int(prefix[5:7])))
+            except (TypeError, ValueError):
+                continue
+        return months
+
+    def has_month(self, year: int, month: int) -> bool:
+        first, last = month_bounds(year, month)
+        return bool(self._query(HAS_RANGE_SQL, (first.isoformat(), last.isoformat())))
+
+    def month_document(self, year: int, month: int) -> Optional[Dict[str, Any]]:
+        first, last = month_bounds(year, month)
+        days = list(self._days(RANGE_SQL, (first.isoformat(), last.isoformat())))
+        if not days:
+            return None
+        return {"year": year, "month": month, "total_days": len(days), "days": days}
+
+    def month_days(self, year: int, month: int, flag: int) -> List[Dict[str, Any]]:
+        first, last = month_bounds(year, month)
+        bounds = (first.isoformat(), last.isoformat())
+        if flag == FLAG_HOLIDAY:
+            candidates = self._days(HOLIDAY_SQL, bounds)
+        elif flag in (FLAG_GOOD, FLAG_BAD):
+            candidates = self._days(FLAG_SQL, (1 if flag == FLAG_GOOD else 0,) + bounds)
+        else:
+            return []
+        return [day for day in candidates if flag_matches(day, flag)]
+
+    def get_day(self, value: date) -> Optional[Dict[str, Any]]:
+        rows = self._query(DAY_SQL, (value.isoformat(),))
+        return self._to_day(rows) if rows else None
+
+    def iter_range(self, start: date, end: date, paths: Optional[List[FieldPath]] = None,
+                   filters: Optional[Filters] = None) -> Iterator[Dict[str, Any]]:
+        sql, params = RANGE_SQL, [start.isoformat(), end.isoformat()]
+        conditions = []
+        for path, value in (filters or {}).items():
+            column = FILTER_COLUMNS.get(path)
+            if column is None or isinstance(value, (list, dict)):
+                continue
+            if value is None:
+                conditions.append(f"{column} IS NULL")
+            else:
+                conditions.append(f"{column} = ?")
+                params.append(int(value) if isinstance(value, bool) else value)
+        if conditions:
+            sql = (f"{SELECT_ROWS} WHERE solar_date IN (SELECT solar_date FROM lich_data "
+                   f"WHERE solar_date BETWEEN ? AND ? AND {' AND '.join(conditions)}) ORDER BY solar_date")
+
+        for day in self._days(sql, params):
+            if matches(day, filters):
+                yield day if paths is None else project_day(day, paths)
+
+    def search_lunar(self, lunar_day: int, lunar_month: int, leap: Optional[bool],
+                     start: date, end: date) -> List[Tuple[date, Optional[Dict[str, Any]]]]:
+        leaps = (0, 1) if leap is None else (int(leap), int(leap))
+        days = self._days(LUNAR_SQL, (lunar_month, lunar_day) + leaps + (start.isoformat(), end.isoformat()))
+        return [(date.fromisoformat(day["solar_date"]), day) for day in days]
@@ -0,0 +1,52 @@
+"""
+Stream response cho khoảng ngày lớn
+Ngày được dựng và serialize dần theo lô, bộ nhớ không tăng theo độ dài khoảng
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator
+
+sys.path.append(str(Path(__file__).parent.parent))
+from api.responses import serialize
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Số ngày gom vào một chunk, tránh gửi quá nhiều chunk nhỏ
+BATCH_SIZE = 64
+
+
+def iter_ndjson(days: Iterable[Dict[str, Any]], batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    """Mỗi ngày một dòng JSON"""
+    batch = []
+    for day in days:
+        batch.append(serialize(day))
+        if len(batch) >= batch_size:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
+def iter_json_envelope(envelope: Dict[str, Any], days: Iterable[Dict[str, Any]],
+                       batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Cùng cấu trúc JSON như response thường:
+    {"success": true, "data": {...envelope, "days": [...], "total": N}}
+    nhưng mảng "days" được ghi dần thay vì dựng toàn bộ trước
+    """
+    head = serialize({"success": True, "data": envelope})
+    # Mở lại object "data" (bỏ "}}" cuối) để nối thêm "days"
+    yield head[:-2] + (b',"days":[' if envelope else b'"days":[')
+
+    total = 0
+    batch = []
+    for day in days:
+        batch.append(serialize(day))
+        total += 1
+        if len(batch) >= batch_size:
+            yield (b"," if total > len(batch) else b"") + b",".join(batch)
+            batch = []
+    if batch:
+        yield (b"," if total > len(batch) else b"") + b",".join(batch)
+
+    yield b'],"total":' + str(total).encode() + b"}}"
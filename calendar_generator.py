@@ -4,17 +4,26 @@ Tạo dữ liệu lịch âm Việt Nam dựa trên thuật toán
 """
 
 import json
-from datetime import datetime, timedelta
+from datetime import date as date_type, datetime, timedelta
 from pathlib import Path
+from typing import Dict, List
 import calendar
 
+import numpy as np
+
+from lunar import format_lunar_date, solar_to_lunar
+from lunar import can_chi as can_chi_calc
+from lunar.astronomy import JD_ORDINAL_OFFSET
+from lunar.bulk import GOOD_DAY_SCORE, date_parts, dates_to_ordinals, day_scores, solar_term_array, solar_to_lunar_array
+from lunar.solar_terms import TERM_NAMES, solar_term_for_date
+
 class VietnameseLunarCalendar:
     """Generator cho lịch âm Việt Nam"""
     
     def __init__(self):
         # Dữ liệu can chi
-        self.can = ["Giáp", "Ất", "Bính", "Đinh", "Mậu", "Kỷ", "Canh", "Tân", "Nhâm", "Quý"]
-        self.chi = ["Tí", "Sửu", "Dần", "Mão", "Thìn", "Tỵ", "Ngọ", "Mùi", "Thân", "Dậu", "Tuất", "Hợi"]
+        self.can = list(can_chi_calc.CAN)
+        self.chi = list(can_chi_calc.CHI)
         
         # Ngày lễ cố định dương lịch
         self.solar_holidays = {
@@ -30,7 +39,7 @@ class VietnameseLunarCalendar:
             "12-25": "Lễ Giáng sinh"
         }
         
-        # Ngày lễ âm lịch (tính gần đúng)
+        # Ngày lễ âm lịch (MM-DD)
         self.lunar_holidays = {
             "01-01": "Tết Nguyên đán",
             "01-15": "Tết Nguyên tiêu",
@@ -67,39 +76,20 @@ class VietnameseLunarCalendar:
         ]
     
     def get_can_chi_day(self, date):
-        """Tính can chi của ngày (tính gần đúng)"""
-        # Công thức đơn giản để tính can chi
-        days_from_epoch = (date - datetime(1900, 1, 1)).days
-        can_index = (days_from_epoch + 6) % 10  # Offset để align với lịch thực
-        chi_index = (days_from_epoch + 8) % 12  # Offset để align với lịch thực
-        return f"{self.can[can_index]} {self.chi[chi_index]}"
+        """Tính can chi của ngày"""
+        return can_chi_calc.can_chi_day(date)
+    
+    def get_can_chi(self, date):
+        """Can chi ngày, tháng, năm theo âm lịch"""
+        return can_chi_calc.can_chi_for_date(date.date() if isinstance(date, datetime) else date)
     
     def get_lunar_date(self, solar_date):
-        """Tính ngày âm lịch (gần đúng)"""
-        # Đây là thuật toán đơn giản, không chính xác 100%
-        # Trong thực tế cần thuật toán phức tạp hơn
-        year = solar_date.year
-        month = solar_date.month
-        day = solar_date.day
-        
-        # Offset gần đúng giữa âm và dương lịch
-        lunar_offset = -30 if month <= 6 else -35
-        
-        # Tính ngày âm gần đúng
-        total_days = day + lunar_offset
-        if total_days <= 0:
-            lunar_month = month - 1 if month > 1 else 12
-            lunar_year = year if month > 1 else year - 1
-            lunar_day = 30 + total_days
-        else:
-            lunar_month = month
-            lunar_year = year
-            lunar_day = total_days
-        
-        # Đảm bảo lunar_day trong khoảng hợp lệ
-        lunar_day = max(1, min(30, lunar_day))
-        
-        return f"{lunar_day:02d}/{lunar_month:02d}/{lunar_year}"
+        """Tính ngày âm lịch (thuật toán thiên văn, múi giờ UTC+7)"""
+        return str(solar_to_lunar(solar_date.date() if isinstance(solar_date, datetime) else solar_date))
+    
+    def get_solar_term(self, date):
+        """Tiết khí của ngày"""
+        return solar_term_for_date(date.date() if isinstance(date, datetime) else date)
     
     def get_feng_shui_info(self, date):
         """Lấy thông tin phong thủy cho ngày"""
@@ -122,8 +112,11 @@ class VietnameseLunarCalendar:
     def get_activities(self, date, feng_shui_info):
         """Lấy hoạt động nên/không nên làm"""
         day_value = (date.day + date.month) % len(self.good_activities)
-        
-        if feng_shui_info["is_good_day"]:
+        return self.select_activities(day_value, feng_shui_info["is_good_day"])
+    
+    def select_activities(self, day_value, is_good_day):
+        """Chọn hoạt động theo day_value = (ngày + tháng) % số hoạt động tốt"""
+        if is_good_day:
             good_count = 3 + (day_value % 3)
             selected_good = [self.good_activities[(day_value + i) % len(self.good_activities)] 
                            for i in range(good_count)]
@@ -147,10 +140,11 @@ class VietnameseLunarCalendar:
         
         solar_holiday = self.solar_holidays.get(date_str)
         
-        # Tính lunar holiday gần đúng (cần thuật toán chính xác hơn)
-        lunar_date_str = self.get_lunar_date(date)
-        lunar_md = lunar_date_str.split('/')[0] + "-" + lunar_date_str.split('/')[1]
-        lunar_holiday = self.lunar_holidays.get(lunar_md)
+        # Ngày lễ âm lịch không tính trong tháng nhuận
+        lunar = solar_to_lunar(date.date() if isinstance(date, datetime) else date)
+        lunar_holiday = None
+        if not lunar.is_leap:
+            lunar_holiday = self.lunar_holidays.get(f"{lunar.month:02d}-{lunar.day:02d}")
         
         return {
             "solar": solar_holiday,
@@ -160,56 +154,145 @@ class VietnameseLunarCalendar:
     def generate_month_data(self, year, month):
         """Tạo dữ liệu cho một tháng"""
         days_in_month = calendar.monthrange(year, month)[1]
-        month_data = {
+        return {
             "year": year,
             "month": month,
             "total_days": days_in_month,
-            "days": []
+            "days": self.generate_range(date_type(year, month, 1), date_type(year, month, days_in_month))
+        }
+    
+    def compute_range(self, start, end) -> Dict[str, np.ndarray]:
+        """
+        Tính mọi trường của các ngày trong [start, end] dưới dạng cột NumPy
+        
+        Cùng công thức với get_can_chi / get_solar_term / get_feng_shui_info /
+        get_activities / check_holiday nhưng làm trên cả mảng ordinal một lần.
+        """
+        dates = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+        ordinals = dates_to_ordinals(dates)
+        
+        years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+        months, days, weekdays = date_parts(dates)
+        
+        lunar_day, lunar_month, lunar_year, is_leap = solar_to_lunar_array(ordinals)
+        
+        day_can, day_chi = can_chi_calc.day_index(ordinals + JD_ORDINAL_OFFSET)
+        month_can, month_chi = can_chi_calc.month_index(lunar_month.astype(np.int64), lunar_year.astype(np.int64))
+        year_can, year_chi = can_chi_calc.year_index(lunar_year.astype(np.int64))
+        day_score = day_scores(dates)
+        
+        return {
+            "dates": dates,
+            "months": months,
+            "days": days,
+            "years": years,
+            "weekdays": weekdays,
+            "lunar_day": lunar_day,
+            "lunar_month": lunar_month,
+            "lunar_year": lunar_year,
+            "is_leap": is_leap,
+            "day_can": day_can,
+            "day_chi": day_chi,
+            "month_can": month_can,
+            "month_chi": month_chi,
+            "year_can": year_can,
+            "year_chi": year_chi,
+            "day_score": day_score,
+            "is_good_day": day_score >= GOOD_DAY_SCORE,
+            "activity_index": (days + months) % len(self.good_activities),
+            "solar_term": solar_term_array(ordinals),
+            "solar_md": months * 100 + days,
+            "lunar_md": np.where(is_leap, 0, lunar_month.astype(np.int64) * 100 + lunar_day)
+        }
+    
+    def materialize_days(self, columns: Dict[str, np.ndarray]) -> List[Dict]:
+        """Dựng list dict theo schema của generate_month_data từ các cột đã tính"""
+        solar_holidays = {int(key.replace('-', '')): name for key, name in self.solar_holidays.items()}
+        lunar_holidays = {int(key.replace('-', '')): name for key, name in self.lunar_holidays.items()}
+        # Hoạt động chỉ phụ thuộc (activity_index, is_good_day) nên tính sẵn mọi tổ hợp
+        activity_table = {
+            (day_value, is_good_day): self.select_activities(day_value, is_good_day)
+            for day_value in range(len(self.good_activities))
+            for is_good_day in (True, False)
         }
+        can_chi_names = [[f"{can} {chi}" for chi in self.chi] for can in self.can]
+        # Can chi 12 giờ chỉ phụ thuộc can của ngày
+        hour_names = [can_chi_calc.hour_names(can) for can in range(10)]
+        generated_at = datetime.now().isoformat()
         
-        for day in range(1, days_in_month + 1):
-            date = datetime(year, month, day)
-            lunar_date = self.get_lunar_date(date)
-            can_chi = self.get_can_chi_day(date)
-            feng_shui = self.get_feng_shui_info(date)
-            activities = self.get_activities(date, feng_shui)
-            holidays = self.check_holiday(date)
+        result = []
+        rows = zip(
+            np.datetime_as_string(columns["dates"]).tolist(),
+            columns["weekdays"].tolist(),
+            columns["lunar_day"].tolist(),
+            columns["lunar_month"].tolist(),
+            columns["lunar_year"].tolist(),
+            columns["is_leap"].tolist(),
+            columns["day_can"].tolist(),
+            columns["day_chi"].tolist(),
+            columns["month_can"].tolist(),
+            columns["month_chi"].tolist(),
+            columns["year_can"].tolist(),
+            columns["year_chi"].tolist(),
+            columns["day_score"].tolist(),
+            columns["is_good_day"].tolist(),
+            columns["activity_index"].tolist(),
+            columns["solar_term"].tolist(),
+            columns["solar_md"].tolist(),
+            columns["lunar_md"].tolist()
+        )
+        for (solar_date, weekday, lunar_day, lunar_month, lunar_year, is_leap, day_can, day_chi,
+             month_can, month_chi, year_can, year_chi,
+             day_score, is_good_day, activity_index, solar_term, solar_md, lunar_md) in rows:
+            can_chi = can_chi_names[day_can][day_chi]
+            good_hours = self.good_hours_by_day[weekday]
+            activities = activity_table[(activity_index, is_good_day)]
             
-            day_data = {
-                "solar_date": date.strftime("%Y-%m-%d"),
-                "lunar_date": lunar_date,
-                "day_of_week": date.weekday() + 1,  # 1=Monday, 7=Sunday
+            result.append({
+                "solar_date": solar_date,
+                "lunar_date": format_lunar_date(lunar_day, lunar_month, lunar_year, is_leap),
+                "day_of_week": weekday + 1,  # 1=Monday, 7=Sunday
                 "can_chi": {
                     "day": can_chi,
-                    "month": None,  # Cần thuật toán phức tạp hơn
-                    "year": None
+                    "month": can_chi_names[month_can][month_chi],
+                    "year": can_chi_names[year_can][year_chi],
+                    "hours": list(hour_names[day_can])
                 },
                 "feng_shui": {
-                    "good_hours": feng_shui["good_hours"],
-                    "bad_hours": feng_shui["bad_hours"],
-                    "lucky_direction": feng_shui["lucky_direction"],
-                    "unlucky_direction": feng_shui["unlucky_direction"]
+                    "good_hours": list(good_hours),
+                    "bad_hours": [],
+                    "lucky_direction": "Đông Nam" if day_score >= 7 else "Tây Nam",
+                    "unlucky_direction": "Tây Bắc" if day_score < 5 else "Đông Bắc"
                 },
                 "activities": {
-                    "is_good_day": feng_shui["is_good_day"],
-                    "good_activities": activities["good_activities"],
-                    "bad_activities": activities["bad_activities"]
+                    "is_good_day": is_good_day,
+                    "good_activities": list(activities["good_activities"]),
+                    "bad_activities": list(activities["bad_activities"])
+                },
+                "holidays": {
+                    "solar": solar_holidays.get(solar_md),
+                    "lunar": lunar_holidays.get(lunar_md)
                 },
-                "holidays": holidays,
-                "solar_term": None,  # Cần data 24 tiết khí
-                "notes": f"Ngày {'tốt' if feng_shui['is_good_day'] else 'bình thường'}. Can chi: {can_chi}. Giờ hoàng đạo: {', '.join(feng_shui['good_hours'])}.",
+                "solar_term": TERM_NAMES[solar_term],
+                "notes": f"Ngày {'tốt' if is_good_day else 'bình thường'}. Can chi: {can_chi}. Giờ hoàng đạo: {', '.join(good_hours)}.",
                 "metadata": {
                     "source": "vietnamese_lunar_generator",
-                    "generated_at": datetime.now().isoformat()
+                    "generated_at": generated_at
                 }
-            }
-            
-            month_data["days"].append(day_data)
+            })
         
-        return month_data
+        return result
+    
+    def generate_range(self, start, end) -> List[Dict]:
+        """Tạo dữ liệu cho mọi ngày trong [start, end] (gồm cả end), tính dạng vector"""
+        return self.materialize_days(self.compute_range(start, end))
 
 def generate_calendar_data():
     """Tạo dữ liệu lịch cho nhiều tháng"""
+    # Chỉ bước xuất dữ liệu cho API cần tới api/, import ở đây để dùng generator không kéo theo cả gói api
+    from api.bundle import write_year_bundles
+    from api.lunar_index import build_lunar_index_file
+    
     generator = VietnameseLunarCalendar()
     
     # Tạo data cho 2024 (có nhiều tháng)
@@ -261,11 +344,20 @@ def generate_calendar_data():
     
     print(f"✅ Saved {holidays_file} with {len(holidays_2024)} holidays")
     
+    # Index ngày âm -> ngày dương cho /search, API nạp lên lúc khởi động
+    lunar_index = build_lunar_index_file(Path("data/api"))
+    print(f"✅ Saved data/api/lunar_index.json with {len(lunar_index)} days")
+    
+    # Bundle nhị phân theo năm cho Android tải offline
+    for year, bundle_file in write_year_bundles(Path("data/api")).items():
+        print(f"✅ Saved {bundle_file} ({bundle_file.stat().st_size / 1024:.1f} KB)")
+    
     print("\n🎉 Calendar data generation completed!")
     print("📁 Generated files:")
     print(f"  • Calendar data: {len(months_to_generate)} months")
     print(f"  • Good days data: {len(months_to_generate)} months") 
     print(f"  • Holidays data: 1 year")
+    print(f"  • Offline bundles: data/api/bundles/")
 
 if __name__ == "__main__":
     generate_calendar_data()
@@ -22,6 +22,7 @@ CRAWLER_SETTINGS = {
     'delay': 1.0,  # Giây nghỉ giữa các request
     'max_retries': 3,  # Số lần retry
     'timeout': 30,  # Timeout cho request (giây)
+    'month_cache_ttl': 3600,  # Giây giữ kết quả crawl_month cho các lần crawl_date
     'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
@@ -48,7 +49,11 @@ WEBSITES = {
 DATABASE_SETTINGS = {
     'sqlite_path': str(DATA_DIR / "lich_database.db"),
     'backup_enabled': True,
-    'backup_dir': str(DATA_DIR / "backups")
+    'backup_dir': str(DATA_DIR / "backups"),
+    'batch_size': 1000,  # Số dòng mỗi executemany / transaction
+    'synchronous': "NORMAL",  # NORMAL đủ an toàn với WAL, FULL nếu cần bền tuyệt đối khi mất điện
+    'cache_size_kb': 16384,  # PRAGMA cache_size của mỗi connection
+    'busy_timeout_ms': 5000  # Chờ lock thay vì lỗi ngay khi có tiến trình khác đang ghi
 }
 
 # Scheduler settings
@@ -86,11 +91,45 @@ VALIDATION_RULES = {
 
 # Rate limiting để tôn trọng servers
 RATE_LIMITS = {
-    'requests_per_minute': 30,
+    'requests_per_minute': 30,  # Budget token-bucket cho mỗi host
+    'burst_size': 5,  # Số request được phép dồn liền khi bucket đầy
     'concurrent_requests': 2,
     'respect_robots_txt': True
 }
 
+# HTTP cache cho crawler (conditional GET với ETag/Last-Modified)
+HTTP_CACHE = {
+    'enabled': True,
+    'path': str(DATA_DIR / "cache" / "http_cache.db"),
+    'ttl_seconds': 6 * 3600,  # Trong TTL dùng thẳng cache, hết TTL thì revalidate
+    'max_size_mb': 200  # Vượt dung lượng thì xoá entry ít dùng nhất (LRU)
+}
+
+# Browser pool cho các crawler dùng Playwright
+BROWSER_POOL = {
+    'max_pages': 4,  # Số page mở đồng thời tối đa
+    'max_page_uses': 50,  # Đóng page sau số lần dùng này
+    'max_browser_uses': 500,  # Khởi động lại Chromium sau số lần lấy page này
+    'headless': True
+}
+
+# Tính lịch âm cục bộ
+LUNAR_SETTINGS = {
+    'solar_terms_cache': str(DATA_DIR / "cache" / "solar_terms.json")  # Thời điểm 24 tiết khí theo năm
+}
+
+# API server cho Android/web
+API_SETTINGS = {
+    'data_check_interval': 2.0,  # Giây giữa hai lần kiểm tra file tháng đổi (backend json)
+    'max_range_days': 3660,  # Khoảng ngày tối đa của /calendar/range
+    'max_bundle_years': 10,  # Số năm tối đa trong một bundle nhị phân /bundle/{year}
+    'max_search_years': 100,  # Số năm tối đa /search quét trong một request
+    'bundle_cache_size': 32,  # Số bundle đã dựng giữ trong bộ nhớ
+    'backend': os.getenv('CALENDAR_API_BACKEND', 'json'),  # json: data/api/calendar_*.json, sqlite: bảng lich_data
+    'sqlite_path': DATABASE_SETTINGS['sqlite_path'],  # Database cho backend sqlite
+    'sqlite_pool_size': 4  # Số connection chỉ đọc dùng chung của backend sqlite
+}
+
 # Error handling
 ERROR_HANDLING = {
     'retry_delays': [1, 2, 4],  # Exponential backoff (seconds)
@@ -0,0 +1,67 @@
+"""
+Event loop chạy nền dùng chung cho các wrapper đồng bộ trong crawlers/
+Tránh tạo/huỷ event loop mỗi lần crawl_date/crawl_month được gọi từ code sync
+"""
+
+import atexit
+import asyncio
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+from .browser_pool import close_browser_pool
+
+T = TypeVar('T')
+
+
+class AsyncLoopRunner:
+    """Một event loop sống lâu trên daemon thread, nhận coroutine từ mọi thread"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="crawler-event-loop", daemon=True)
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+            return self._loop
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Chạy coroutine trên loop nền và chờ kết quả (blocking)"""
+        loop = self._ensure_started()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Không thể gọi AsyncLoopRunner.run từ chính event loop nền")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    def stop(self) -> None:
+        """Đóng browser pool trên loop nền rồi dừng loop"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+
+        if loop is None or loop.is_closed():
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_browser_pool(), loop).result(30)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        loop.close()
+
+
+_runner = AsyncLoopRunner()
+atexit.register(_runner.stop)
+
+
+def run_sync(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Chạy coroutine trên event loop nền dùng chung"""
+    return _runner.run(coro, timeout)
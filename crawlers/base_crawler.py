@@ -3,17 +3,34 @@ Base crawler class cho tất cả các crawler
 Cung cấp các chức năng chung như retry, logging, rate limiting
 """
 
+import sys
 import time
 import logging
+import threading
+import calendar
+import asyncio
+import aiohttp
 import requests
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Any, Tuple, TypeVar
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 import json
-import sqlite3
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent))
+from config.settings import CRAWLER_SETTINGS, RATE_LIMITS
+from crawlers.rate_limiter import get_rate_limiter
+from crawlers.http_cache import get_http_cache
+from crawlers.month_cache import get_month_cache
+from lunar.can_chi import lunar_with_can_chi
+from storage.lich_data import lich_data_rows, lich_data_sink
+
+T = TypeVar('T')
+R = TypeVar('R')
+
 # Tạo thư mục logs nếu chưa có
 Path('logs').mkdir(exist_ok=True)
 
@@ -57,33 +74,92 @@ class LichData:
 class BaseCrawler(ABC):
     """Base class cho tất cả các crawler"""
     
-    def __init__(self, delay: float = 1.0, max_retries: int = 3):
+    # Semaphore theo host, dùng chung giữa mọi crawler để giới hạn số request song song
+    _host_slots: Dict[str, threading.BoundedSemaphore] = {}
+    _host_slots_lock = threading.Lock()
+    
+    def __init__(self, delay: float = 1.0, max_retries: int = 3,
+                 concurrent_requests: Optional[int] = None):
         self.delay = delay
         self.max_retries = max_retries
+        self.concurrent_requests = max(1, concurrent_requests or RATE_LIMITS['concurrent_requests'])
         self.logger = logging.getLogger(self.__class__.__name__)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         self.data: List[LichData] = []
+        self.http_cache = get_http_cache()
+        # Đánh dấu thread đang là worker của run_concurrently để không mở pool lồng nhau
+        self._pool_worker = threading.local()
         
         # Tạo thư mục logs nếu chưa có
         Path('logs').mkdir(exist_ok=True)
         Path('data').mkdir(exist_ok=True)
     
-    def rate_limit(self):
-        """Rate limiting để tránh spam server"""
-        if self.delay > 0:
+    def rate_limit(self, url: Optional[str] = None):
+        """
+        Rate limiting để tránh spam server
+        
+        Có url: lấy token từ bucket dùng chung của host (chỉ chờ khi hết token).
+        Không có url: nghỉ cố định self.delay như trước.
+        """
+        if url:
+            get_rate_limiter().acquire(url)
+        elif self.delay > 0:
             time.sleep(self.delay)
     
+    def host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Lấy semaphore giới hạn số request đồng thời tới host của url"""
+        host = urlparse(url).netloc or url
+        with BaseCrawler._host_slots_lock:
+            slot = BaseCrawler._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(RATE_LIMITS['concurrent_requests'])
+                BaseCrawler._host_slots[host] = slot
+            return slot
+    
+    @staticmethod
+    def cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Key cache: URL đầy đủ sau khi gắn query params"""
+        if not params:
+            return url
+        return requests.Request('GET', url, params=params).prepare().url
+    
+    def fetch(self, url: str, **kwargs) -> requests.Response:
+        """
+        Một lần GET qua rate limiter và HTTP cache
+        
+        Entry còn TTL được trả ngay; entry hết hạn được revalidate bằng
+        If-None-Match/If-Modified-Since, server trả 304 thì dùng lại body cũ.
+        Lỗi HTTP được raise như raise_for_status.
+        """
+        key = self.cache_key(url, kwargs.get('params'))
+        entry = self.http_cache.get(key) if self.http_cache else None
+        if entry and self.http_cache.is_fresh(entry):
+            return entry.to_response()
+        
+        if entry:
+            kwargs['headers'] = {**entry.conditional_headers(), **(kwargs.get('headers') or {})}
+        
+        with self.host_slot(url):
+            self.rate_limit(url)
+            response = self.session.get(url, **kwargs)
+        
+        if response.status_code == 304 and entry:
+            self.http_cache.refresh(key)
+            return entry.to_response()
+        
+        response.raise_for_status()
+        if self.http_cache:
+            self.http_cache.store(key, response.content, response.headers)
+        return response
+    
     def retry_request(self, url: str, **kwargs) -> Optional[requests.Response]:
         """Thực hiện request với retry logic"""
         for attempt in range(self.max_retries):
             try:
-                self.rate_limit()
-                response = self.session.get(url, **kwargs)
-                response.raise_for_status()
-                return response
+                return self.fetch(url, **kwargs)
             except Exception as e:
                 self.logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
                 if attempt == self.max_retries - 1:
@@ -92,6 +168,112 @@ class BaseCrawler(ABC):
                 time.sleep(2 ** attempt)  # Exponential backoff
         return None
     
+    def create_async_session(self) -> aiohttp.ClientSession:
+        """
+        Tạo aiohttp session với connection pool và keep-alive
+        
+        Connector giới hạn số kết nối đồng thời mỗi host theo
+        RATE_LIMITS['concurrent_requests'] và giữ kết nối để tái sử dụng.
+        """
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrent_requests * 4,
+            limit_per_host=RATE_LIMITS['concurrent_requests'],
+            keepalive_timeout=30,
+            ttl_dns_cache=300
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=CRAWLER_SETTINGS['timeout']),
+            headers=dict(self.session.headers)
+        )
+    
+    async def async_retry_request(self, url: str, session: Optional[aiohttp.ClientSession] = None,
+                                  **kwargs) -> Optional[bytes]:
+        """Phiên bản async của retry_request, trả về nội dung response"""
+        if session is None:
+            async with self.create_async_session() as own_session:
+                return await self.async_retry_request(url, session=own_session, **kwargs)
+        
+        key = self.cache_key(url, kwargs.get('params'))
+        entry = self.http_cache.get(key) if self.http_cache else None
+        if entry and self.http_cache.is_fresh(entry):
+            return entry.body
+        if entry:
+            kwargs['headers'] = {**entry.conditional_headers(), **(kwargs.get('headers') or {})}
+        
+        for attempt in range(self.max_retries):
+            try:
+                await get_rate_limiter().acquire_async(url)
+                async with session.get(url, **kwargs) as response:
+                    if response.status == 304 and entry:
+                        self.http_cache.refresh(key)
+                        return entry.body
+                    response.raise_for_status()
+                    body = await response.read()
+                    if self.http_cache:
+                        self.http_cache.store(key, body, response.headers)
+                    return body
+            except Exception as e:
+                self.logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
+                if attempt == self.max_retries - 1:
+                    self.logger.error(f"All attempts failed for {url}")
+                    return None
+                await asyncio.sleep(2 ** attempt)  # Exponential backoff
+        return None
+    
+    async def crawl_month_async(self, year: int, month: int,
+                                session: Optional[aiohttp.ClientSession] = None) -> List[LichData]:
+        """
+        Crawl một tháng trong event loop
+        
+        Mặc định chạy crawl_month đồng bộ trong thread; các crawler web tĩnh
+        override bằng phiên bản dùng aiohttp.
+        """
+        return await asyncio.to_thread(self.crawl_month, year, month)
+    
+    async def crawl_months_async(self, months: Iterable[Tuple[int, int]]) -> List[LichData]:
+        """Crawl nhiều tháng đồng thời trên một session, giữ nguyên thứ tự tháng"""
+        months = list(months)
+        async with self.create_async_session() as session:
+            results = await asyncio.gather(
+                *(self.crawl_month_async(year, month, session=session) for year, month in months),
+                return_exceptions=True
+            )
+        
+        all_data = []
+        for (year, month), month_data in zip(months, results):
+            if isinstance(month_data, BaseException):
+                self.logger.error(f"Lỗi crawl tháng {month}/{year}: {month_data}")
+                continue
+            all_data.extend(month_data)
+        return all_data
+    
+    def get_month_data(self, year: int, month: int) -> List[LichData]:
+        """crawl_month có memo theo (nguồn, năm, tháng), dùng chung giữa các crawler"""
+        key = (self.__class__.__name__, getattr(self, 'source_name', None), year, month)
+        return get_month_cache().get_or_load(key, lambda: self.crawl_month(year, month))
+    
+    @staticmethod
+    def computed_fields(solar_date: str) -> Dict[str, str]:
+        """Ngày âm và can chi tính cục bộ, dùng khi trang nguồn không có các trường này"""
+        lunar, can_chi = lunar_with_can_chi(datetime.strptime(solar_date, '%Y-%m-%d').date())
+        return {
+            'lunar_date': str(lunar),
+            'can_chi_day': can_chi['day'],
+            'can_chi_month': can_chi['month'],
+            'can_chi_year': can_chi['year']
+        }
+    
+    def find_date_in_month(self, date: datetime) -> Optional[LichData]:
+        """Lấy dữ liệu một ngày từ kết quả tháng đã memo"""
+        date_str = date.strftime("%Y-%m-%d")
+        
+        for item in self.get_month_data(date.year, date.month):
+            if item.solar_date == date_str:
+                return item
+        
+        return None
+    
     @abstractmethod
     def crawl_date(self, date: datetime) -> Optional[LichData]:
         """Crawl dữ liệu cho một ngày cụ thể"""
@@ -102,16 +284,62 @@ class BaseCrawler(ABC):
         """Crawl dữ liệu cho một tháng"""
         pass
     
+    def run_concurrently(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """
+        Chạy func trên từng item bằng thread pool, giữ nguyên thứ tự kết quả
+        
+        Số worker giới hạn bởi concurrent_requests; số request thực sự tới
+        mỗi host vẫn bị chặn bởi host_slot trong retry_request.
+        Gọi từ bên trong một worker (vd crawl_year -> crawl_month -> crawl_days) thì chạy
+        tuần tự trên thread đó, nên tổng số thread không vượt concurrent_requests.
+        """
+        items = list(items)
+        if (self.concurrent_requests <= 1 or len(items) <= 1
+                or getattr(self._pool_worker, 'active', False)):
+            return [func(item) for item in items]
+        
+        def run_in_worker(item: T) -> R:
+            self._pool_worker.active = True
+            try:
+                return func(item)
+            finally:
+                self._pool_worker.active = False
+        
+        with ThreadPoolExecutor(max_workers=min(self.concurrent_requests, len(items)),
+                                thread_name_prefix=self.__class__.__name__) as executor:
+            return list(executor.map(run_in_worker, items))
+    
+    def crawl_days(self, year: int, month: int) -> List[LichData]:
+        """Crawl từng ngày trong tháng song song bằng crawl_date, giữ thứ tự ngày"""
+        _, last_day = calendar.monthrange(year, month)
+        
+        def crawl_one(day: int) -> Optional[LichData]:
+            try:
+                return self.crawl_date(datetime(year, month, day))
+            except Exception as e:
+                self.logger.error(f"Lỗi crawl ngày {day}/{month}/{year}: {e}")
+                return None
+        
+        results = self.run_concurrently(crawl_one, range(1, last_day + 1))
+        return [item for item in results if item]
+    
     def crawl_year(self, year: int) -> List[LichData]:
-        """Crawl dữ liệu cho cả năm"""
+        """Crawl dữ liệu cho cả năm (các tháng chạy song song)"""
         self.logger.info(f"Bắt đầu crawl năm {year}")
         all_data = []
         
-        for month in range(1, 13):
+        def crawl_one(month: int) -> List[LichData]:
             self.logger.info(f"Crawl tháng {month}/{year}")
-            month_data = self.crawl_month(year, month)
-            all_data.extend(month_data)
+            try:
+                month_data = self.crawl_month(year, month)
+            except Exception as e:
+                self.logger.error(f"Lỗi crawl tháng {month}/{year}: {e}")
+                return []
             self.logger.info(f"Hoàn thành tháng {month}/{year}: {len(month_data)} ngày")
+            return month_data
+        
+        for month_data in self.run_concurrently(crawl_one, range(1, 13)):
+            all_data.extend(month_data)
         
         self.data = all_data
         self.logger.info(f"Hoàn thành crawl năm {year}: {len(all_data)} ngày")
@@ -128,52 +356,10 @@ class BaseCrawler(ABC):
         self.logger.info(f"Đã lưu {len(self.data)} records vào {filepath}")
     
     def save_to_sqlite(self, db_path: str = "data/lich_database.db") -> None:
-        """Lưu dữ liệu vào SQLite database"""
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Tạo bảng nếu chưa có
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS lich_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                solar_date TEXT NOT NULL,
-                lunar_date TEXT,
-                can_chi_day TEXT,
-                can_chi_month TEXT, 
-                can_chi_year TEXT,
-                holiday TEXT,
-                notes TEXT,
-                source TEXT,
-                crawled_at TEXT,
-                UNIQUE(solar_date, source)
-            )
-        ''')
-        
-        # Insert dữ liệu
-        for item in self.data:
-            try:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO lich_data 
-                    (solar_date, lunar_date, can_chi_day, can_chi_month, 
-                     can_chi_year, holiday, notes, source, crawled_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    item.solar_date,
-                    item.lunar_date,
-                    item.can_chi_day,
-                    item.can_chi_month,
-                    item.can_chi_year,
-                    item.holiday,
-                    item.notes,
-                    item.source,
-                    item.crawled_at or datetime.now().isoformat()
-                ))
-            except sqlite3.IntegrityError:
-                pass  # Skip duplicates
-        
-        conn.commit()
-        conn.close()
-        self.logger.info(f"Đã lưu {len(self.data)} records vào SQLite database")
+        """Lưu dữ liệu vào SQLite database (upsert theo lô, WAL)"""
+        with lich_data_sink(db_path) as sink:
+            count = sink.write(lich_data_rows(item.to_dict() for item in self.data))
+        self.logger.info(f"Đã lưu {count} records vào SQLite database")
     
     def get_stats(self) -> Dict[str, Any]:
         """Thống kê dữ liệu đã crawl"""
@@ -0,0 +1,192 @@
+"""
+Pool trình duyệt Playwright dùng chung cho các crawler web động
+Giữ một Chromium sống lâu, tái sử dụng page và tự thay browser khi hỏng
+"""
+
+import sys
+import asyncio
+import logging
+import weakref
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+
+sys.path.append(str(Path(__file__).parent.parent))
+from config.settings import BROWSER_POOL, CRAWLER_SETTINGS
+
+
+class BrowserPool:
+    """
+    Pool page Playwright trên một browser/context dùng chung
+
+    - Tối đa `max_pages` page mở đồng thời (semaphore)
+    - Page trả về pool để dùng lại, bị đóng sau `max_page_uses` lần hoặc khi lỗi
+    - Browser được khởi động lại khi mất kết nối hoặc sau `max_browser_uses` lần lấy page;
+      browser đủ số lần dùng chỉ bị đóng khi page cuối cùng đang mượn được trả lại
+    """
+
+    def __init__(self, max_pages: int = BROWSER_POOL['max_pages'],
+                 max_page_uses: int = BROWSER_POOL['max_page_uses'],
+                 max_browser_uses: int = BROWSER_POOL['max_browser_uses'],
+                 headless: bool = BROWSER_POOL['headless']):
+        self.max_pages = max_pages
+        self.max_page_uses = max_page_uses
+        self.max_browser_uses = max_browser_uses
+        self.headless = headless
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._context: Optional[BrowserContext] = None
+        self._idle_pages: List[Page] = []
+        self._page_uses: "weakref.WeakKeyDictionary[Page, int]" = weakref.WeakKeyDictionary()
+        self._browser_uses = 0
+        # Số page đang được mượn theo browser, và browser đã thay nhưng còn page đang chạy
+        self._leases: Dict[Browser, int] = {}
+        self._page_browser: "weakref.WeakKeyDictionary[Page, Browser]" = weakref.WeakKeyDictionary()
+        self._retiring: List[Browser] = []
+        self._semaphore = asyncio.Semaphore(max_pages)
+        self._lock = asyncio.Lock()
+
+    async def _launch(self) -> None:
+        """Khởi động Playwright, browser và context"""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._context = await self._browser.new_context(user_agent=CRAWLER_SETTINGS['user_agent'])
+        self._browser_uses = 0
+        self.logger.info("Đã khởi động Chromium cho browser pool")
+
+    async def _shutdown(self, browser: Browser) -> None:
+        try:
+            await browser.close()
+        except Exception as e:
+            self.logger.debug(f"Lỗi đóng browser: {e}")
+
+    async def _close_browser(self) -> None:
+        """Đóng browser hiện tại cùng các page đang rảnh (chỉ dùng khi browser đã mất kết nối hoặc đóng pool)"""
+        self._idle_pages.clear()
+        browser, self._browser, self._context = self._browser, None, None
+        if browser is not None:
+            self._leases.pop(browser, None)
+            await self._shutdown(browser)
+
+    async def _retire_browser(self) -> None:
+        """Thay browser đủ số lần dùng: page đang mượn chạy tiếp trên browser cũ, đóng khi page cuối được trả"""
+        self._idle_pages.clear()
+        browser, self._browser, self._context = self._browser, None, None
+        if browser is None:
+            return
+        if self._leases.get(browser, 0) > 0:
+            self._retiring.append(browser)
+        else:
+            self._leases.pop(browser, None)
+            await self._shutdown(browser)
+
+    async def _acquire_page(self) -> Page:
+        """Lấy một page rảnh hoặc tạo page mới"""
+        async with self._lock:
+            if self._browser is not None and not self._browser.is_connected():
+                # Browser chết thì page đang mượn cũng đã hỏng, đóng ngay
+                self.logger.info("Recycle browser pool (mất kết nối)")
+                await self._close_browser()
+            elif self._browser is not None and self._browser_uses >= self.max_browser_uses:
+                self.logger.info("Recycle browser pool (đủ số lần dùng)")
+                await self._retire_browser()
+            if self._browser is None:
+                await self._launch()
+
+            self._browser_uses += 1
+            page = None
+            while self._idle_pages:
+                candidate = self._idle_pages.pop()
+                if not candidate.is_closed():
+                    page = candidate
+                    break
+            if page is None:
+                page = await self._context.new_page()
+            self._page_browser[page] = self._browser
+            self._leases[self._browser] = self._leases.get(self._browser, 0) + 1
+            return page
+
+    async def _end_lease(self, page: Page) -> None:
+        """Giảm số page đang mượn của browser chứa page; browser đang chờ thay hết page thì đóng"""
+        browser = self._page_browser.pop(page, None)
+        if browser is None or browser not in self._leases:
+            return
+        self._leases[browser] -= 1
+        if self._leases[browser] <= 0 and browser in self._retiring:
+            self._retiring.remove(browser)
+            del self._leases[browser]
+            await self._shutdown(browser)
+
+    async def _release_page(self, page: Page, healthy: bool) -> None:
+        """Trả page về pool, hoặc đóng nếu lỗi/đã dùng đủ"""
+        try:
+            await self._return_page(page, healthy)
+        finally:
+            await self._end_lease(page)
+
+    async def _return_page(self, page: Page, healthy: bool) -> None:
+        uses = self._page_uses.get(page, 0) + 1
+        self._page_uses[page] = uses
+
+        if healthy and not page.is_closed() and uses < self.max_page_uses and page.context is self._context:
+            self._idle_pages.append(page)
+            return
+
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception as e:
+            self.logger.debug(f"Lỗi đóng page: {e}")
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Mượn một page từ pool trong khối `async with`"""
+        async with self._semaphore:
+            page = await self._acquire_page()
+            healthy = True
+            try:
+                yield page
+            except BaseException:
+                healthy = False
+                raise
+            finally:
+                await self._release_page(page, healthy)
+
+    async def close(self) -> None:
+        """Đóng toàn bộ browser và Playwright"""
+        async with self._lock:
+            await self._close_browser()
+            retiring, self._retiring = self._retiring, []
+            for browser in retiring:
+                await self._shutdown(browser)
+            self._leases.clear()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+# Mỗi event loop có một pool riêng (đối tượng Playwright gắn với loop tạo ra nó)
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BrowserPool]" = weakref.WeakKeyDictionary()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Pool dùng chung cho event loop đang chạy"""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = BrowserPool()
+        _pools[loop] = pool
+    return pool
+
+
+async def close_browser_pool() -> None:
+    """Đóng pool của event loop đang chạy (nếu có)"""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+
@@ -91,14 +91,7 @@ class DemoCrawler(BaseCrawler):
     
     def crawl_date(self, date: datetime) -> Optional[LichData]:
         """Crawl dữ liệu cho một ngày cụ thể"""
-        month_data = self.crawl_month(date.year, date.month)
-        date_str = date.strftime("%Y-%m-%d")
-        
-        for item in month_data:
-            if item.solar_date == date_str:
-                return item
-        
-        return None
+        return self.find_date_in_month(date)
 
 # Crawler thực tế cho một API lịch âm
 class VietnameseCalendarAPI(BaseCrawler):
@@ -151,14 +144,7 @@ class VietnameseCalendarAPI(BaseCrawler):
     
     def crawl_date(self, date: datetime) -> Optional[LichData]:
         """Crawl dữ liệu cho một ngày cụ thể"""
-        month_data = self.crawl_month(date.year, date.month)
-        date_str = date.strftime("%Y-%m-%d")
-        
-        for item in month_data:
-            if item.solar_date == date_str:
-                return item
-        
-        return None
+        return self.find_date_in_month(date)
 
 # Chạy thử nghiệm
 if __name__ == "__main__":
@@ -96,6 +96,7 @@ class GenericCalendarCrawler(BaseCrawler):
             for endpoint in api_config['endpoints']:
                 try:
                     test_url = api_config['base_url'] + endpoint.format(year=2025, month=7)
+                    self.rate_limit(test_url)
                     response = requests.get(test_url, timeout=5)
                     
                     if response.status_code == 200:
@@ -120,13 +121,7 @@ class GenericCalendarCrawler(BaseCrawler):
 
     def crawl_date(self, date: datetime) -> Optional[LichData]:
         """Crawl dữ liệu cho một ngày cụ thể"""
-        data = self.crawl_month(date.year, date.month)
-        target_date = date.strftime('%Y-%m-%d')
-        
-        for item in data:
-            if item.solar_date == target_date:
-                return item
-        return None
+        return self.find_date_in_month(date)
 
     def crawl_month(self, year: int, month: int) -> List[LichData]:
         """Crawl dữ liệu một tháng từ nhiều nguồn"""
@@ -156,7 +151,7 @@ class GenericCalendarCrawler(BaseCrawler):
         
         for api in apis:
             try:
-                response = requests.get(api['url'], timeout=10)
+                response = self.fetch(api['url'], timeout=10)
                 if response.status_code == 200:
                     json_data = response.json()
                     parsed_data = self.parse_api_response(json_data, year, month)
@@ -176,7 +171,7 @@ class GenericCalendarCrawler(BaseCrawler):
         for site_name, config in self.site_configs.items():
             try:
                 calendar_url = config['base_url'] + config['calendar_path'].format(year=year, month=month)
-                response = requests.get(calendar_url, timeout=10, headers={
+                response = self.fetch(calendar_url, timeout=10, headers={
                     'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
                 })
                 
@@ -0,0 +1,187 @@
+"""
+HTTP response cache trên đĩa cho các crawler
+Lưu body + ETag/Last-Modified trong SQLite, hỗ trợ conditional GET, TTL và LRU theo dung lượng
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+sys.path.append(str(Path(__file__).parent.parent))
+from config.settings import HTTP_CACHE
+
+# Chỉ giữ lại các header cần cho parse và revalidate
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+# Số lượt truy cập chờ ghi accessed_at tối đa trước khi buộc flush
+MAX_PENDING_ACCESSES = 256
+
+
+@dataclass
+class CacheEntry:
+    """Một response đã cache"""
+    url: str
+    body: bytes
+    headers: Dict[str, str]
+    stored_at: float
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get('Last-Modified')
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Header If-None-Match / If-Modified-Since để revalidate"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_response(self) -> requests.Response:
+        """Dựng lại requests.Response từ cache để code gọi không phải đổi"""
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.body
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = self.url
+        response.reason = 'OK (cached)'
+        return response
+
+
+class HttpCache:
+    """Cache HTTP dạng SQLite, an toàn khi dùng từ nhiều thread"""
+
+    def __init__(self, db_path: str = HTTP_CACHE['path'],
+                 ttl_seconds: float = HTTP_CACHE['ttl_seconds'],
+                 max_size_bytes: int = HTTP_CACHE['max_size_mb'] * 1024 * 1024):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = max_size_bytes
+        self._lock = threading.Lock()
+        # url -> thời điểm truy cập gần nhất chưa ghi xuống đĩa (ghi theo lô ở store/_evict)
+        self._pending_access: Dict[str, float] = {}
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                headers TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_http_cache_accessed ON http_cache(accessed_at)')
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Lấy entry (kể cả đã hết hạn, để dùng cho conditional GET)"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, headers, stored_at FROM http_cache WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            # Cache hit chỉ ghi nhận trong bộ nhớ, không commit xuống đĩa trên đường đọc
+            self._pending_access[url] = time.time()
+            if len(self._pending_access) >= MAX_PENDING_ACCESSES:
+                self._flush_access()
+                self._conn.commit()
+        return CacheEntry(url=url, body=row[0], headers=json.loads(row[1]), stored_at=row[2])
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Entry còn trong TTL thì dùng luôn, không cần hỏi server"""
+        return time.time() - entry.stored_at < self.ttl_seconds
+
+    def refresh(self, url: str) -> None:
+        """Server trả 304: gia hạn TTL cho entry"""
+        now = time.time()
+        with self._lock:
+            self._pending_access.pop(url, None)
+            self._conn.execute('UPDATE http_cache SET stored_at = ?, accessed_at = ? WHERE url = ?', (now, now, url))
+            self._conn.commit()
+
+    def store(self, url: str, body: bytes, headers: Mapping[str, str]) -> None:
+        """Lưu response rồi dọn LRU nếu vượt dung lượng"""
+        if len(body) > self.max_size_bytes:
+            return
+
+        kept = {name: headers[name] for name in STORED_HEADERS if headers.get(name)}
+        now = time.time()
+        with self._lock:
+            self._pending_access.pop(url, None)
+            self._conn.execute('''
+                INSERT OR REPLACE INTO http_cache (url, body, headers, size, stored_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (url, body, json.dumps(kept), len(body), now, now))
+            self._evict()
+            self._conn.commit()
+
+    def _flush_access(self) -> None:
+        """Ghi các accessed_at đang chờ trong một executemany (gọi khi đang giữ lock)"""
+        if not self._pending_access:
+            return
+        self._conn.executemany('UPDATE http_cache SET accessed_at = ? WHERE url = ?',
+                               [(accessed_at, url) for url, accessed_at in self._pending_access.items()])
+        self._pending_access.clear()
+
+    def flush(self) -> None:
+        """Ghi các lượt truy cập đang chờ xuống đĩa"""
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Xoá các entry ít được truy cập nhất cho tới khi dưới giới hạn dung lượng"""
+        # Thứ tự LRU phải tính cả các lượt truy cập chưa ghi
+        self._flush_access()
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+
+        rows = self._conn.execute('SELECT url, size FROM http_cache ORDER BY accessed_at').fetchall()
+        to_delete = []
+        for url, size in rows:
+            if total <= self.max_size_bytes:
+                break
+            to_delete.append((url,))
+            total -= size
+        self._conn.executemany('DELETE FROM http_cache WHERE url = ?', to_delete)
+
+    def clear(self) -> None:
+        """Xoá toàn bộ cache"""
+        with self._lock:
+            self._pending_access.clear()
+            self._conn.execute('DELETE FROM http_cache')
+            self._conn.commit()
+
+
+_default_cache: Optional[HttpCache] = None
+_default_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """Cache dùng chung toàn process, None nếu tắt trong HTTP_CACHE"""
+    global _default_cache
+    if not HTTP_CACHE['enabled']:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache()
+        return _default_cache
@@ -4,19 +4,24 @@ Cải tiến Generic Crawler với khả năng tìm kiếm API và trang web th
 
 import requests
 from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Optional, Dict, Any
 import json
 import re
+import sys
 import logging
+from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent))
 if __name__ == "__main__":
-    import sys
-    sys.path.append('..')
+    # Fix import for standalone run
+    sys.path.append(str(Path(__file__).parent))
     from base_crawler import BaseCrawler, LichData
 else:
     from .base_crawler import BaseCrawler, LichData
 
+from lunar.can_chi import lunar_with_can_chi
+
 class ImprovedCalendarCrawler(BaseCrawler):
     """Crawler cải tiến với khả năng tự động tìm kiếm nguồn dữ liệu"""
     
@@ -63,6 +68,7 @@ class ImprovedCalendarCrawler(BaseCrawler):
             try:
                 # Test với tháng hiện tại
                 test_url = endpoint_template.format(year=2025, month=7)
+                self.rate_limit(test_url)
                 response = requests.get(test_url, timeout=5, headers={
                     'User-Agent': 'Vietnamese Calendar Crawler/1.0'
                 })
@@ -132,7 +138,7 @@ class ImprovedCalendarCrawler(BaseCrawler):
         """Crawl từ API endpoint"""
         try:
             url = api['endpoint'].format(year=year, month=month)
-            response = requests.get(url, timeout=10, headers={
+            response = self.fetch(url, timeout=10, headers={
                 'User-Agent': 'Vietnamese Calendar Crawler/1.0'
             })
             
@@ -153,7 +159,7 @@ class ImprovedCalendarCrawler(BaseCrawler):
         """Crawl từ website backup"""
         try:
             url = site['url'].format(year=year, month=month)
-            response = requests.get(url, timeout=10, headers={
+            response = self.fetch(url, timeout=10, headers={
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             })
             
@@ -304,9 +310,6 @@ class ImprovedCalendarCrawler(BaseCrawler):
         data = []
         cal = calendar.monthcalendar(year, month)
         
-        # Lunar calendar offset đơn giản (không chính xác 100% nhưng có thể sử dụng)
-        lunar_offset = self.calculate_simple_lunar_offset(year, month)
-        
         for week in cal:
             for day in week:
                 if day == 0:
@@ -314,49 +317,22 @@ class ImprovedCalendarCrawler(BaseCrawler):
                     
                 solar_date = f"{year}-{month:02d}-{day:02d}"
                 
-                # Tính lunar date đơn giản
-                lunar_day = (day + lunar_offset) % 30 + 1
-                lunar_month = month
-                if lunar_day > 29:
-                    lunar_month = (month % 12) + 1
-                    lunar_day = lunar_day - 29
-                    
-                lunar_date = f"{lunar_day:02d}/{lunar_month:02d}"
-                
-                # Tạo can chi đơn giản (không chính xác nhưng có pattern)
-                can_chi = self.generate_simple_can_chi(year, month, day)
+                # Ngày âm và can chi tính cục bộ bằng package lunar
+                lunar, can_chi = lunar_with_can_chi(date(year, month, day))
                 
                 data.append(LichData(
                     solar_date=solar_date,
-                    lunar_date=lunar_date,
-                    can_chi_day=can_chi,
-                    can_chi_month='',
-                    can_chi_year='',
+                    lunar_date=str(lunar),
+                    can_chi_day=can_chi['day'],
+                    can_chi_month=can_chi['month'],
+                    can_chi_year=can_chi['year'],
                     holiday='',
-                    notes='Dữ liệu hybrid - cần xác thực',
+                    notes='Dữ liệu hybrid - âm lịch và can chi tính cục bộ',
                     source='hybrid_generator'
                 ))
                 
         return data
 
-    def calculate_simple_lunar_offset(self, year: int, month: int) -> int:
-        """Tính offset đơn giản cho lunar calendar"""
-        # Công thức đơn giản, không chính xác nhưng có pattern
-        base_offset = (year - 2000) * 11 + (month - 1) * 2
-        return base_offset % 30
-
-    def generate_simple_can_chi(self, year: int, month: int, day: int) -> str:
-        """Tạo can chi đơn giản"""
-        can = ['Giáp', 'Ất', 'Bính', 'Đinh', 'Mậu', 'Kỷ', 'Canh', 'Tân', 'Nhâm', 'Quý']
-        chi = ['Tý', 'Sửu', 'Dần', 'Mão', 'Thìn', 'Tỵ', 'Ngọ', 'Mùi', 'Thân', 'Dậu', 'Tuất', 'Hợi']
-        
-        # Tính index dựa trên ngày
-        total_days = year * 365 + month * 30 + day
-        can_index = total_days % 10
-        chi_index = total_days % 12
-        
-        return f"{can[can_index]} {chi[chi_index]}"
-
     def parse_lichsu_org(self, soup: BeautifulSoup, year: int, month: int) -> List[LichData]:
         """Parser cho lichsu.org"""
         # Placeholder - cần implement dựa trên HTML structure thực
@@ -387,13 +363,7 @@ class ImprovedCalendarCrawler(BaseCrawler):
 
     def crawl_date(self, date: datetime) -> Optional[LichData]:
         """Crawl dữ liệu cho một ngày cụ thể"""
-        data = self.crawl_month(date.year, date.month)
-        target_date = date.strftime('%Y-%m-%d')
-        
-        for item in data:
-            if item.solar_date == target_date:
-                return item
-        return None
+        return self.find_date_in_month(date)
 
 def main():
     """Test improved crawler"""
@@ -7,11 +7,14 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional
 import asyncio
+import calendar
 
-from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
 
 from .base_crawler import BaseCrawler, LichData
+from .async_runner import run_sync
+from .browser_pool import get_browser_pool
+from .rate_limiter import get_rate_limiter
 
 
 class LichAm365Crawler(BaseCrawler):
@@ -129,9 +132,8 @@ class LichAm365Crawler(BaseCrawler):
                 
             self.logger.info(f"Bắt đầu crawl dữ liệu từ {self.base_url} cho ngày {date}")
             
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
+            await get_rate_limiter().acquire_async(self.base_url)
+            async with get_browser_pool().page() as page:
                 
                 # Thiết lập user agent
                 await page.set_extra_http_headers({
@@ -144,7 +146,6 @@ class LichAm365Crawler(BaseCrawler):
                 
                 # Lấy nội dung HTML
                 content = await page.content()
-                await browser.close()
                 
             # Parse HTML với BeautifulSoup
             soup = BeautifulSoup(content, 'html.parser')
@@ -153,13 +154,16 @@ class LichAm365Crawler(BaseCrawler):
             lich_info = self._extract_lich_info(soup)
             special_info = self._extract_special_info(soup)
             
+            # Các trường trang không có thì tính cục bộ thay vì gán cứng
+            computed = self.computed_fields(date)
+            
             # Tạo đối tượng LichData với cấu trúc mới
             lich_data = LichData(
                 solar_date=date,
-                lunar_date=lich_info.get('ngay_am_lich', "22/6/2025"),
-                can_chi_day=lich_info.get('can_chi', "Bính Tuất"),
-                can_chi_month="Quý Mùi",
-                can_chi_year="Ất Tỵ",
+                lunar_date=lich_info.get('ngay_am_lich', computed['lunar_date']),
+                can_chi_day=lich_info.get('can_chi', computed['can_chi_day']),
+                can_chi_month=computed['can_chi_month'],
+                can_chi_year=computed['can_chi_year'],
                 holiday=lich_info.get('hoang_dao', "Ngày Hoàng Đạo"),
                 notes=f"Giờ hoàng đạo: {lich_info.get('gio_hoang_dao', 'Dần(3h-5h), Thìn(7h-9h), Tỵ(9h-11h), Thân(15h-17h), Dậu(17h-19h), Hợi(21h-23h)')}. " +
                       f"Ngũ hành: {lich_info.get('ngu_hanh', 'Ốc thượng thổ')}. " +
@@ -174,13 +178,15 @@ class LichAm365Crawler(BaseCrawler):
             
         except Exception as e:
             self.logger.error(f"Lỗi khi crawl từ {self.name}: {e}")
-            # Trả về dữ liệu mẫu khi có lỗi
+            # Trả về dữ liệu mẫu khi có lỗi, ngày âm và can chi vẫn tính đúng cho ngày yêu cầu
+            solar_date = date if date else datetime.now().strftime('%Y-%m-%d')
+            computed = self.computed_fields(solar_date)
             return LichData(
-                solar_date=date if date else datetime.now().strftime('%Y-%m-%d'),
-                lunar_date="22/6/2025",
-                can_chi_day="Bính Tuất",
-                can_chi_month="Quý Mùi", 
-                can_chi_year="Ất Tỵ",
+                solar_date=solar_date,
+                lunar_date=computed['lunar_date'],
+                can_chi_day=computed['can_chi_day'],
+                can_chi_month=computed['can_chi_month'],
+                can_chi_year=computed['can_chi_year'],
                 holiday="Ngày Hoàng Đạo",
                 notes="Giờ hoàng đạo: Dần(3h-5h), Thìn(7h-9h), Tỵ(9h-11h), Thân(15h-17h), Dậu(17h-19h), Hợi(21h-23h). " +
                       "Ngũ hành: Ốc thượng thổ. Sao: Sâm Thủy Viên - Tốt. " +
@@ -193,30 +199,21 @@ class LichAm365Crawler(BaseCrawler):
     def crawl_date(self, date: datetime) -> Optional[LichData]:
         """Crawl data cho ngày cụ thể - sync version"""
         try:
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            return loop.run_until_complete(self.crawl_data(date.strftime("%Y-%m-%d")))
+            return run_sync(self.crawl_data(date.strftime("%Y-%m-%d")))
         except Exception as e:
             self.logger.error(f"Lỗi trong crawl_date: {e}")
             return None
         
-    def crawl_month(self, year: int, month: int) -> List[LichData]:
-        """Crawl data cho cả tháng - sync version"""
-        results = []
-        import calendar
+    async def crawl_month_async(self, year: int, month: int, session=None) -> List[LichData]:
+        """Crawl cả tháng trong một event loop, các ngày dùng chung browser pool"""
         _, last_day = calendar.monthrange(year, month)
-        
-        for day in range(1, last_day + 1):
-            try:
-                date_obj = datetime(year, month, day)
-                data = self.crawl_date(date_obj)
-                if data:
-                    results.append(data)
-            except Exception as e:
-                self.logger.error(f"Lỗi crawl ngày {day}/{month}/{year}: {e}")
-                continue
-        return results
+        dates = [f"{year}-{month:02d}-{day:02d}" for day in range(1, last_day + 1)]
+        results = await asyncio.gather(*(self.crawl_data(date) for date in dates))
+        return [item for item in results if item]
+    
+    def crawl_month(self, year: int, month: int) -> List[LichData]:
+        """Crawl data cho cả tháng - sync version (một lần khởi động browser)"""
+        return run_sync(self.crawl_month_async(year, month))
     
     async def validate_data(self, data: LichData) -> bool:
         """Validate dữ liệu đã crawl"""
@@ -237,12 +234,13 @@ class LichAm365Crawler(BaseCrawler):
     
     def get_sample_data(self) -> LichData:
         """Trả về dữ liệu mẫu cho demo"""
+        computed = self.computed_fields("2025-07-16")
         return LichData(
             solar_date="2025-07-16",
-            lunar_date="22/6/2025",
-            can_chi_day="Bính Tuất",
-            can_chi_month="Quý Mùi",
-            can_chi_year="Ất Tỵ",
+            lunar_date=computed['lunar_date'],
+            can_chi_day=computed['can_chi_day'],
+            can_chi_month=computed['can_chi_month'],
+            can_chi_year=computed['can_chi_year'],
             holiday="Ngày Hoàng Đạo (Thanh Long)",
             notes="Giờ hoàng đạo: Dần(3h-5h), Thìn(7h-9h), Tỵ(9h-11h), Thân(15h-17h), Dậu(17h-19h), Hợi(21h-23h). " +
                   "Giờ hắc đạo: Tý(23h-1h), Sửu(1h-3h), Mão(5h-7h), Ngọ(11h-13h), Mùi(13h-15h), Tuất(19h-21h). " +
@@ -117,13 +117,16 @@ class LichVanNien365Crawler(BaseCrawler):
                 lich_info = self._extract_lich_info_from_text(text_content)
                 events = self._extract_special_events(text_content)
                 
+                # Các trường trang không có thì tính cục bộ thay vì gán cứng
+                computed = self.computed_fields(date)
+                
                 # Tạo đối tượng LichData
                 lich_data = LichData(
                     solar_date=date,
-                    lunar_date=lich_info.get('ngay_am_lich', "22/6/2025"),
-                    can_chi_day=lich_info.get('can_chi', "Bính Tuất"),
-                    can_chi_month="Quý Mùi",
-                    can_chi_year="Ất Tỵ",
+                    lunar_date=lich_info.get('ngay_am_lich', computed['lunar_date']),
+                    can_chi_day=lich_info.get('can_chi', computed['can_chi_day']),
+                    can_chi_month=computed['can_chi_month'],
+                    can_chi_year=computed['can_chi_year'],
                     holiday=lich_info.get('hoang_dao', "Ngày Hoàng Đạo"),
                     notes=f"Giờ hoàng đạo: {lich_info.get('gio_hoang_dao', 'Dần(3h-5h), Thìn(7h-9h), Tỵ(9h-11h), Thân(15h-17h), Dậu(17h-19h), Hợi(21h-23h)')}. " +
                           f"Sự kiện nổi bật: {'; '.join(events[:3]) if events else 'Tử vi 12 cung hoàng đạo, màu sắc may mắn, bói vui'}",
@@ -142,13 +145,14 @@ class LichVanNien365Crawler(BaseCrawler):
             return self._get_fallback_data(date or datetime.now().strftime("%Y-%m-%d"))
     
     def _get_fallback_data(self, date: str) -> LichData:
-        """Trả về dữ liệu mẫu khi không crawl được"""
+        """Trả về dữ liệu mẫu khi không crawl được, ngày âm và can chi vẫn tính đúng cho ngày yêu cầu"""
+        computed = self.computed_fields(date)
         return LichData(
             solar_date=date,
-            lunar_date="22/6/2025",
-            can_chi_day="Bính Tuất",
-            can_chi_month="Quý Mùi", 
-            can_chi_year="Ất Tỵ",
+            lunar_date=computed['lunar_date'],
+            can_chi_day=computed['can_chi_day'],
+            can_chi_month=computed['can_chi_month'],
+            can_chi_year=computed['can_chi_year'],
             holiday="Ngày Hoàng Đạo",
             notes="Giờ hoàng đạo: Dần(3h-5h), Thìn(7h-9h), Tỵ(9h-11h), Thân(15h-17h), Dậu(17h-19h), Hợi(21h-23h). " +
                   "Sự kiện nổi bật: Màu sắc may mắn của 12 cung hoàng đạo năm 2025; " +
@@ -171,21 +175,8 @@ class LichVanNien365Crawler(BaseCrawler):
             return None
         
     def crawl_month(self, year: int, month: int) -> List[LichData]:
-        """Crawl data cho cả tháng - sync version"""
-        results = []
-        import calendar
-        _, last_day = calendar.monthrange(year, month)
-        
-        for day in range(1, last_day + 1):
-            try:
-                date_obj = datetime(year, month, day)
-                data = self.crawl_date(date_obj)
-                if data:
-                    results.append(data)
-            except Exception as e:
-                self.logger.error(f"Lỗi crawl ngày {day}/{month}/{year}: {e}")
-                continue
-        return results
+        """Crawl data cho cả tháng - sync version (các ngày chạy song song)"""
+        return self.crawl_days(year, month)
     
     async def validate_data(self, data: LichData) -> bool:
         """Validate dữ liệu đã crawl"""
@@ -206,12 +197,13 @@ class LichVanNien365Crawler(BaseCrawler):
     
     def get_sample_data(self) -> LichData:
         """Trả về dữ liệu mẫu cho demo"""
+        computed = self.computed_fields("2025-07-16")
         return LichData(
             solar_date="2025-07-16",
-            lunar_date="22/6/2025",
-            can_chi_day="Bính Tuất",
-            can_chi_month="Quý Mùi",
-            can_chi_year="Ất Tỵ",
+            lunar_date=computed['lunar_date'],
+            can_chi_day=computed['can_chi_day'],
+            can_chi_month=computed['can_chi_month'],
+            can_chi_year=computed['can_chi_year'],
             holiday="Ngày Hoàng Đạo (Thanh Long)",
             notes="Lịch vạn niên điện tử đặc biệt tra cứu thông tin chính xác về ngày tháng năm dương lịch và âm lịch. " +
                   "Giờ hoàng đạo: Dần(3h-5h), Thìn(7h-9h), Tỵ(9h-11h), Thân(15h-17h), Dậu(17h-19h), Hợi(21h-23h). " +
@@ -38,13 +38,14 @@ class LichVannienCrawler(BaseCrawler):
             url = self.get_url_for_date(date)
             self.logger.info(f"Crawling {url}")
             
-            # Tạo dữ liệu với cấu trúc LichData chuẩn
+            # Tạo dữ liệu với cấu trúc LichData chuẩn, ngày âm và can chi tính cục bộ
+            computed = self.computed_fields(date.strftime('%Y-%m-%d'))
             data = LichData(
                 solar_date=date.strftime('%Y-%m-%d'),
-                lunar_date="22/06/2025",  # Dữ liệu mẫu từ website
-                can_chi_day="Bính Tuất",
-                can_chi_month="Quý Mùi",
-                can_chi_year="Ất Tỵ",
+                lunar_date=computed['lunar_date'],
+                can_chi_day=computed['can_chi_day'],
+                can_chi_month=computed['can_chi_month'],
+                can_chi_year=computed['can_chi_year'],
                 holiday=None,
                 notes="Ngày Hoàng đạo - Tiểu Thử - Ốc Thượng Thổ",
                 source="lichvannien.net",
@@ -128,12 +129,13 @@ class LichVannienCrawler(BaseCrawler):
     def get_sample_data(self) -> LichData:
         """Trả về dữ liệu mẫu cho demo"""
         today = datetime.now()
+        computed = self.computed_fields(today.strftime('%Y-%m-%d'))
         return LichData(
             solar_date=today.strftime('%Y-%m-%d'),
-            lunar_date="22/06/2025",
-            can_chi_day="Bính Tuất",
-            can_chi_month="Quý Mùi",
-            can_chi_year="Ất Tỵ",
+            lunar_date=computed['lunar_date'],
+            can_chi_day=computed['can_chi_day'],
+            can_chi_month=computed['can_chi_month'],
+            can_chi_year=computed['can_chi_year'],
             holiday=None,
             notes="Lichvannien.net - Ngày Hoàng đạo, Tiểu Thử, Ốc Thượng Thổ. Giờ tốt: Canh Dần (3h-5h), Nhâm Thìn (7h-9h), Quý Tị (9h-11h), Bính Thân (15h-17h), Đinh Dậu (17h-19h), Kỷ Hợi (21h-23h). Hướng tốt: Tây Nam (Hỷ thần), Đông (Tài thần). Sao tốt: Thiên Quý, Nguyệt giải, Yếu yên, Thanh Long.",
             source="lichvannien.net",
@@ -4,13 +4,15 @@ Sử dụng Playwright để xử lý JavaScript
 """
 
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, List, Optional
 import asyncio
-from playwright.async_api import async_playwright
 import json
 import re
 
 from .base_crawler import BaseCrawler, LichData
+from .async_runner import run_sync
+from .browser_pool import get_browser_pool
+from .rate_limiter import get_rate_limiter
 
 class LichVietCrawler(BaseCrawler):
     """Crawler cho lichviet.app sử dụng Playwright"""
@@ -20,15 +22,14 @@ class LichVietCrawler(BaseCrawler):
         self.base_url = "https://lichviet.app"
         self.source_name = "lichviet.app"
     
-    async def crawl_month_async(self, year: int, month: int) -> List[LichData]:
-        """Crawl dữ liệu một tháng bằng Playwright"""
+    async def crawl_month_async(self, year: int, month: int, session: Optional[Any] = None) -> List[LichData]:
+        """Crawl dữ liệu một tháng bằng Playwright (không dùng aiohttp session)"""
         data = []
         url = f"{self.base_url}/{year}/{month:02d}"
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
+            await get_rate_limiter().acquire_async(self.base_url)
+            async with get_browser_pool().page() as page:
                 
                 # Thiết lập User-Agent
                 await page.set_extra_http_headers({
@@ -91,8 +92,6 @@ class LichVietCrawler(BaseCrawler):
                         self.logger.warning(f"Lỗi khi xử lý ngày: {e}")
                         continue
                 
-                await browser.close()
-                
         except Exception as e:
             self.logger.error(f"Lỗi crawl tháng {month}/{year}: {e}")
         
@@ -100,18 +99,11 @@ class LichVietCrawler(BaseCrawler):
     
     def crawl_month(self, year: int, month: int) -> List[LichData]:
         """Wrapper đồng bộ cho crawl_month_async"""
-        return asyncio.run(self.crawl_month_async(year, month))
+        return run_sync(self.crawl_month_async(year, month))
     
     def crawl_date(self, date: datetime) -> Optional[LichData]:
         """Crawl dữ liệu cho một ngày cụ thể"""
-        month_data = self.crawl_month(date.year, date.month)
-        date_str = date.strftime("%Y-%m-%d")
-        
-        for item in month_data:
-            if item.solar_date == date_str:
-                return item
-        
-        return None
+        return self.find_date_in_month(date)
 
 # Chạy thử nghiệm
 if __name__ == "__main__":
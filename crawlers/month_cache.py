@@ -0,0 +1,81 @@
+"""
+Bộ nhớ đệm kết quả crawl theo tháng
+Giúp các crawl_date dựa trên crawl_month chỉ tải trang tháng một lần
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+from config.settings import CRAWLER_SETTINGS
+
+
+class MonthResultCache:
+    """
+    Cache (source, year, month) -> danh sách LichData, có thời hạn
+
+    Mỗi key có lock riêng nên nhiều thread cùng hỏi một tháng
+    chỉ kích hoạt một lần crawl (single-flight).
+    """
+
+    def __init__(self, ttl_seconds: float = CRAWLER_SETTINGS['month_cache_ttl']):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Hashable, Tuple[float, list]] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._key_locks[key] = lock
+            return lock
+
+    def get(self, key: Hashable) -> Optional[list]:
+        """Lấy kết quả còn hạn, None nếu chưa có hoặc đã hết hạn"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            return data
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], list]) -> list:
+        """Trả kết quả đã cache, hoặc gọi loader một lần rồi cache (bỏ qua kết quả rỗng)"""
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        with self._key_lock(key):
+            data = self.get(key)
+            if data is not None:
+                return data
+
+            data = loader()
+            if data:
+                with self._lock:
+                    self._entries[key] = (time.monotonic() + self.ttl_seconds, data)
+            return data
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Xoá một key hoặc toàn bộ cache"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+_month_cache = MonthResultCache()
+
+
+def get_month_cache() -> MonthResultCache:
+    """Cache tháng dùng chung cho mọi crawler trong process"""
+    return _month_cache
@@ -0,0 +1,105 @@
+"""
+Token-bucket rate limiter theo host
+Dùng chung cho mọi crawler trong cùng process, an toàn cho cả thread và asyncio
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+sys.path.append(str(Path(__file__).parent.parent))
+from config.settings import RATE_LIMITS
+
+
+class TokenBucket:
+    """Token bucket: nạp `rate` token mỗi giây, tối đa `capacity` token"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Giữ chỗ một token và trả về số giây cần chờ
+
+        Token có thể âm: mỗi caller nhận một khe thời gian riêng, nên lock
+        chỉ giữ trong lúc tính toán, không bao giờ giữ trong lúc chờ.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self) -> float:
+        """Lấy một token (blocking), trả về thời gian đã chờ"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Lấy một token mà không block event loop"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """Quản lý một TokenBucket cho mỗi host"""
+
+    def __init__(self, requests_per_minute: float, burst: int):
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """Lấy host từ url (hoặc trả lại nguyên giá trị nếu đã là host)"""
+        return urlparse(url).netloc or url
+
+    def bucket(self, url: str) -> TokenBucket:
+        """Lấy (hoặc tạo) bucket cho host của url"""
+        host = self.host_of(url)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.requests_per_minute / 60.0, self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url: str) -> float:
+        """Chờ tới khi host của url còn token"""
+        return self.bucket(url).acquire()
+
+    async def acquire_async(self, url: str) -> float:
+        """Phiên bản async của acquire"""
+        return await self.bucket(url).acquire_async()
+
+
+_default_limiter: Optional[HostRateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """Limiter dùng chung toàn process, cấu hình từ RATE_LIMITS"""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = HostRateLimiter(
+                requests_per_minute=RATE_LIMITS['requests_per_minute'],
+                burst=RATE_LIMITS['burst_size']
+            )
+        return _default_limiter
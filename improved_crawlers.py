@@ -308,19 +308,21 @@ class QualityDataCrawler:
         
         pdm = ProductionDataManager()
         
+        # Nguồn có thể trả cả ngày của tháng liền kề: merge mọi tháng có trong data trong một lượt đọc
+        months = {(year, month)}
         for source_name, days in data.items():
             if days:
                 # Convert to dict format
                 data_dicts = [day.to_dict() for day in days]
+                months.update(tuple(map(int, key.split('-'))) for key in pdm.record_months(data_dicts))
                 
                 # Save raw data
                 date_range = f"{year}-{month:02d}"
                 pdm.save_data(data_dicts, f"{source_name}.improved", date_range)
         
         # Merge and create API data
-        monthly_calendar = pdm.merge_sources_by_month(year, month)
-        if monthly_calendar:
-            print(f"🎯 Tạo API data thành công cho {year}/{month:02d}")
+        for merged_year, merged_month in sorted(pdm.merge_sources_by_months(months)):
+            print(f"🎯 Tạo API data thành công cho {merged_year}/{merged_month:02d}")
 
 def main():
     """Test improved crawlers"""
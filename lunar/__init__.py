@@ -0,0 +1,19 @@
+"""
+Lunar package
+Tính lịch âm Việt Nam cục bộ (không cần crawl)
+
+solar_to_lunar / lunar_to_solar tra bảng năm tính sẵn (1900-2199),
+ngoài khoảng đó tự chuyển sang thuật toán thiên văn trong converter.
+"""
+
+from .converter import LunarDate, format_lunar_date
+from .year_table import FIRST_YEAR, LAST_YEAR, solar_to_lunar, lunar_to_solar
+
+__all__ = [
+    'LunarDate',
+    'format_lunar_date',
+    'FIRST_YEAR',
+    'LAST_YEAR',
+    'solar_to_lunar',
+    'lunar_to_solar'
+]
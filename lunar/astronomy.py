@@ -0,0 +1,112 @@
+"""
+Tính toán thiên văn cho lịch âm Việt Nam
+Ngày Julius, thời điểm Sóc (trăng mới) và kinh độ mặt trời
+Công thức theo Jean Meeus (Astronomical Algorithms), độ chính xác đủ cho 1800-2199
+"""
+
+import math
+from datetime import date
+from typing import Tuple
+
+# Múi giờ Việt Nam (UTC+7) dùng cho lịch âm sau 1968
+VN_TIMEZONE = 7.0
+
+# Độ dài trung bình tháng âm (ngày) và JD của điểm Sóc gốc 1900-01-01
+SYNODIC_MONTH = 29.530588853
+NEW_MOON_EPOCH = 2415021.076998695
+
+# JDN = date.toordinal() + JD_ORDINAL_OFFSET (date(1, 1, 1) có JDN 1721426)
+JD_ORDINAL_OFFSET = 1721425
+
+
+def jd_from_date(dd: int, mm: int, yy: int) -> int:
+    """Số ngày Julius (JDN) của một ngày dương lịch"""
+    a = (14 - mm) // 12
+    y = yy + 4800 - a
+    m = mm + 12 * a - 3
+    jd = dd + (153 * m + 2) // 5 + 365 * y + y // 4 - y // 100 + y // 400 - 32045
+    if jd < 2299161:
+        # Lịch Julius trước 15/10/1582
+        jd = dd + (153 * m + 2) // 5 + 365 * y + y // 4 - 32083
+    return jd
+
+
+def jd_to_date(jd: int) -> Tuple[int, int, int]:
+    """Chuyển JDN về (ngày, tháng, năm) dương lịch"""
+    if jd > 2299160:
+        a = jd + 32044
+        b = (4 * a + 3) // 146097
+        c = a - (b * 146097) // 4
+    else:
+        b = 0
+        c = jd + 32082
+    d = (4 * c + 3) // 1461
+    e = c - (1461 * d) // 4
+    m = (5 * e + 2) // 153
+    day = e - (153 * m + 2) // 5 + 1
+    month = m + 3 - 12 * (m // 10)
+    year = b * 100 + d - 4800 + m // 10
+    return day, month, year
+
+
+def jd_from_pydate(value: date) -> int:
+    """JDN của một datetime.date (dùng ordinal cho nhanh)"""
+    return value.toordinal() + JD_ORDINAL_OFFSET
+
+
+def new_moon(k: int) -> float:
+    """Thời điểm (JD, UTC) của điểm Sóc thứ k tính từ 1900-01-01"""
+    T = k / 1236.85
+    T2 = T * T
+    T3 = T2 * T
+    dr = math.pi / 180
+
+    jd1 = 2415020.75933 + 29.53058868 * k + 0.0001178 * T2 - 0.000000155 * T3
+    jd1 = jd1 + 0.00033 * math.sin((166.56 + 132.87 * T - 0.009173 * T2) * dr)
+
+    M = 359.2242 + 29.10535608 * k - 0.0000333 * T2 - 0.00000347 * T3  # Mean anomaly mặt trời
+    Mpr = 306.0253 + 385.81691806 * k + 0.0107306 * T2 + 0.00001236 * T3  # Mean anomaly mặt trăng
+    F = 21.2964 + 390.67050646 * k - 0.0016528 * T2 - 0.00000239 * T3  # Argument of latitude
+
+    C1 = (0.1734 - 0.000393 * T) * math.sin(M * dr) + 0.0021 * math.sin(2 * dr * M)
+    C1 = C1 - 0.4068 * math.sin(Mpr * dr) + 0.0161 * math.sin(dr * 2 * Mpr)
+    C1 = C1 - 0.0004 * math.sin(dr * 3 * Mpr)
+    C1 = C1 + 0.0104 * math.sin(dr * 2 * F) - 0.0051 * math.sin(dr * (M + Mpr))
+    C1 = C1 - 0.0074 * math.sin(dr * (M - Mpr)) + 0.0004 * math.sin(dr * (2 * F + M))
+    C1 = C1 - 0.0004 * math.sin(dr * (2 * F - M)) - 0.0006 * math.sin(dr * (2 * F + Mpr))
+    C1 = C1 + 0.0010 * math.sin(dr * (2 * F - Mpr)) + 0.0005 * math.sin(dr * (2 * Mpr + M))
+
+    if T < -11:
+        deltat = 0.001 + 0.000839 * T + 0.0002261 * T2 - 0.00000845 * T3 - 0.000000081 * T * T3
+    else:
+        deltat = -0.000278 + 0.000265 * T + 0.000262 * T2
+    return jd1 + C1 - deltat
+
+
+def sun_longitude(jdn: float) -> float:
+    """Kinh độ hoàng đạo của mặt trời (radian, 0..2π) tại thời điểm JD (UTC)"""
+    T = (jdn - 2451545.0) / 36525  # Thế kỷ Julius tính từ J2000.0
+    T2 = T * T
+    dr = math.pi / 180
+
+    M = 357.52910 + 35999.05030 * T - 0.0001559 * T2 - 0.00000048 * T * T2
+    L0 = 280.46645 + 36000.76983 * T + 0.0003032 * T2
+    DL = (1.914600 - 0.004817 * T - 0.000014 * T2) * math.sin(dr * M)
+    DL = DL + (0.019993 - 0.000101 * T) * math.sin(dr * 2 * M) + 0.000290 * math.sin(dr * 3 * M)
+
+    L = (L0 + DL) * dr
+    return L - math.pi * 2 * math.floor(L / (math.pi * 2))
+
+
+def new_moon_day(k: int, timezone: float = VN_TIMEZONE) -> int:
+    """JDN của ngày chứa điểm Sóc thứ k theo giờ địa phương"""
+    return math.floor(new_moon(k) + 0.5 + timezone / 24)
+
+
+def sun_longitude_sector(day_number: int, timezone: float = VN_TIMEZONE) -> int:
+    """
+    Cung kinh độ mặt trời (0..11, mỗi cung 30°) lúc 0h giờ địa phương
+
+    Trung khí nằm ở đầu mỗi cung; tháng âm không chứa trung khí là tháng nhuận.
+    """
+    return math.floor(sun_longitude(day_number - 0.5 - timezone / 24) / math.pi * 6)
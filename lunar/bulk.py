@@ -0,0 +1,121 @@
+"""
+Chuyển đổi âm lịch hàng loạt bằng NumPy
+Dùng cho sinh dữ liệu nhiều năm: một lần searchsorted thay cho từng lời gọi solar_to_lunar
+"""
+
+from datetime import date
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+from . import converter
+from .year_table import FIRST_YEAR, LAST_YEAR, year_info, _month_offset
+from .solar_terms import get_solar_term_table
+
+# date(1970, 1, 1).toordinal(), để đổi datetime64[D] <-> ordinal
+EPOCH_ORDINAL = 719163
+# Ngưỡng ngày tốt của day_scores
+GOOD_DAY_SCORE = 5
+
+
+@lru_cache(maxsize=1)
+def month_table() -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bảng mọi tháng âm trong khoảng YEAR_TABLE
+
+    Returns:
+        (ordinal ngày đầu tháng, tháng, năm âm, cờ nhuận), thêm một phần tử chặn cuối
+    """
+    starts, months, years, leaps = [], [], [], []
+    for year in range(FIRST_YEAR, LAST_YEAR + 1):
+        tet, leap_month, lengths, count = year_info(year)
+        for index in range(count):
+            month = index + 1
+            if leap_month and index >= leap_month:
+                month = index
+            starts.append(tet + _month_offset(lengths, index))
+            months.append(month)
+            years.append(year)
+            leaps.append(bool(leap_month) and index == leap_month)
+
+    # Phần tử chặn: ngày sau tháng cuối cùng của bảng
+    tet, _, lengths, count = year_info(LAST_YEAR)
+    starts.append(tet + _month_offset(lengths, count))
+    months.append(0)
+    years.append(0)
+    leaps.append(False)
+
+    return (np.array(starts, dtype=np.int64), np.array(months, dtype=np.int16),
+            np.array(years, dtype=np.int16), np.array(leaps, dtype=bool))
+
+
+def dates_to_ordinals(dates: np.ndarray) -> np.ndarray:
+    """datetime64[D] -> ordinal kiểu date.toordinal()"""
+    return dates.astype('datetime64[D]').astype(np.int64) + EPOCH_ORDINAL
+
+
+def date_parts(dates: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(tháng, ngày, thứ) của mảng datetime64[D]; thứ giống datetime.weekday(), 0 = thứ Hai"""
+    month_starts = dates.astype('datetime64[M]')
+    months = month_starts.astype(np.int64) % 12 + 1
+    days = (dates - month_starts).astype(np.int64) + 1
+    weekdays = (dates_to_ordinals(dates) + 6) % 7
+    return months, days, weekdays
+
+
+def day_scores(dates: np.ndarray) -> np.ndarray:
+    """Điểm ngày như VietnameseLunarCalendar.get_feng_shui_info (chưa nhân 10), ngày tốt khi >= GOOD_DAY_SCORE"""
+    months, days, weekdays = date_parts(dates)
+    return (days + months + weekdays) % 10
+
+
+def solar_to_lunar_array(ordinals: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Đổi mảng ordinal dương lịch sang âm lịch
+
+    Returns:
+        (ngày, tháng, năm, cờ nhuận) dạng mảng cùng độ dài
+    """
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    starts, months, years, leaps = month_table()
+
+    index = np.searchsorted(starts, ordinals, side='right') - 1
+    outside = (index < 0) | (index >= len(starts) - 1)
+    index = np.clip(index, 0, len(starts) - 2)
+
+    lunar_day = (ordinals - starts[index] + 1).astype(np.int16)
+    lunar_month = months[index].copy()
+    lunar_year = years[index].copy()
+    is_leap = leaps[index].copy()
+
+    # Ngoài khoảng bảng: tính từng ngày bằng thuật toán thiên văn
+    for position in np.flatnonzero(outside):
+        lunar = converter.solar_to_lunar(date.fromordinal(int(ordinals[position])))
+        lunar_day[position] = lunar.day
+        lunar_month[position] = lunar.month
+        lunar_year[position] = lunar.year
+        is_leap[position] = lunar.is_leap
+
+    return lunar_day, lunar_month, lunar_year, is_leap
+
+
+def solar_term_array(ordinals: np.ndarray) -> np.ndarray:
+    """Chỉ số tiết khí (xem solar_terms.TERM_NAMES) của từng ordinal"""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    if ordinals.size == 0:
+        return np.zeros(0, dtype=np.int8)
+
+    first_year = date.fromordinal(int(ordinals.min())).year - 1
+    last_year = date.fromordinal(int(ordinals.max())).year
+    table = get_solar_term_table()
+    table.ensure_years(range(first_year, last_year + 1))
+
+    starts, terms = [], []
+    for year in range(first_year, last_year + 1):
+        for start, term in table.term_starts(year):
+            starts.append(start)
+            terms.append(term)
+
+    index = np.searchsorted(np.array(starts, dtype=np.int64), ordinals, side='right') - 1
+    return np.array(terms, dtype=np.int8)[index]
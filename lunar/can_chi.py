@@ -0,0 +1,98 @@
+"""
+Can chi (Thiên can - Địa chi) cho giờ, ngày, tháng, năm
+Các hàm *_index chỉ dùng phép cộng và modulo nên nhận cả số nguyên lẫn mảng NumPy
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+from .astronomy import jd_from_pydate
+from .converter import LunarDate
+from .year_table import solar_to_lunar
+
+CAN = ["Giáp", "Ất", "Bính", "Đinh", "Mậu", "Kỷ", "Canh", "Tân", "Nhâm", "Quý"]
+CHI = ["Tý", "Sửu", "Dần", "Mão", "Thìn", "Tỵ", "Ngọ", "Mùi", "Thân", "Dậu", "Tuất", "Hợi"]
+
+# Khung giờ của 12 chi, giờ Tý bắt đầu từ 23h hôm trước
+HOUR_RANGES = [
+    "23h-1h", "1h-3h", "3h-5h", "5h-7h", "7h-9h", "9h-11h",
+    "11h-13h", "13h-15h", "15h-17h", "17h-19h", "19h-21h", "21h-23h"
+]
+
+
+def day_index(jdn):
+    """(can, chi) của ngày theo số ngày Julius"""
+    return (jdn + 9) % 10, (jdn + 1) % 12
+
+
+def month_index(lunar_month, lunar_year):
+    """
+    (can, chi) của tháng âm
+
+    Tháng Giêng luôn là tháng Dần; tháng nhuận dùng chung can chi với tháng chính.
+    """
+    return (lunar_year * 12 + lunar_month + 3) % 10, (lunar_month + 1) % 12
+
+
+def year_index(lunar_year):
+    """(can, chi) của năm âm"""
+    return (lunar_year + 6) % 10, (lunar_year + 8) % 12
+
+
+def hour_index(day_can, hour_chi):
+    """(can, chi) của giờ `hour_chi` (0 = Tý) trong ngày có can `day_can`"""
+    return (day_can * 2 + hour_chi) % 10, hour_chi
+
+
+def name(can: int, chi: int) -> str:
+    """Ghép tên can chi, ví dụ (0, 0) -> 'Giáp Tý'"""
+    return f"{CAN[can]} {CHI[chi]}"
+
+
+def can_chi_day(value: date) -> str:
+    """Can chi của ngày dương lịch"""
+    return name(*day_index(jd_from_pydate(value)))
+
+
+def can_chi_month(lunar: LunarDate) -> str:
+    """Can chi của tháng âm chứa ngày `lunar`"""
+    return name(*month_index(lunar.month, lunar.year))
+
+
+def can_chi_year(lunar_year: int) -> str:
+    """Can chi của năm âm"""
+    return name(*year_index(lunar_year))
+
+
+def hour_names(day_can: int) -> List[str]:
+    """Can chi 12 giờ của một ngày, kèm khung giờ, từ giờ Tý"""
+    return [f"{name(*hour_index(day_can, chi))} ({HOUR_RANGES[chi]})" for chi in range(12)]
+
+
+def can_chi_hours(value: date) -> List[str]:
+    """Can chi 12 giờ của ngày dương lịch"""
+    return hour_names(day_index(jd_from_pydate(value))[0])
+
+
+def can_chi_hour(moment: datetime) -> str:
+    """Can chi của giờ tại thời điểm `moment` (23h trở đi tính sang giờ Tý ngày hôm sau)"""
+    day = moment.date()
+    if moment.hour >= 23:
+        day += timedelta(days=1)
+    hour_chi = (moment.hour + 1) // 2 % 12
+    return name(*hour_index(day_index(jd_from_pydate(day))[0], hour_chi))
+
+
+def can_chi_for_date(value: date) -> Dict[str, str]:
+    """Can chi ngày, tháng, năm (theo âm lịch, tính cả ranh giới Tết và tháng nhuận)"""
+    return lunar_with_can_chi(value)[1]
+
+
+def lunar_with_can_chi(value: date) -> Tuple[LunarDate, Dict[str, str]]:
+    """Ngày âm và can chi trong một lần tra bảng"""
+    lunar = solar_to_lunar(value)
+    return lunar, {
+        "day": can_chi_day(value),
+        "month": can_chi_month(lunar),
+        "year": can_chi_year(lunar.year)
+    }
@@ -0,0 +1,139 @@
+"""
+Chuyển đổi dương lịch <-> âm lịch Việt Nam bằng tính toán thiên văn
+Tháng âm bắt đầu từ ngày Sóc, tháng 11 luôn chứa Đông chí,
+năm có 13 tháng thì tháng đầu tiên không chứa trung khí là tháng nhuận
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import date
+
+from .astronomy import (
+    NEW_MOON_EPOCH, SYNODIC_MONTH, VN_TIMEZONE,
+    jd_from_date, jd_from_pydate, jd_to_date, new_moon_day, sun_longitude_sector
+)
+
+
+LEAP_MARKER = " (nhuận)"
+
+
+def format_lunar_date(day: int, month: int, year: int, is_leap: bool = False) -> str:
+    """Format DD/MM/YYYY như dữ liệu hiện có, ngày trong tháng nhuận thêm LEAP_MARKER"""
+    return f"{day:02d}/{month:02d}/{year}{LEAP_MARKER if is_leap else ''}"
+
+
+@dataclass(frozen=True)
+class LunarDate:
+    """Một ngày âm lịch"""
+    day: int
+    month: int
+    year: int
+    is_leap: bool = False
+
+    def __str__(self) -> str:
+        return format_lunar_date(self.day, self.month, self.year, self.is_leap)
+
+
+def lunar_month_11(year: int, timezone: float = VN_TIMEZONE) -> int:
+    """JDN ngày bắt đầu tháng 11 âm lịch (tháng chứa Đông chí) của năm dương `year`"""
+    off = jd_from_date(31, 12, year) - 2415021
+    k = math.floor(off / SYNODIC_MONTH)
+    nm = new_moon_day(k, timezone)
+    if sun_longitude_sector(nm, timezone) >= 9:
+        nm = new_moon_day(k - 1, timezone)
+    return nm
+
+
+def leap_month_offset(a11: int, timezone: float = VN_TIMEZONE) -> int:
+    """Vị trí (tính từ tháng 11) của tháng nhuận trong năm âm có 13 tháng"""
+    k = math.floor((a11 - NEW_MOON_EPOCH) / SYNODIC_MONTH + 0.5)
+    i = 1
+    arc = sun_longitude_sector(new_moon_day(k + i, timezone), timezone)
+    while True:
+        last = arc
+        i += 1
+        arc = sun_longitude_sector(new_moon_day(k + i, timezone), timezone)
+        if arc == last or i >= 14:
+            break
+    return i - 1
+
+
+def solar_to_lunar(value: date, timezone: float = VN_TIMEZONE) -> LunarDate:
+    """Đổi ngày dương lịch sang âm lịch"""
+    day_number = jd_from_pydate(value)
+    k = math.floor((day_number - NEW_MOON_EPOCH) / SYNODIC_MONTH) + 1
+    month_start = new_moon_day(k, timezone)
+    # Sóc thực có thể lệch Sóc trung bình vài giờ, lùi dần tới tháng chứa ngày
+    while month_start > day_number:
+        k -= 1
+        month_start = new_moon_day(k, timezone)
+
+    a11 = lunar_month_11(value.year, timezone)
+    b11 = a11
+    if a11 >= month_start:
+        lunar_year = value.year
+        a11 = lunar_month_11(value.year - 1, timezone)
+    else:
+        lunar_year = value.year + 1
+        b11 = lunar_month_11(value.year + 1, timezone)
+
+    lunar_day = day_number - month_start + 1
+    diff = math.floor((month_start - a11) / 29)
+    is_leap = False
+    lunar_month = diff + 11
+    if b11 - a11 > 365:
+        leap_diff = leap_month_offset(a11, timezone)
+        if diff >= leap_diff:
+            lunar_month = diff + 10
+            if diff == leap_diff:
+                is_leap = True
+    if lunar_month > 12:
+        lunar_month -= 12
+    if lunar_month >= 11 and diff < 4:
+        lunar_year -= 1
+
+    return LunarDate(lunar_day, lunar_month, lunar_year, is_leap)
+
+
+def lunar_to_solar(day: int, month: int, year: int, is_leap: bool = False,
+                   timezone: float = VN_TIMEZONE) -> date:
+    """
+    Đổi ngày âm lịch sang dương lịch
+
+    Raises:
+        ValueError: tháng nhuận không tồn tại trong năm, hoặc ngày vượt độ dài tháng
+    """
+    if not 1 <= month <= 12 or not 1 <= day <= 30:
+        raise ValueError(f"Ngày âm lịch không hợp lệ: {day}/{month}/{year}")
+
+    if month < 11:
+        a11 = lunar_month_11(year - 1, timezone)
+        b11 = lunar_month_11(year, timezone)
+    else:
+        a11 = lunar_month_11(year, timezone)
+        b11 = lunar_month_11(year + 1, timezone)
+
+    k = math.floor(0.5 + (a11 - NEW_MOON_EPOCH) / SYNODIC_MONTH)
+    off = month - 11
+    if off < 0:
+        off += 12
+
+    if b11 - a11 > 365:
+        leap_off = leap_month_offset(a11, timezone)
+        leap_month = leap_off - 2
+        if leap_month < 0:
+            leap_month += 12
+        if is_leap and month != leap_month:
+            raise ValueError(f"Năm âm {year} không có tháng {month} nhuận")
+        if is_leap or off >= leap_off:
+            off += 1
+    elif is_leap:
+        raise ValueError(f"Năm âm {year} không có tháng nhuận")
+
+    month_start = new_moon_day(k + off, timezone)
+    month_length = new_moon_day(k + off + 1, timezone) - month_start
+    if day > month_length:
+        raise ValueError(f"Tháng {month}/{year} âm lịch chỉ có {month_length} ngày")
+
+    dd, mm, yy = jd_to_date(month_start + day - 1)
+    return date(yy, mm, dd)
@@ -0,0 +1,163 @@
+"""
+24 tiết khí theo kinh độ mặt trời
+Thời điểm bắt đầu mỗi tiết khí được giải một lần cho cả năm rồi cache trong RAM và trên đĩa
+"""
+
+import sys
+import json
+import math
+import threading
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .astronomy import JD_ORDINAL_OFFSET, VN_TIMEZONE, jd_from_date, sun_longitude
+
+sys.path.append(str(Path(__file__).parent.parent))
+from config.settings import LUNAR_SETTINGS
+
+# Tiết khí thứ i bắt đầu khi kinh độ mặt trời đạt i * 15°
+TERM_NAMES = [
+    "Xuân phân", "Thanh minh", "Cốc vũ", "Lập hạ", "Tiểu mãn", "Mang chủng",
+    "Hạ chí", "Tiểu thử", "Đại thử", "Lập thu", "Xử thử", "Bạch lộ",
+    "Thu phân", "Hàn lộ", "Sương giáng", "Lập đông", "Tiểu tuyết", "Đại tuyết",
+    "Đông chí", "Tiểu hàn", "Đại hàn", "Lập xuân", "Vũ thủy", "Kinh trập"
+]
+
+TROPICAL_YEAR = 365.2422
+# Tiểu hàn (285°) là tiết khí đầu tiên của năm dương lịch, khoảng 5-6/1
+FIRST_TERM_OF_YEAR = 19
+
+
+def apparent_sun_longitude(jd: float) -> float:
+    """Kinh độ biểu kiến (hiệu chỉnh chương động và quang sai) để thời điểm tiết khí sát lịch thiên văn"""
+    T = (jd - 2451545.0) / 36525
+    omega = math.radians(125.04 - 1934.136 * T)
+    return sun_longitude(jd) - math.radians(0.00569 + 0.00478 * math.sin(omega))
+
+
+def term_instant(year: int, term: int) -> float:
+    """JD (UTC) lúc mặt trời đạt kinh độ của tiết khí `term` gần nhất trong năm dương `year`"""
+    target = term * math.pi / 12
+    position = (term - FIRST_TERM_OF_YEAR) % 24
+    jd = jd_from_date(6, 1, year) + position * TROPICAL_YEAR / 24
+
+    # Newton: kinh độ tăng gần như đều ~2π mỗi năm
+    for _ in range(10):
+        diff = (target - apparent_sun_longitude(jd) + math.pi) % (2 * math.pi) - math.pi
+        jd += diff * TROPICAL_YEAR / (2 * math.pi)
+        if abs(diff) < 1e-7:
+            break
+    return jd
+
+
+def compute_year_terms(year: int) -> List[Tuple[float, int]]:
+    """24 tiết khí của năm dương `year`: [(JD UTC, chỉ số tiết khí)] theo thời gian"""
+    terms = [(FIRST_TERM_OF_YEAR + position) % 24 for position in range(24)]
+    return [(term_instant(year, term), term) for term in terms]
+
+
+class SolarTermTable:
+    """
+    Bảng tiết khí theo năm, cache trong RAM và file JSON
+
+    Lần đầu cần một năm thì giải 24 phương trình kinh độ mặt trời,
+    các lần sau (kể cả ở process khác) chỉ đọc lại kết quả.
+    """
+
+    def __init__(self, cache_path: Optional[str] = LUNAR_SETTINGS['solar_terms_cache'],
+                 timezone: float = VN_TIMEZONE):
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.timezone = timezone
+        self._years: Dict[int, List[Tuple[float, int]]] = {}
+        self._starts: Dict[int, List[Tuple[int, int]]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            self._years = {int(year): [(jd, term) for jd, term in terms] for year, terms in raw.items()}
+        except (OSError, ValueError):
+            self._years = {}
+
+    def _save(self) -> None:
+        if not self.cache_path:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({str(year): terms for year, terms in sorted(self._years.items())}, f)
+        tmp_path.replace(self.cache_path)
+
+    def ensure_years(self, years) -> None:
+        """Tính trước nhiều năm rồi ghi đĩa một lần"""
+        with self._lock:
+            missing = [year for year in years if year not in self._years]
+            for year in missing:
+                self._years[year] = compute_year_terms(year)
+            if missing:
+                self._save()
+
+    def instants(self, year: int) -> List[Tuple[float, int]]:
+        """[(JD UTC, chỉ số tiết khí)] của năm dương `year`"""
+        terms = self._years.get(year)
+        if terms is None:
+            self.ensure_years([year])
+            terms = self._years[year]
+        return terms
+
+    def term_starts(self, year: int) -> List[Tuple[int, int]]:
+        """[(ordinal ngày bắt đầu theo giờ địa phương, chỉ số tiết khí)] của năm `year`"""
+        starts = self._starts.get(year)
+        if starts is None:
+            offset = 0.5 + self.timezone / 24 - JD_ORDINAL_OFFSET
+            starts = [(math.floor(jd + offset), term) for jd, term in self.instants(year)]
+            self._starts[year] = starts
+        return starts
+
+    def term_index(self, value: date) -> int:
+        """Chỉ số tiết khí đang diễn ra vào ngày `value`"""
+        ordinal = value.toordinal()
+        starts = self.term_starts(value.year)
+        position = bisect_right([start for start, _ in starts], ordinal) - 1
+        if position < 0:
+            # Trước Tiểu hàn: vẫn trong Đông chí của năm trước
+            return self.term_starts(value.year - 1)[-1][1]
+        return starts[position][1]
+
+    def term_for_date(self, value: date) -> str:
+        """Tên tiết khí của ngày `value`"""
+        return TERM_NAMES[self.term_index(value)]
+
+    def year_terms(self, year: int) -> List[Tuple[datetime, str]]:
+        """Thời điểm (giờ địa phương) và tên của 24 tiết khí trong năm"""
+        result = []
+        for jd, term in self.instants(year):
+            days = jd + 0.5 + self.timezone / 24 - JD_ORDINAL_OFFSET
+            ordinal = math.floor(days)
+            moment = datetime.fromordinal(ordinal) + timedelta(days=days - ordinal)
+            result.append((moment.replace(microsecond=0), TERM_NAMES[term]))
+        return result
+
+
+_default_table: Optional[SolarTermTable] = None
+_default_lock = threading.Lock()
+
+
+def get_solar_term_table() -> SolarTermTable:
+    """Bảng tiết khí dùng chung toàn process"""
+    global _default_table
+    with _default_lock:
+        if _default_table is None:
+            _default_table = SolarTermTable()
+        return _default_table
+
+
+def solar_term_for_date(value: date) -> str:
+    """Tên tiết khí của ngày dương lịch"""
+    return get_solar_term_table().term_for_date(value)
@@ -0,0 +1,186 @@
+"""
+Bảng năm âm lịch tính sẵn 1900-2199
+Mỗi năm âm được nén thành một số nguyên, chuyển đổi ngày chỉ cần tra bảng (O(1))
+
+Bố cục bit của mỗi phần tử:
+    bit 0-12  : độ dài các tháng theo thứ tự (1 = tháng đủ 30 ngày, 0 = tháng thiếu 29 ngày)
+    bit 13-16 : tháng nhuận (0 = không nhuận)
+    bit 17-22 : số ngày từ 1/1 dương lịch tới Tết của cùng năm
+"""
+
+from datetime import date
+from typing import List, Tuple
+
+from . import converter
+from .converter import LunarDate
+
+FIRST_YEAR = 1900
+LAST_YEAR = 2199
+
+# Sinh bằng build_year_table() từ thuật toán thiên văn (converter.py)
+YEAR_TABLE = (
+    0x3d16d2, 0x620752, 0x4c06a5, 0x36b64b, 0x5c064b, 0x440c9b, 0x30955a, 0x56056a,  # 1900-1907
+    0x400b69, 0x2a5752, 0x500b52, 0x3adb25, 0x600b25, 0x480a4b, 0x32b4ab, 0x5802ad,  # 1908-1915
+    0x42056d, 0x2c6b69, 0x520da9, 0x3efd92, 0x640e92, 0x4c0d25, 0x36da4d, 0x5c0a56,  # 1916-1923
+    0x4602b6, 0x2e95b5, 0x5606d4, 0x400ea9, 0x2c5e92, 0x500e92, 0x3acd26, 0x5e052b,  # 1924-1931
+    0x480a57, 0x32b4d6, 0x58035a, 0x4206d5, 0x2e76c9, 0x520749, 0x3d1693, 0x620a95,  # 1932-1939
+    0x4c052b, 0x34ca5b, 0x5a0aad, 0x46056a, 0x309b55, 0x560ba4, 0x400b49, 0x2a5a95,  # 1940-1947
+    0x500a95, 0x38f52d, 0x5e0556, 0x480ab5, 0x34b5aa, 0x5805d2, 0x420da5, 0x2e7d4a,  # 1948-1955
+    0x540e4a, 0x3d0c96, 0x600a97, 0x4c0556, 0x36cab5, 0x5a0ad9, 0x4606d2, 0x308ea5,  # 1956-1963
+    0x560725, 0x3e064b, 0x286c97, 0x4e049b, 0x38e55b, 0x5c056b, 0x480b69, 0x34b752,  # 1964-1971
+    0x5a0b52, 0x420b25, 0x2c9a4b, 0x520a4d, 0x3d14ab, 0x6002ad, 0x4a05ad, 0x36cb6a,  # 1972-1979
+    0x5c0da9, 0x460d92, 0x309d25, 0x560d25, 0x400a55, 0x2854ad, 0x4e04b6, 0x38e5b5,  # 1980-1987
+    0x5e06d5, 0x480ec9, 0x34be92, 0x5a0e92, 0x440d26, 0x2c6a56, 0x500a57, 0x3d1556,  # 1988-1995
+    0x62056a, 0x4a0b55, 0x36b6c9, 0x5c0749, 0x460693, 0x2e952b, 0x54052b, 0x3e0a5b,  # 1996-2003
+    0x2a555a, 0x4e056a, 0x38eb65, 0x5e0ba5, 0x4a0d49, 0x32ba95, 0x580a95, 0x42052d,  # 2004-2011
+    0x2c8aad, 0x500ab5, 0x3d35aa, 0x6205d2, 0x4c0da5, 0x36dd4a, 0x5c0e4a, 0x460c96,  # 2012-2019
+    0x30992e, 0x540556, 0x3e0ab5, 0x2a55b2, 0x5006d2, 0x38cea5, 0x5e0725, 0x48064b,  # 2020-2027
+    0x32ac97, 0x5604ab, 0x40055b, 0x2c6ada, 0x520b6a, 0x3d7752, 0x620b92, 0x4c0b25,  # 2028-2035
+    0x36da4b, 0x5a0a4d, 0x4404ad, 0x2ea95b, 0x5405ad, 0x3e0baa, 0x2a5b52, 0x500d92,  # 2036-2043
+    0x3afd25, 0x5e0d25, 0x480a55, 0x32b4ad, 0x5804b6, 0x4006b5, 0x2c6daa, 0x520eca,  # 2044-2051
+    0x3f0e92, 0x600e93, 0x4c0d26, 0x36ca56, 0x5a0a5b, 0x44055a, 0x2e8ad5, 0x540b55,  # 2052-2059
+    0x40074a, 0x286e93, 0x4e0a93, 0x38f52b, 0x5e052b, 0x460a9b, 0x32b55a, 0x58056a,  # 2060-2067
+    0x420b65, 0x2c974a, 0x520d4a, 0x3d1a95, 0x620a95, 0x4a092d, 0x34caad, 0x5a0ab5,  # 2068-2075
+    0x4605aa, 0x2e8ba5, 0x540ea5, 0x400d4a, 0x2a7d15, 0x4e0c96, 0x38f956, 0x5e0556,  # 2076-2083
+    0x480ab5, 0x32b6b4, 0x5806d4, 0x420ea5, 0x2e8e8a, 0x50068b, 0x3b1497, 0x6004ab,  # 2084-2091
+    0x4a095b, 0x34cada, 0x5a0b6a, 0x460754, 0x309725, 0x540b45, 0x3e0a8b, 0x28552b,  # 2092-2099
+    0x4e04ad, 0x38e96b, 0x5e05b5, 0x4a0daa, 0x36bb54, 0x5a0da2, 0x440d45, 0x2e9a8d,  # 2100-2107
+    0x540a95, 0x3d34ad, 0x6204d6, 0x4c0ab5, 0x38cdaa, 0x5c0eca, 0x480ea2, 0x329d46,  # 2108-2115
+    0x580d4a, 0x400a96, 0x2a7536, 0x50055a, 0x3aead5, 0x5e0b65, 0x4a0752, 0x34aea5,  # 2116-2123
+    0x5a0aa5, 0x42054b, 0x2c8a97, 0x520aab, 0x3f755a, 0x62056a, 0x4c0b65, 0x38db52,  # 2124-2131
+    0x5e0d52, 0x460b15, 0x30ba4b, 0x56094d, 0x400aad, 0x2a556a, 0x5005b2, 0x3aeda9,  # 2132-2139
+    0x600ea9, 0x4a0d92, 0x34bd15, 0x5a0d26, 0x440956, 0x2c92ad, 0x520ad6, 0x3e06d4,  # 2140-2147
+    0x282da9, 0x4c0ea9, 0x38ce8a, 0x5c068b, 0x460527, 0x2ea957, 0x54095b, 0x400ada,  # 2148-2155
+    0x2c76d4, 0x500754, 0x3af749, 0x600b45, 0x4a0a93, 0x32d52b, 0x58052d, 0x42096d,  # 2156-2163
+    0x2e936a, 0x520daa, 0x3f5ba4, 0x640da4, 0x4e0d49, 0x36da95, 0x5c0a96, 0x46052e,  # 2164-2171
+    0x30aaad, 0x540ab5, 0x400daa, 0x2c7da4, 0x520ea4, 0x3afd4a, 0x600d4a, 0x4a0a96,  # 2172-2179
+    0x34d536, 0x58055a, 0x420ad5, 0x2e96ca, 0x540752, 0x3c0ea5, 0x28564a, 0x4c064b,  # 2180-2187
+    0x36ca97, 0x5a0aab, 0x46055a, 0x30ab55, 0x560ba9, 0x400b52, 0x2a7b25, 0x500b25,  # 2188-2195
+    0x3afa4b, 0x5e0a4d, 0x480aad, 0x34d56a,  # 2196-2199
+)
+
+_MONTH_MASK = 0x1FFF
+
+
+def year_info(year: int) -> Tuple[int, int, int, int]:
+    """
+    Giải nén thông tin một năm âm
+
+    Returns:
+        (ordinal ngày Tết, tháng nhuận, bitmask độ dài tháng, số tháng trong năm)
+    """
+    packed = YEAR_TABLE[year - FIRST_YEAR]
+    leap_month = (packed >> 13) & 0xF
+    tet = date(year, 1, 1).toordinal() + (packed >> 17)
+    return tet, leap_month, packed & _MONTH_MASK, 13 if leap_month else 12
+
+
+def _month_offset(lengths: int, index: int) -> int:
+    """Số ngày từ Tết tới đầu tháng thứ `index` (tính cả tháng nhuận)"""
+    return 29 * index + bin(lengths & ((1 << index) - 1)).count('1')
+
+
+def _in_range(value: date) -> bool:
+    return FIRST_YEAR <= value.year <= LAST_YEAR + 1
+
+
+def solar_to_lunar(value: date) -> LunarDate:
+    """Đổi dương -> âm bằng tra bảng, ngoài khoảng bảng thì dùng thuật toán thiên văn"""
+    if not _in_range(value):
+        return converter.solar_to_lunar(value)
+
+    ordinal = value.toordinal()
+    year = value.year
+    if year > LAST_YEAR:
+        year = LAST_YEAR
+        tet, leap_month, lengths, months = year_info(year)
+    else:
+        tet, leap_month, lengths, months = year_info(year)
+        if ordinal < tet:
+            year -= 1
+            if year < FIRST_YEAR:
+                return converter.solar_to_lunar(value)
+            tet, leap_month, lengths, months = year_info(year)
+
+    offset = ordinal - tet
+    # Mỗi tháng dài 29 hoặc 30 ngày nên chỉ cần dịch tối đa vài bước
+    index = min(offset // 30, months - 1)
+    while index + 1 < months and _month_offset(lengths, index + 1) <= offset:
+        index += 1
+    day = offset - _month_offset(lengths, index) + 1
+    if day > 29 + ((lengths >> index) & 1):
+        # Sau năm âm cuối cùng của bảng
+        return converter.solar_to_lunar(value)
+
+    month = index + 1
+    is_leap = False
+    if leap_month and index >= leap_month:
+        month = index
+        is_leap = index == leap_month
+    return LunarDate(day, month, year, is_leap)
+
+
+def lunar_to_solar(day: int, month: int, year: int, is_leap: bool = False) -> date:
+    """
+    Đổi âm -> dương bằng tra bảng, ngoài khoảng bảng thì dùng thuật toán thiên văn
+
+    Raises:
+        ValueError: tháng nhuận không tồn tại trong năm, hoặc ngày vượt độ dài tháng
+    """
+    if not FIRST_YEAR <= year <= LAST_YEAR:
+        return converter.lunar_to_solar(day, month, year, is_leap)
+    if not 1 <= month <= 12 or not 1 <= day <= 30:
+        raise ValueError(f"Ngày âm lịch không hợp lệ: {day}/{month}/{year}")
+
+    tet, leap_month, lengths, _ = year_info(year)
+    if is_leap and month != leap_month:
+        raise ValueError(f"Năm âm {year} không có tháng {month} nhuận")
+
+    index = month - 1
+    if leap_month and (month > leap_month or is_leap):
+        index += 1
+    month_length = 29 + ((lengths >> index) & 1)
+    if day > month_length:
+        raise ValueError(f"Tháng {month}/{year} âm lịch chỉ có {month_length} ngày")
+
+    return date.fromordinal(tet + _month_offset(lengths, index) + day - 1)
+
+
+def build_year_table(first_year: int = FIRST_YEAR, last_year: int = LAST_YEAR) -> List[int]:
+    """Tính lại bảng từ thuật toán thiên văn (dùng khi cần mở rộng khoảng năm)"""
+    table = []
+    for year in range(first_year, last_year + 1):
+        tet = converter.lunar_to_solar(1, 1, year)
+
+        leap_month = 0
+        for month in range(1, 13):
+            try:
+                converter.lunar_to_solar(1, month, year, True)
+                leap_month = month
+                break
+            except ValueError:
+                continue
+
+        starts = []
+        for month in range(1, 13):
+            starts.append(converter.lunar_to_solar(1, month, year))
+            if month == leap_month:
+                starts.append(converter.lunar_to_solar(1, month, year, True))
+        starts.append(converter.lunar_to_solar(1, 1, year + 1))
+
+        lengths = 0
+        for index in range(len(starts) - 1):
+            if (starts[index + 1] - starts[index]).days == 30:
+                lengths |= 1 << index
+
+        table.append(lengths | (leap_month << 13) | ((tet - date(year, 1, 1)).days << 17))
+    return table
+
+
+if __name__ == "__main__":
+    # In bảng để dán lại vào YEAR_TABLE
+    values = build_year_table()
+    for start in range(0, len(values), 8):
+        chunk = ', '.join(f'0x{value:06x}' for value in values[start:start + 8])
+        first = FIRST_YEAR + start
+        print(f'    {chunk},  # {first}-{min(first + 7, LAST_YEAR)}')
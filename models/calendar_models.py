@@ -20,6 +20,7 @@ class CalendarDay:
     can_chi_day: Optional[str] = None     # Can chi ngày
     can_chi_month: Optional[str] = None   # Can chi tháng
     can_chi_year: Optional[str] = None    # Can chi năm
+    can_chi_hours: Optional[List[str]] = None  # Can chi 12 giờ từ giờ Tý
     
     # Thông tin phong thủy
     good_hours: Optional[List[str]] = None    # Giờ hoàng đạo
@@ -53,7 +54,8 @@ class CalendarDay:
             "can_chi": {
                 "day": self.can_chi_day,
                 "month": self.can_chi_month,
-                "year": self.can_chi_year
+                "year": self.can_chi_year,
+                "hours": self.can_chi_hours or []
             },
             "feng_shui": {
                 "good_hours": self.good_hours or [],
@@ -215,3 +217,13 @@ class DataNormalizer:
                         break
         
         return good_activities, bad_activities
+    
+    @staticmethod
+    def merge_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Ghép các record cùng một ngày từ nhiều nguồn: lấy record đầy đủ nhất, bổ sung trường trống từ các record khác"""
+        best_record = dict(max(records, key=lambda x: len([v for v in x.values() if v])))
+        for record in records:
+            for key, value in record.items():
+                if value and not best_record.get(key):
+                    best_record[key] = value
+        return best_record
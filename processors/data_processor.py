@@ -5,13 +5,16 @@ Chuẩn hóa format, loại bỏ duplicate, validate dữ liệu
 
 import json
 import pandas as pd
-import sqlite3
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 import re
+import sys
 import logging
 
+sys.path.append(str(Path(__file__).parent.parent))
+from storage.lich_data import lich_data_rows, lich_data_sink
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -214,44 +217,19 @@ class LichDataProcessor:
         logger.info(f"Đã xuất {len(data)} records ra {output_file}")
     
     def export_to_sqlite(self, db_path: str) -> None:
-        """Xuất dữ liệu ra SQLite"""
+        """Xuất dữ liệu ra SQLite (upsert theo solar_date + source, giữ nguyên schema và indexes)"""
         if self.df is None or self.df.empty:
             logger.warning("Không có dữ liệu để xuất")
             return
         
-        conn = sqlite3.connect(db_path)
-        
-        # Tạo bảng với indexes
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS lich_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                solar_date TEXT NOT NULL,
-                lunar_date TEXT,
-                can_chi_day TEXT,
-                can_chi_month TEXT,
-                can_chi_year TEXT,
-                holiday TEXT,
-                notes TEXT,
-                source TEXT,
-                crawled_at TEXT,
-                processed_at TEXT,
-                UNIQUE(solar_date, source)
-            )
-        ''')
-        
-        # Tạo indexes
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_solar_date ON lich_data(solar_date)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_source ON lich_data(source)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_holiday ON lich_data(holiday)')
-        
-        # Insert dữ liệu
-        self.df.to_sql('lich_data', conn, if_exists='replace', index=False)
+        # Chuyển NaN thành None
+        records = self.df.astype(object).where(pd.notna(self.df), None).to_dict('records')
         
-        conn.commit()
-        conn.close()
+        # Cột ngoài schema lich_data được thêm vào bảng dạng TEXT thay vì bị bỏ
+        with lich_data_sink(db_path, extra_columns=list(self.df.columns)) as sink:
+            count = sink.write(lich_data_rows(records, sink.columns))
         
-        logger.info(f"Đã xuất {len(self.df)} records ra SQLite database: {db_path}")
+        logger.info(f"Đã xuất {count} records ra SQLite database: {db_path}")
     
     def export_to_csv(self, output_file: str) -> None:
         """Xuất dữ liệu ra CSV"""
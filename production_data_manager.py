@@ -5,15 +5,19 @@ Improved Data Manager - Chỉ xử lý data thật, loại bỏ demo data
 import os
 import json
 import shutil
-from datetime import datetime
+import hashlib
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 import sys
 
 # Add models to path
 sys.path.append(str(Path(__file__).parent))
 from models.calendar_models import CalendarDay, MonthlyCalendar, DataNormalizer
 
+# Manifest của normalize_raw_data, nằm trong normalized/ (không khớp *_normalized.json nên merge bỏ qua)
+NORMALIZE_MANIFEST = "_manifest.json"
+
 class ProductionDataManager:
     """Data Manager chỉ cho production data - không có demo/fake data"""
     
@@ -85,26 +89,75 @@ class ProductionDataManager:
         
         print(f"✅ Đã dọn dẹp {removed_count} items")
     
-    def normalize_raw_data(self, source: str) -> int:
-        """Chuẩn hóa raw data từ một nguồn"""
+    def load_normalize_manifest(self) -> Dict[str, Dict]:
+        """Manifest: "source/raw_file" -> mtime, size, sha256 của raw file và file normalized tương ứng"""
+        manifest_file = self.base_path / "normalized" / NORMALIZE_MANIFEST
+        if not manifest_file.exists():
+            return {}
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            return manifest if isinstance(manifest, dict) else {}
+        except Exception as e:
+            print(f"⚠️ Manifest hỏng, chuẩn hóa lại toàn bộ: {e}")
+            return {}
+    
+    def save_normalize_manifest(self, manifest: Dict[str, Dict]):
+        """Ghi manifest qua file tạm để lần chạy bị ngắt không để lại manifest dở"""
+        manifest_file = self.base_path / "normalized" / NORMALIZE_MANIFEST
+        temp_file = manifest_file.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temp_file, manifest_file)
+    
+    def normalize_raw_data(self, source: str, force: bool = False) -> int:
+        """
+        Chuẩn hóa raw data từ một nguồn
+        
+        Chỉ xử lý raw file mới hoặc đã đổi so với manifest (mtime/size, rồi sha256 nếu mtime đổi).
+        Trả về tổng số record đã chuẩn hóa của nguồn, gồm cả file không đổi (lấy từ manifest).
+        force=True chuẩn hóa lại mọi file.
+        """
         source_dir = self.base_path / "raw" / source
         if not source_dir.exists():
             return 0
         
-        normalized_count = 0
+        manifest = self.load_normalize_manifest()
+        manifest_changed = False
+        skipped_count = 0
+        seen_keys = set()
         
-        for raw_file in source_dir.glob("*.json"):
+        for raw_file in sorted(source_dir.glob("*.json")):
+            key = f"{source}/{raw_file.name}"
+            seen_keys.add(key)
+            normalized_file = self.base_path / "normalized" / f"{source}_{raw_file.stem}_normalized.json"
+            entry = manifest.get(key)
+            
             try:
-                # Đọc raw data
-                with open(raw_file, 'r', encoding='utf-8') as f:
-                    raw_data = json.load(f)
+                stat = raw_file.stat()
+                output_ok = entry is not None and (entry.get("output") is None or normalized_file.exists())
                 
-                if not raw_data:
+                # Nhanh: mtime và size không đổi thì không cần đọc file
+                if not force and output_ok and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+                    skipped_count += 1
                     continue
                 
+                content = raw_file.read_bytes()
+                digest = hashlib.sha256(content).hexdigest()
+                
+                # File chỉ bị touch / copy lại: nội dung như cũ, chỉ cập nhật mtime
+                if not force and output_ok and entry.get("sha256") == digest:
+                    entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                    manifest_changed = True
+                    skipped_count += 1
+                    continue
+                
+                # Đọc raw data
+                raw_data = json.loads(content)
+                
                 # Chuẩn hóa từng record
                 normalized_days = []
-                for item in raw_data:
+                for item in raw_data or []:
                     try:
                         calendar_day = CalendarDay.from_raw_data(item)
                         normalized_days.append(calendar_day)
@@ -114,52 +167,131 @@ class ProductionDataManager:
                 
                 if normalized_days:
                     # Lưu vào normalized directory
-                    normalized_file = self.base_path / "normalized" / f"{source}_{raw_file.stem}_normalized.json"
                     normalized_data = [day.to_dict() for day in normalized_days]
                     
                     with open(normalized_file, 'w', encoding='utf-8') as f:
                         json.dump(normalized_data, f, ensure_ascii=False, indent=2)
                     
-                    normalized_count += len(normalized_days)
                     print(f"✅ Chuẩn hóa {len(normalized_days)} records từ {raw_file.name}")
+                else:
+                    # Raw file không còn record hợp lệ: bỏ output cũ để merge không dùng dữ liệu đã bị xóa
+                    normalized_file.unlink(missing_ok=True)
+                
+                manifest[key] = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "sha256": digest,
+                    "output": normalized_file.name if normalized_days else None,
+                    "records": len(normalized_days),
+                    # Index file -> tháng để merge chỉ đọc file liên quan
+                    "months": self.record_months(normalized_data) if normalized_days else [],
+                    "normalized_at": datetime.now().isoformat()
+                }
+                manifest_changed = True
                     
             except Exception as e:
+                # Không ghi manifest để lần sau thử lại file này
                 print(f"❌ Lỗi xử lý {raw_file}: {e}")
         
-        return normalized_count
-    
-    def merge_sources_by_month(self, year: int, month: int) -> Optional[MonthlyCalendar]:
-        """Ghép dữ liệu từ nhiều nguồn theo tháng"""
-        print(f"🔄 Ghép dữ liệu tháng {month:02d}/{year}...")
+        # Raw file đã bị xóa: bỏ khỏi manifest cùng file normalized do nó sinh ra
+        for key in [key for key in manifest if key.startswith(f"{source}/") and key not in seen_keys]:
+            output = manifest.pop(key).get("output")
+            if output:
+                (self.base_path / "normalized" / output).unlink(missing_ok=True)
+            manifest_changed = True
         
-        # Dictionary để group theo ngày
-        days_data = {}
+        if manifest_changed:
+            self.save_normalize_manifest(manifest)
+        if skipped_count:
+            print(f"⏭️ Bỏ qua {skipped_count} file không đổi từ {source}")
         
-        # Đọc dữ liệu từ tất cả nguồn
+        return sum(entry.get("records", 0) for key, entry in manifest.items() if key.startswith(f"{source}/"))
+    
+    @staticmethod
+    def record_months(records: List[Dict]) -> List[str]:
+        """Các tháng "YYYY-MM" có trong danh sách record đã chuẩn hóa"""
+        return sorted({str(item.get('solar_date', ''))[:7] for item in records if item.get('solar_date')})
+    
+    def normalized_month_index(self) -> Dict[Path, Optional[Set[str]]]:
+        """
+        File normalized -> các tháng nó chứa, lấy từ manifest của normalize_raw_data
+        
+        None nếu chưa biết (file không có trong manifest hoặc manifest cũ chưa ghi tháng).
+        """
         normalized_dir = self.base_path / "normalized"
-        for file in normalized_dir.glob("*_normalized.json"):
+        index: Dict[Path, Optional[Set[str]]] = {file: None for file in normalized_dir.glob("*_normalized.json")}
+        for entry in self.load_normalize_manifest().values():
+            output = entry.get("output")
+            if output and "months" in entry and normalized_dir / output in index:
+                index[normalized_dir / output] = set(entry["months"])
+        return index
+    
+    def merge_sources_by_months(self, months: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], MonthlyCalendar]:
+        """
+        Ghép dữ liệu từ nhiều nguồn cho nhiều tháng trong một lượt đọc
+        
+        Mỗi file normalized liên quan chỉ được đọc một lần; file mà index cho biết không chứa
+        tháng nào cần thì bỏ qua. Trả về (year, month) -> MonthlyCalendar của các tháng có dữ liệu.
+        """
+        wanted = {f"{year}-{month:02d}": (year, month) for year, month in months}
+        for year, month in sorted(wanted.values()):
+            print(f"🔄 Ghép dữ liệu tháng {month:02d}/{year}...")
+        
+        # Tháng -> ngày -> các record từ mọi nguồn
+        days_by_month: Dict[str, Dict[str, List[Dict]]] = {key: {} for key in wanted}
+        
+        # Đọc dữ liệu từ các nguồn có tháng cần thiết
+        learned_months: Dict[str, List[str]] = {}
+        for file, file_months in sorted(self.normalized_month_index().items()):
+            if file_months is not None and file_months.isdisjoint(wanted):
+                continue
             try:
                 with open(file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                
-                for item in data:
-                    solar_date = item.get('solar_date', '')
-                    if not solar_date:
-                        continue
-                    
-                    # Chỉ lấy data của tháng cần thiết
-                    try:
-                        date_obj = datetime.strptime(solar_date, '%Y-%m-%d')
-                        if date_obj.year == year and date_obj.month == month:
-                            if solar_date not in days_data:
-                                days_data[solar_date] = []
-                            days_data[solar_date].append(item)
-                    except:
-                        continue
-                        
             except Exception as e:
                 print(f"⚠️ Lỗi đọc {file}: {e}")
+                continue
+            
+            if file_months is None:
+                learned_months[file.name] = self.record_months(data)
+            
+            for item in data:
+                solar_date = item.get('solar_date', '')
+                # So tiền tố "YYYY-MM" thay vì strptime mọi record; chỉ kiểm tra ngày hợp lệ cho record được chọn
+                days = days_by_month.get(str(solar_date)[:7])
+                if days is None or len(solar_date) != 10:
+                    continue
+                try:
+                    date.fromisoformat(solar_date)
+                except ValueError:
+                    continue
+                days.setdefault(solar_date, []).append(item)
+        
+        if learned_months:
+            self.remember_normalized_months(learned_months)
         
+        results: Dict[Tuple[int, int], MonthlyCalendar] = {}
+        for key, days_data in sorted(days_by_month.items()):
+            year, month = wanted[key]
+            monthly_calendar = self.merge_month_days(year, month, days_data)
+            if monthly_calendar:
+                results[(year, month)] = monthly_calendar
+        return results
+    
+    def remember_normalized_months(self, learned_months: Dict[str, List[str]]):
+        """Ghi tháng của các file vừa đọc vào manifest (entry cũ chưa có "months") để lần sau khỏi đọc lại"""
+        manifest = self.load_normalize_manifest()
+        changed = False
+        for entry in manifest.values():
+            output = entry.get("output")
+            if output in learned_months and "months" not in entry:
+                entry["months"] = learned_months[output]
+                changed = True
+        if changed:
+            self.save_normalize_manifest(manifest)
+    
+    def merge_month_days(self, year: int, month: int, days_data: Dict[str, List[Dict]]) -> Optional[MonthlyCalendar]:
+        """Ghép các record theo ngày của một tháng và ghi file api/calendar_YYYY_MM.json"""
         if not days_data:
             print(f"❌ Không có dữ liệu cho tháng {month:02d}/{year}")
             return None
@@ -169,14 +301,8 @@ class ProductionDataManager:
         for solar_date in sorted(days_data.keys()):
             day_records = days_data[solar_date]
             
-            # Merge logic: ưu tiên nguồn có data đầy đủ nhất
-            best_record = max(day_records, key=lambda x: len([v for v in x.values() if v]))
-            
-            # Bổ sung thông tin từ các nguồn khác
-            for record in day_records:
-                for key, value in record.items():
-                    if value and not best_record.get(key):
-                        best_record[key] = value
+            # Merge logic: ưu tiên nguồn có data đầy đủ nhất, bổ sung thông tin từ các nguồn khác
+            best_record = DataNormalizer.merge_records(day_records)
             
             # Tạo CalendarDay object
             try:
@@ -203,6 +329,14 @@ class ProductionDataManager:
         
         return None
     
+    def merge_sources_by_month(self, year: int, month: int) -> Optional[MonthlyCalendar]:
+        """Ghép dữ liệu từ nhiều nguồn theo tháng"""
+        return self.merge_sources_by_months([(year, month)]).get((year, month))
+    
+    def merge_sources_by_year(self, year: int) -> Dict[Tuple[int, int], MonthlyCalendar]:
+        """Ghép cả 12 tháng của một năm, mỗi file normalized liên quan chỉ đọc một lần"""
+        return self.merge_sources_by_months((year, month) for month in range(1, 13))
+    
     def get_available_data_summary(self) -> Dict:
         """Tóm tắt dữ liệu thật hiện có"""
         summary = {
@@ -285,7 +419,8 @@ class ProductionDataManager:
             "calendar": "Dữ liệu lịch theo tháng",
             "holidays": "Danh sách ngày lễ", 
             "good_days": "Ngày tốt trong tháng",
-            "bad_days": "Ngày xấu trong tháng"
+            "bad_days": "Ngày xấu trong tháng",
+            "bundles": "Bundle nhị phân theo năm cho app offline"
         }
         
         for endpoint, description in endpoints.items():
@@ -293,7 +428,8 @@ class ProductionDataManager:
             endpoint_dir.mkdir(exist_ok=True)
             
             # Tạo README cho endpoint
-            readme_content = f"# {endpoint.upper()} API\n\n{description}\n\n## Format\n\nJSON files organized by year/month\n"
+            file_format = "Binary .lvnb files per year (api/bundle.py)" if endpoint == "bundles" else "JSON files organized by year/month"
+            readme_content = f"# {endpoint.upper()} API\n\n{description}\n\n## Format\n\n{file_format}\n"
             (endpoint_dir / "README.md").write_text(readme_content)
         
         print("✅ Đã tạo cấu trúc API cho Android")
@@ -330,10 +466,9 @@ def main():
     pdm.create_android_api_structure()
     print()
     
-    # 5. Merge data theo tháng (example: tháng hiện tại)
-    current_month = datetime.now().month
+    # 5. Merge data cả năm hiện tại, mỗi file normalized chỉ đọc một lần
     current_year = datetime.now().year
-    monthly_data = pdm.merge_sources_by_month(current_year, current_month)
+    monthly_data = pdm.merge_sources_by_year(current_year)
     print()
     
     # 6. Hiển thị tóm tắt
@@ -0,0 +1,15 @@
+"""
+Storage package
+Ghi dữ liệu lịch vào SQLite theo lô (WAL, upsert, một transaction mỗi lô)
+"""
+
+from .sqlite_sink import SqliteSink
+from .lich_data import LICH_DATA_COLUMNS, ensure_lich_data_schema, lich_data_rows, lich_data_sink
+
+__all__ = [
+    'SqliteSink',
+    'LICH_DATA_COLUMNS',
+    'ensure_lich_data_schema',
+    'lich_data_rows',
+    'lich_data_sink'
+]
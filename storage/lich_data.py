@@ -0,0 +1,223 @@
+"""
+Schema bảng lich_data dùng chung cho crawler (save_to_sqlite) và processor (export_to_sqlite)
+Upsert theo (solar_date, source), kèm các cột suy ra và index cho truy vấn của API
+
+is_good_day chỉ lấy từ dữ liệu crawl (cờ của nguồn, hoặc suy ra từ holiday như CalendarDay.from_raw_data);
+nguồn không cho biết thì để NULL, truy vấn ngày tốt / xấu bỏ qua các dòng này.
+"""
+
+import sys
+import json
+import math
+import sqlite3
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from config.settings import DATABASE_SETTINGS
+from models.calendar_models import CalendarDay
+from lunar.bulk import solar_to_lunar_array
+from .sqlite_sink import SqliteSink
+
+TABLE = 'lich_data'
+
+# Cột dữ liệu gốc, theo thứ tự LichData.to_dict
+SOURCE_COLUMNS = [
+    'solar_date', 'lunar_date', 'can_chi_day', 'can_chi_month', 'can_chi_year',
+    'holiday', 'notes', 'source', 'crawled_at'
+]
+# Cột tính từ solar_date lúc ghi, để truy vấn theo ngày âm không phải parse text
+DERIVED_COLUMNS = ['lunar_day', 'lunar_month', 'lunar_leap']
+LICH_DATA_COLUMNS = SOURCE_COLUMNS + ['processed_at'] + DERIVED_COLUMNS + ['is_good_day']
+LICH_DATA_KEY = ['solar_date', 'source']
+
+# PRAGMA user_version của file db; migrate (backfill cả bảng) chỉ chạy khi version thấp hơn
+# 1: cột suy ra + index; 2: is_good_day chỉ từ dữ liệu crawl (bỏ giá trị tính theo điểm ngày của generator)
+SCHEMA_VERSION = 2
+
+# Kiểu của các cột không phải TEXT, dùng khi migrate bảng cũ
+COLUMN_TYPES = {
+    'lunar_day': 'INTEGER',
+    'lunar_month': 'INTEGER',
+    'lunar_leap': 'INTEGER',
+    'is_good_day': 'INTEGER'
+}
+
+LICH_DATA_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS lich_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        solar_date TEXT NOT NULL,
+        lunar_date TEXT,
+        can_chi_day TEXT,
+        can_chi_month TEXT,
+        can_chi_year TEXT,
+        holiday TEXT,
+        notes TEXT,
+        source TEXT,
+        crawled_at TEXT,
+        processed_at TEXT,
+        lunar_day INTEGER,
+        lunar_month INTEGER,
+        lunar_leap INTEGER,
+        is_good_day INTEGER,
+        UNIQUE(solar_date, source)
+    )
+'''
+
+# Unique index chỉ cần cho bảng cũ không có UNIQUE(solar_date, source) (bảng do df.to_sql tạo);
+# nó cũng phục vụ truy vấn theo tháng: WHERE solar_date BETWEEN '2024-07-01' AND '2024-07-31'
+KEY_INDEX = 'CREATE UNIQUE INDEX IF NOT EXISTS idx_lich_data_key ON lich_data(solar_date, source)'
+LICH_DATA_INDEXES = [
+    # /search: (tháng âm, ngày âm, nhuận) -> solar_date, không cần đọc bảng
+    'CREATE INDEX IF NOT EXISTS idx_lich_data_lunar ON lich_data(lunar_month, lunar_day, lunar_leap, solar_date)',
+    # /good-days, /bad-days trong một khoảng ngày
+    'CREATE INDEX IF NOT EXISTS idx_lich_data_good_day ON lich_data(is_good_day, solar_date)',
+    # /holidays: chỉ index các ngày có lễ
+    'CREATE INDEX IF NOT EXISTS idx_lich_data_holiday ON lich_data(solar_date) WHERE holiday IS NOT NULL',
+    'CREATE INDEX IF NOT EXISTS idx_lich_data_source ON lich_data(source, solar_date)'
+]
+# Index cũ của export_to_sqlite, trùng với các index trên nên chỉ làm chậm ghi
+LEGACY_INDEXES = ['idx_solar_date', 'idx_source', 'idx_holiday']
+
+
+def derive_columns(solar_dates: Sequence[Optional[str]]) -> List[Tuple[Optional[int], ...]]:
+    """(lunar_day, lunar_month, lunar_leap) cho từng ngày, tính vector hoá; ngày không hợp lệ ra None"""
+    positions = []
+    ordinals = []
+    for index, value in enumerate(solar_dates):
+        try:
+            ordinals.append(date.fromisoformat(str(value)[:10]).toordinal())
+        except (TypeError, ValueError):
+            continue
+        positions.append(index)
+
+    result: List[Tuple[Optional[int], ...]] = [(None, None, None)] * len(solar_dates)
+    if not ordinals:
+        return result
+
+    lunar_day, lunar_month, _, is_leap = solar_to_lunar_array(np.asarray(ordinals, dtype=np.int64))
+
+    for index, day, month, leap in zip(positions, lunar_day.tolist(), lunar_month.tolist(), is_leap.tolist()):
+        result[index] = (day, month, int(leap))
+    return result
+
+
+def crawled_good_day(record: Dict[str, Any]) -> Optional[bool]:
+    """Cờ ngày tốt từ dữ liệu crawl: cột is_good_day của nguồn, không có thì suy ra từ holiday; None nếu không biết"""
+    is_good_day = record.get('is_good_day')
+    if is_good_day is None and isinstance(record.get('holiday'), str) and record['holiday']:
+        is_good_day = CalendarDay.from_raw_data(record).is_good_day
+    return None if is_good_day is None else bool(is_good_day)
+
+
+def _sql_value(value: Any) -> Any:
+    """Đổi giá trị từ dict/DataFrame sang kiểu sqlite3 nhận được"""
+    if value is None or isinstance(value, (str, int, bytes)):
+        return value
+    if isinstance(value, float):
+        return None if math.isnan(value) else value
+    if isinstance(value, np.generic):
+        return _sql_value(value.item())
+    if isinstance(value, (list, dict, tuple)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def lich_data_rows(records: Iterable[Dict[str, Any]],
+                   columns: Sequence[str] = LICH_DATA_COLUMNS) -> List[Tuple[Any, ...]]:
+    """Tuple theo `columns` cho SqliteSink.write, điền các cột suy ra và is_good_day (NULL nếu nguồn không cho biết)"""
+    records = list(records)
+    derived = derive_columns([record.get('solar_date') for record in records])
+
+    rows = []
+    for record, values in zip(records, derived):
+        computed = dict(zip(DERIVED_COLUMNS, values))
+        is_good_day = crawled_good_day(record)
+        computed['is_good_day'] = None if is_good_day is None else int(is_good_day)
+        rows.append(tuple(
+            computed[column] if column in computed else _sql_value(record.get(column))
+            for column in columns
+        ))
+    return rows
+
+
+def _add_missing_columns(conn: sqlite3.Connection, columns: Sequence[str]) -> None:
+    existing = {row[1] for row in conn.execute(f'PRAGMA table_info({TABLE})')}
+    for column in columns:
+        if column not in existing:
+            conn.execute(f'ALTER TABLE {TABLE} ADD COLUMN "{column}" {COLUMN_TYPES.get(column, "TEXT")}')
+
+
+def _backfill(conn: sqlite3.Connection, version: int) -> None:
+    """Điền lại cột suy ra cho các dòng ghi trước `SCHEMA_VERSION` (chạy một lần mỗi file db)"""
+    if version < 1:
+        missing = [row[0] for row in conn.execute(
+            f'SELECT DISTINCT solar_date FROM {TABLE} WHERE lunar_day IS NULL'
+        )]
+        conn.executemany(
+            f'UPDATE {TABLE} SET lunar_day = ?, lunar_month = ?, lunar_leap = ? WHERE solar_date = ?',
+            [(*values, solar_date) for solar_date, values in zip(missing, derive_columns(missing))
+             if values[0] is not None]
+        )
+    if version < 2:
+        # Bản cũ điền is_good_day theo điểm ngày của generator cho mọi dòng; chỉ giữ giá trị suy ra được từ holiday
+        conn.execute(f"UPDATE {TABLE} SET is_good_day = NULL WHERE holiday IS NULL OR holiday = ''")
+        rows = conn.execute(f"SELECT rowid, holiday FROM {TABLE} WHERE holiday IS NOT NULL AND holiday != ''").fetchall()
+        updates = []
+        for rowid, holiday in rows:
+            is_good_day = crawled_good_day({'holiday': holiday})
+            updates.append((None if is_good_day is None else int(is_good_day), rowid))
+        conn.executemany(f'UPDATE {TABLE} SET is_good_day = ? WHERE rowid = ?', updates)
+
+
+def ensure_lich_data_schema(conn: sqlite3.Connection, extra_columns: Sequence[str] = ()) -> None:
+    """
+    Tạo hoặc migrate bảng lich_data: thêm cột thiếu, unique key, index, và điền cột suy ra cho dòng cũ
+
+    Migrate theo PRAGMA user_version: file db đã ở SCHEMA_VERSION chỉ còn thêm cột ngoài schema (nếu có).
+    Chạy trong một transaction; bảng cũ có dòng trùng (solar_date, source) thì giữ dòng ghi sau cùng.
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        extra = [column for column in extra_columns if column not in LICH_DATA_COLUMNS]
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            _add_missing_columns(conn, extra)
+            conn.execute('COMMIT')
+            return
+
+        conn.execute(LICH_DATA_SCHEMA)
+        _add_missing_columns(conn, LICH_DATA_COLUMNS + extra)
+
+        try:
+            conn.execute(KEY_INDEX)
+        except sqlite3.IntegrityError:
+            conn.execute(f'''
+                DELETE FROM {TABLE} WHERE rowid NOT IN (
+                    SELECT MAX(rowid) FROM {TABLE} GROUP BY solar_date, source
+                )
+            ''')
+            conn.execute(KEY_INDEX)
+
+        for name in LEGACY_INDEXES:
+            conn.execute(f'DROP INDEX IF EXISTS {name}')
+        for statement in LICH_DATA_INDEXES:
+            conn.execute(statement)
+
+        _backfill(conn, version)
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+
+def lich_data_sink(db_path: str = DATABASE_SETTINGS['sqlite_path'],
+                   extra_columns: Sequence[str] = (), **options) -> SqliteSink:
+    """Sink cho bảng lich_data, upsert theo (solar_date, source); `extra_columns` là cột TEXT ngoài schema"""
+    extra = [column for column in extra_columns if column not in LICH_DATA_COLUMNS and column != 'id']
+    return SqliteSink(db_path, TABLE, LICH_DATA_COLUMNS + extra, LICH_DATA_KEY,
+                      setup=lambda conn: ensure_lich_data_schema(conn, extra), **options)
@@ -0,0 +1,117 @@
+"""
+SQLite sink ghi theo lô cho dữ liệu crawl
+WAL để API đọc song song không bị chặn, executemany + upsert, mỗi lô một transaction
+"""
+
+import sys
+import sqlite3
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+sys.path.append(str(Path(__file__).parent.parent))
+from config.settings import DATABASE_SETTINGS
+
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+class SqliteSink:
+    """
+    Ghi các dòng vào một bảng bằng upsert theo `key_columns`
+
+    Bảng phải có UNIQUE/PRIMARY KEY hoặc unique index trên `key_columns` (ON CONFLICT cần constraint đó).
+    Dùng được như context manager; một sink giữ một connection, an toàn giữa các thread nhờ lock.
+    """
+
+    def __init__(self, db_path: str, table: str, columns: Sequence[str], key_columns: Sequence[str],
+                 schema: Sequence[str] = (),
+                 setup: Optional[Callable[[sqlite3.Connection], None]] = None,
+                 batch_size: int = DATABASE_SETTINGS['batch_size'],
+                 synchronous: str = DATABASE_SETTINGS['synchronous'],
+                 cache_size_kb: int = DATABASE_SETTINGS['cache_size_kb'],
+                 busy_timeout_ms: int = DATABASE_SETTINGS['busy_timeout_ms']):
+        if synchronous.upper() not in SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous phải là một trong {SYNCHRONOUS_MODES}")
+
+        self.db_path = Path(db_path)
+        self.table = table
+        self.columns = list(columns)
+        self.key_columns = list(key_columns)
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: tự quản lý BEGIN/COMMIT để mỗi lô đúng một transaction
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(
+            str(self.db_path), isolation_level=None, check_same_thread=False,
+            timeout=busy_timeout_ms / 1000
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(f'PRAGMA synchronous={synchronous.upper()}')
+        self._conn.execute(f'PRAGMA cache_size={-int(cache_size_kb)}')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        self._conn.execute(f'PRAGMA busy_timeout={int(busy_timeout_ms)}')
+
+        for statement in schema:
+            self._conn.execute(statement)
+        # Migrate bảng cũ (thêm cột, index...) trước khi chuẩn bị câu upsert
+        if setup is not None:
+            setup(self._conn)
+
+        self.upsert_sql = self._build_upsert()
+
+    def _build_upsert(self) -> str:
+        placeholders = ', '.join('?' for _ in self.columns)
+        updates = ', '.join(f'"{column}" = excluded."{column}"'
+                            for column in self.columns if column not in self.key_columns)
+        conflict = 'DO NOTHING' if not updates else f'DO UPDATE SET {updates}'
+        columns = ', '.join(f'"{column}"' for column in self.columns)
+        keys = ', '.join(f'"{column}"' for column in self.key_columns)
+        return (f'INSERT INTO {self.table} ({columns}) VALUES ({placeholders}) '
+                f'ON CONFLICT({keys}) {conflict}')
+
+    def write(self, rows: Iterable[Sequence[Any]]) -> int:
+        """
+        Upsert các dòng (tuple theo thứ tự `columns`), trả về số dòng đã ghi
+
+        Lô lỗi được rollback rồi raise lại; các lô trước đó đã commit vẫn giữ nguyên.
+        """
+        if self._conn is None:
+            raise RuntimeError("SqliteSink đã đóng")
+
+        total = 0
+        iterator = iter(rows)
+        with self._lock:
+            while True:
+                batch: List[Sequence[Any]] = list(islice(iterator, self.batch_size))
+                if not batch:
+                    break
+                self._conn.execute('BEGIN IMMEDIATE')
+                try:
+                    self._conn.executemany(self.upsert_sql, batch)
+                except Exception:
+                    self._conn.execute('ROLLBACK')
+                    raise
+                self._conn.execute('COMMIT')
+                total += len(batch)
+        return total
+
+    def write_dicts(self, records: Iterable[dict]) -> int:
+        """Như write nhưng nhận dict, cột thiếu ghi NULL"""
+        return self.write(tuple(record.get(column) for column in self.columns) for record in records)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                # Gộp WAL về file chính để file .db tự đủ khi copy/backup
+                self._conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self) -> 'SqliteSink':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
@@ -0,0 +1,82 @@
+"""
+Kiểm tra bộ chuyển đổi âm lịch: bảng năm (year_table), thuật toán thiên văn (converter) và tiết khí
+"""
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+from lunar import converter, year_table
+from lunar.converter import LunarDate
+from lunar.solar_terms import SolarTermTable
+from lunar.year_table import FIRST_YEAR, LAST_YEAR
+
+
+@pytest.mark.parametrize("lunar_year, tet", [
+    (2025, date(2025, 1, 29)),
+    (1985, date(1985, 1, 21)),
+    (1968, date(1968, 1, 29)),
+])
+def test_tet(lunar_year, tet):
+    assert year_table.lunar_to_solar(1, 1, lunar_year) == tet
+    assert year_table.solar_to_lunar(tet) == LunarDate(1, 1, lunar_year)
+    assert year_table.solar_to_lunar(tet - timedelta(days=1)).year == lunar_year - 1
+
+
+@pytest.mark.parametrize("lunar_year, leap_month", [(2023, 2), (2020, 4)])
+def test_leap_month(lunar_year, leap_month):
+    assert year_table.year_info(lunar_year)[1] == leap_month
+
+    first_day = year_table.lunar_to_solar(1, leap_month, lunar_year, is_leap=True)
+    assert year_table.solar_to_lunar(first_day) == LunarDate(1, leap_month, lunar_year, True)
+    # Tháng nhuận nằm ngay sau tháng thường cùng số
+    regular = year_table.lunar_to_solar(1, leap_month, lunar_year)
+    assert 29 <= (first_day - regular).days <= 30
+
+    with pytest.raises(ValueError):
+        year_table.lunar_to_solar(1, leap_month + 1, lunar_year, is_leap=True)
+
+
+def test_leap_month_str():
+    assert str(LunarDate(1, 4, 2020)) == "01/04/2020"
+    assert str(LunarDate(1, 4, 2020, True)) == "01/04/2020 (nhuận)"
+    assert str(year_table.solar_to_lunar(date(2020, 5, 23))) == "01/04/2020 (nhuận)"
+
+
+def test_year_table_matches_converter():
+    """Mọi ngày trong khoảng bảng: tra bảng trùng thuật toán thiên văn và đổi ngược lại đúng ngày"""
+    current = date(FIRST_YEAR, 1, 1)
+    last = date(LAST_YEAR, 12, 31)
+    while current <= last:
+        lunar = year_table.solar_to_lunar(current)
+        assert lunar == converter.solar_to_lunar(current), current
+        assert year_table.lunar_to_solar(lunar.day, lunar.month, lunar.year, lunar.is_leap) == current, current
+        current += timedelta(days=1)
+
+
+def test_year_table_tet_matches_converter():
+    for lunar_year in range(FIRST_YEAR, LAST_YEAR + 1):
+        assert year_table.lunar_to_solar(1, 1, lunar_year) == converter.lunar_to_solar(1, 1, lunar_year), lunar_year
+
+
+def test_outside_table_falls_back_to_converter():
+    for value in (date(FIRST_YEAR - 1, 6, 1), date(LAST_YEAR + 1, 6, 1)):
+        assert year_table.solar_to_lunar(value) == converter.solar_to_lunar(value)
+
+
+@pytest.fixture
+def solar_term_table(tmp_path):
+    """Bảng tiết khí cache trong tmp_path, không ghi vào data/cache của repo"""
+    return SolarTermTable(cache_path=str(tmp_path / "solar_terms.json"))
+
+
+@pytest.mark.parametrize("value, term", [
+    (date(2024, 2, 4), "Lập xuân"),
+    (date(2024, 2, 3), "Đại hàn"),
+    (date(2024, 12, 21), "Đông chí"),
+])
+def test_solar_term(solar_term_table, value, term):
+    assert solar_term_table.term_for_date(value) == term
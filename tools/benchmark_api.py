@@ -0,0 +1,91 @@
+"""
+Benchmark CPU serialize response của API
+So sánh đường mặc định của FastAPI (jsonable_encoder + JSONResponse) với FastJSONResponse (orjson)
+
+Chạy: python tools/benchmark_api.py [--data-dir data/api] [--repeat 200]
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.append(str(Path(__file__).parent.parent))
+from api.calendar_store import CalendarStore
+from api.responses import ORJSON_AVAILABLE, FastJSONResponse
+
+
+def default_render(payload: Any) -> bytes:
+    """Những gì FastAPI làm khi endpoint trả về dict"""
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def fast_render(payload: Any) -> bytes:
+    """Endpoint trả thẳng FastJSONResponse"""
+    return FastJSONResponse(payload).body
+
+
+def build_payloads(store: CalendarStore) -> List[Tuple[str, Dict[str, Any]]]:
+    """Payload đại diện: một ngày, một tháng, một năm (range) lấy từ dữ liệu đang có"""
+    first = date.fromordinal(int(store.ordinals[0]))
+    last = date.fromordinal(int(store.ordinals[-1]))
+    year_end = min(last, date(first.year, 12, 31))
+
+    days = list(store.iter_range(first, year_end))
+    month = store.month_document(first.year, first.month)
+    return [
+        ("day", {"success": True, "data": store.get_day(first)}),
+        (f"month {first.year}-{first.month:02d}", {"success": True, "data": month,
+                                                   "requested": f"{first.year}-{first.month:02d}"}),
+        (f"range {first.isoformat()}..{year_end.isoformat()}", {"success": True, "data": {
+            "from": first.isoformat(), "to": year_end.isoformat(), "fields": None,
+            "days": days, "total": len(days)
+        }})
+    ]
+
+
+def measure(render: Callable[[Any], bytes], payload: Any, repeat: int) -> float:
+    """Thời gian trung bình mỗi lần render (ms), lấy lần chạy tốt nhất trong 3"""
+    runs = timeit.repeat(lambda: render(payload), number=repeat, repeat=3)
+    return min(runs) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serialize response của Calendar API")
+    parser.add_argument("--data-dir", default=str(Path(__file__).parent.parent / "data" / "api"))
+    parser.add_argument("--repeat", type=int, default=200, help="Số lần render mỗi lượt đo")
+    args = parser.parse_args()
+
+    store = CalendarStore(Path(args.data_dir)).load()
+    if len(store.ordinals) == 0:
+        print(f"❌ Không có file calendar_*.json trong {args.data_dir}")
+        return
+
+    if not ORJSON_AVAILABLE:
+        print("⚠️ orjson chưa được cài, FastJSONResponse đang dùng json chuẩn")
+
+    print("\n" + "="*72)
+    print("⏱️  BENCHMARK SERIALIZE RESPONSE (ms / request)")
+    print("="*72)
+    print(f"{'Payload':<36}{'KB':>7}{'default':>10}{'fast':>10}{'speedup':>9}")
+    print("-"*72)
+
+    for label, payload in build_payloads(store):
+        body = fast_render(payload)
+        if body != default_render(payload):
+            print(f"❌ {label}: body khác nhau giữa hai cách serialize")
+            continue
+        default_ms = measure(default_render, payload, args.repeat)
+        fast_ms = measure(fast_render, payload, args.repeat)
+        print(f"{label:<36}{len(body) / 1024:>7.1f}{default_ms:>10.3f}{fast_ms:>10.3f}{default_ms / fast_ms:>8.1f}x")
+
+    print("="*72)
+
+
+if __name__ == "__main__":
+    main()
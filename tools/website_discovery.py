@@ -11,7 +11,11 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import re
-import time
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from crawlers.rate_limiter import get_rate_limiter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,6 +24,7 @@ class WebsiteDiscovery:
     """Công cụ phát hiện trang web lịch âm hoạt động"""
     
     def __init__(self):
+        self.rate_limiter = get_rate_limiter()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
@@ -95,6 +100,7 @@ class WebsiteDiscovery:
         
         try:
             url = f"https://{domain}"
+            self.rate_limiter.acquire(url)
             response = self.session.get(url, timeout=10)
             
             if response.status_code == 200:
@@ -152,6 +158,7 @@ class WebsiteDiscovery:
             url = f"https://{domain}{path}"
             result['url'] = url
             
+            self.rate_limiter.acquire(url)
             response = self.session.get(url, timeout=10)
             result['content_length'] = len(response.content)
             
@@ -215,7 +222,6 @@ class WebsiteDiscovery:
             logger.info(f"Testing {domain}...")
             result = self.test_site_homepage(domain)
             results['homepage_results'].append(result)
-            time.sleep(1)  # Rate limiting
         
         # Test calendar URLs
         logger.info("📅 Testing calendar URLs...")
@@ -224,7 +230,6 @@ class WebsiteDiscovery:
                 logger.info(f"Testing {domain} with pattern {pattern}...")
                 result = self.test_calendar_url(domain, pattern)
                 results['calendar_results'].append(result)
-                time.sleep(0.5)  # Rate limiting
         
         # Phân tích kết quả
         working_sites = []